@@ -1,14 +1,35 @@
 # bookings/admin.py
 
 
+from django.conf import settings
 from django.contrib import admin
-from django.db.models import Q
+from django.contrib.admin import helpers
+from django.contrib.auth import get_permission_codename
+from django.db.models import Count, Q
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
 from django.utils import timezone
+from django.utils.html import format_html
+from django.utils.module_loading import import_string
 from import_export.admin import ExportActionMixin
 from simple_history.admin import SimpleHistoryAdmin
 
-from .models import Guest, Room, Booking, Payment, Review, Amenity
+from .exports import stream_csv, xlsx_response
+from .jobs import enqueue_export
+from .models import Guest, Room, Booking, Payment, Review, Amenity, ExportJob, SeasonalRate
+from .pagination import EstimatedCountPaginator
 from .resources import BookingResource
+from .thumbnails import thumbnail_urls
+
+
+class EstimatedCountAdminMixin:
+    """
+    Списки больших таблиц: количество строк без фильтров оценивается (EstimatedCountPaginator),
+    второй COUNT(*) для "показать все" не выполняется.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class AmenityInline(admin.TabularInline):
@@ -17,7 +38,7 @@ class AmenityInline(admin.TabularInline):
 
 
 @admin.register(Guest)
-class GuestAdmin(SimpleHistoryAdmin):
+class GuestAdmin(EstimatedCountAdminMixin, SimpleHistoryAdmin):
     list_display = ('first_name', 'last_name', 'email', 'phone_number')
     list_display_links = ('first_name', 'last_name')
     search_fields = ('first_name', 'last_name', 'email')
@@ -31,25 +52,55 @@ class GuestAdmin(SimpleHistoryAdmin):
 @admin.register(Room)
 class RoomAdmin(SimpleHistoryAdmin):
     list_display = (
-        'name', 'room_number', 'room_type', 'price_per_night', 'max_occupancy', 'image', 'display_amenities')
+        'name', 'room_number', 'room_type', 'price_per_night', 'max_occupancy', 'image_preview', 'display_amenities')
     list_filter = ('room_type',)
     search_fields = ('room_number', 'room_type')
     inlines = [AmenityInline]
 
+    def get_queryset(self, request):
+        # Удобства всех номеров страницы - одним запросом
+        return super().get_queryset(request).prefetch_related('amenities')
+
     @admin.display(description='Amenities')
     def display_amenities(self, obj):
         return ", ".join([amenity.name for amenity in obj.amenities.all()])
 
+    @admin.display(description='Изображение')
+    def image_preview(self, obj):
+        thumbnails = thumbnail_urls(obj)
+        if not thumbnails:
+            return '-'
+        smallest = min(thumbnails.values(), key=lambda variant: variant['width'])
+        return format_html('<img src="{}" width="80" loading="lazy" alt="">', smallest['jpeg'])
+
+
+@admin.register(SeasonalRate)
+class SeasonalRateAdmin(SimpleHistoryAdmin):
+    list_display = ('name', 'room', 'room_type', 'start_date', 'end_date', 'price_per_night', 'multiplier')
+    list_filter = ('room_type',)
+    date_hierarchy = 'start_date'
+    raw_id_fields = ('room',)
+    list_select_related = ('room',)
+
 
 @admin.register(Booking)
-class BookingAdmin(ExportActionMixin, SimpleHistoryAdmin):
+class BookingAdmin(EstimatedCountAdminMixin, ExportActionMixin, SimpleHistoryAdmin):
     resource_class = BookingResource  # Для экспорта в excel
-    list_display = ('booking_name', 'guest', 'room', 'check_in', 'check_out', 'total_price')
+    list_display = ('booking_name', 'guest', 'room', 'check_in', 'check_out', 'total_price', 'amount_paid', 'is_paid')
     list_display_links = ('guest', 'room')  # Гиперссылки на связанные записи
     list_filter = ('check_in', 'check_out')
     date_hierarchy = 'check_in'
     raw_id_fields = ('guest', 'room')
+    list_select_related = ('guest', 'room')  # Booking.__str__ и колонки guest, room
     search_fields = ('guest__first_name', 'guest__last_name', 'room__room_number')
+    readonly_fields = ('amount_paid', 'is_paid')  # Ведутся платежами
+    actions = ['export_csv_stream', 'export_xlsx_stream', 'export_csv_background', 'export_xlsx_background']
+
+    def get_actions(self, request):
+        # Действие ExportActionMixin собирает выгрузку в памяти - его заменяют потоковые и фоновые
+        actions = super().get_actions(request)
+        actions.pop('export_admin_action', None)
+        return actions
 
     def get_export_queryset(self, request):
         """
@@ -59,12 +110,47 @@ class BookingAdmin(ExportActionMixin, SimpleHistoryAdmin):
         current_date = timezone.now().date()  # Текущая дата
         return Booking.objects.filter(
             Q(check_out__gte=current_date)  # Бронирования, которые ещё активны или будут активны
-        ).order_by('check_in')  # Сортируем
+        ).select_related('guest', 'room').order_by('check_in')  # Сортируем
+
+    @admin.action(description='Экспорт в CSV (потоковый)', permissions=['export'])
+    def export_csv_stream(self, request, queryset):
+        """
+        Потоковый экспорт выбранных бронирований: память не растёт с числом строк.
+        """
+        return stream_csv(BookingResource(), queryset.select_related('guest', 'room'), 'bookings.csv')
+
+    @admin.action(description='Экспорт в XLSX (потоковый)', permissions=['export'])
+    def export_xlsx_stream(self, request, queryset):
+        return xlsx_response(BookingResource(), queryset.select_related('guest', 'room'), 'bookings.xlsx')
+
+    @admin.action(description='Экспорт в CSV (в фоне)', permissions=['export'])
+    def export_csv_background(self, request, queryset):
+        self._enqueue_export(request, queryset, 'csv')
+
+    @admin.action(description='Экспорт в XLSX (в фоне)', permissions=['export'])
+    def export_xlsx_background(self, request, queryset):
+        self._enqueue_export(request, queryset, 'xlsx')
+
+    def _enqueue_export(self, request, queryset, file_format):
+        """
+        Ставит экспорт в очередь и сразу возвращает ответ, не читая строк: сохраняются параметры
+        списка и отмеченные записи (если не выбраны все найденные). Файл готовит команда run_export_worker.
+        """
+        select_across = request.POST.get('select_across') == '1'
+        job = enqueue_export(
+            BookingResource, file_format,
+            filter_params=dict(request.GET.lists()),
+            object_ids=() if select_across else request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            user=request.user,
+        )
+        url = reverse('admin:bookings_exportjob_change', args=[job.pk])
+        self.message_user(request, format_html('Экспорт поставлен в очередь: <a href="{}">{}</a>', url, job))
 
 
 @admin.register(Payment)
-class PaymentAdmin(SimpleHistoryAdmin):
+class PaymentAdmin(EstimatedCountAdminMixin, SimpleHistoryAdmin):
     list_display = ('booking', 'amount', 'payment_date', 'guest_name', 'room_number')
+    list_select_related = ('booking__guest', 'booking__room')
     list_filter = ('payment_date', 'booking__room__room_type')  # Фильтр по типу комнаты
     date_hierarchy = 'payment_date'
     search_fields = ('booking__guest__first_name', 'booking__guest__last_name', 'booking__room__room_number')
@@ -84,8 +170,9 @@ class PaymentAdmin(SimpleHistoryAdmin):
 
 
 @admin.register(Review)
-class ReviewAdmin(SimpleHistoryAdmin):
+class ReviewAdmin(EstimatedCountAdminMixin, SimpleHistoryAdmin):
     list_display = ('guest_name', 'room', 'rating', 'comment_preview', 'review_date')
+    list_select_related = ('room',)
     list_filter = ('rating', 'review_date', 'room__room_type')  # Фильтр по типу комнаты
     search_fields = ('guest_name', 'room__name', 'room__room_number')
     readonly_fields = ('rating', 'comment', 'review_date')
@@ -115,6 +202,68 @@ class AmenityAdmin(SimpleHistoryAdmin):
     )
     readonly_fields = ('related_rooms_count',)  # Вычисляемое поле
 
-    @admin.display(description='Количество связанных комнат')
+    def get_queryset(self, request):
+        # Количество комнат считается в том же запросе, что и список удобств
+        return super().get_queryset(request).annotate(rooms_count=Count('room'))
+
+    @admin.display(description='Количество связанных комнат', ordering='rooms_count')
     def related_rooms_count(self, obj):
-        return obj.room_set.count()  # Подсчёт связанных комнат через ForeignKey
+        return obj.rooms_count
+
+
+def job_model(job):
+    return import_string(job.resource)._meta.model
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'resource', 'file_format', 'status', 'progress', 'created_by', 'created_at',
+                    'download_link')
+    list_select_related = ('created_by',)
+    list_filter = ('status', 'file_format')
+    fields = ('resource', 'file_format', 'status', 'progress', 'download_link', 'created_by', 'created_at',
+              'started_at', 'finished_at', 'error')
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False  # Задачи создаются действиями экспорта в BookingAdmin
+
+    def has_download_permission(self, request, job):
+        """
+        Скачать файл может пользователь с доступом к задаче и правом экспорта её модели.
+        """
+        if not self.has_view_permission(request, job):
+            return False
+        code = getattr(settings, 'IMPORT_EXPORT_EXPORT_PERMISSION_CODE', None)
+        if code is None:
+            return True
+        opts = job_model(job)._meta
+        return request.user.has_perm(f'{opts.app_label}.{get_permission_codename(code, opts)}')
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                 name='bookings_exportjob_download'),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        """
+        Отдача готового файла экспорта (файлы лежат вне MEDIA_ROOT и напрямую недоступны).
+        """
+        job = get_object_or_404(ExportJob, pk=pk, status=ExportJob.STATUS_DONE)
+        if not job.file or not self.has_download_permission(request, job):
+            raise Http404
+        filename = f'{job_model(job)._meta.model_name}_{job.pk}.{job.file_format}'
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=filename)
+
+    @admin.display(description='Прогресс (строк)')
+    def progress(self, obj):
+        if obj.total_rows is None:
+            return obj.rows_processed
+        return f"{obj.rows_processed} / {obj.total_rows}"
+
+    @admin.display(description='Файл')
+    def download_link(self, obj):
+        if not obj.file or obj.status != ExportJob.STATUS_DONE:
+            return '-'
+        return format_html('<a href="{}">Скачать</a>', reverse('admin:bookings_exportjob_download', args=[obj.pk]))
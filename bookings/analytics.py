@@ -0,0 +1,176 @@
+# bookings/analytics.py
+"""
+Загрузка и выручка номеров по дневной сводке DailyRoomStat.
+
+Каждая бронь раскладывается на ночи: строка на ночь с равной долей стоимости брони
+и суммы её оплаты (Booking.amount_paid). Строки пересоздаются при сохранении брони
+и изменении её платежей (сигнал booking_payments_changed),
+удаляются каскадно вместе с бронью. Массовые вставки учитываются по сигналу
+bookings_bulk_created, полный пересчёт - команда backfill_daily_stats.
+
+Отчёт за период - суммы по покрывающему индексу (date, room, revenue, paid):
+    occupancy = занятые ночи / (номера * дни)
+    ADR       = выручка / занятые ночи
+    RevPAR    = выручка / (номера * дни)
+"""
+import datetime
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Booking, DailyRoomStat, Room
+from .signals import booking_payments_changed, bookings_bulk_created
+
+NIGHT = datetime.timedelta(days=1)
+CENT = Decimal('0.01')
+ROLLUP_CHUNK_SIZE = 5000
+GROUP_BY = ('room', 'room_type', 'total')
+
+
+def split_amount(amount, parts):
+    """
+    Равные доли суммы с точностью до копейки; остаток округления - в последнюю долю.
+    """
+    amount = Decimal(amount or 0)
+    share = (amount / parts).quantize(CENT, rounding=ROUND_DOWN)
+    return [share] * (parts - 1) + [amount - share * (parts - 1)]
+
+
+def build_nights(booking):
+    nights = (booking.check_out - booking.check_in).days
+    if nights <= 0:
+        return []
+    revenue = split_amount(booking.total_price, nights)
+    paid = split_amount(booking.amount_paid, nights)
+    return [
+        DailyRoomStat(room_id=booking.room_id, booking_id=booking.pk, date=booking.check_in + night * NIGHT,
+                      revenue=revenue[night], paid=paid[night])
+        for night in range(nights)
+    ]
+
+
+def rollup_bookings(bookings, replace=True):
+    """
+    Пересоздаёт строки сводки для броней порциями по ROLLUP_CHUNK_SIZE.
+    replace=False - не удалять старые строки (полный пересчёт после очистки таблицы).
+    """
+    bookings = list(bookings)
+    with transaction.atomic():
+        for start in range(0, len(bookings), ROLLUP_CHUNK_SIZE):
+            chunk = bookings[start:start + ROLLUP_CHUNK_SIZE]
+            ids = [booking.pk for booking in chunk]
+            if replace:
+                DailyRoomStat.objects.filter(booking_id__in=ids).delete()
+            DailyRoomStat.objects.bulk_create(
+                [night for booking in chunk for night in build_nights(booking)],
+                batch_size=ROLLUP_CHUNK_SIZE,
+            )
+
+
+def rollup_booking_ids(booking_ids):
+    rollup_bookings(Booking.objects.filter(pk__in=[pk for pk in booking_ids if pk is not None]))
+
+
+def backfill_daily_stats(chunk_size=ROLLUP_CHUNK_SIZE, progress=None):
+    """
+    Полный пересчёт сводки по всем броням. Возвращает число обработанных броней.
+    """
+    processed = 0
+    with transaction.atomic():
+        DailyRoomStat.objects.all().delete()
+        bookings = Booking.objects.order_by('pk').only('room_id', 'check_in', 'check_out', 'total_price', 'amount_paid')
+        chunk = []
+        for booking in bookings.iterator(chunk_size=chunk_size):
+            chunk.append(booking)
+            if len(chunk) >= chunk_size:
+                rollup_bookings(chunk, replace=False)
+                processed += len(chunk)
+                chunk = []
+                if progress:
+                    progress(processed)
+        rollup_bookings(chunk, replace=False)
+        processed += len(chunk)
+    return processed
+
+
+def _metrics(rooms, days, occupied, revenue, paid):
+    available = rooms * days
+    revenue = revenue or Decimal(0)
+    return {
+        'rooms': rooms,
+        'available_nights': available,
+        'occupied_nights': occupied,
+        'occupancy': round(occupied / available, 4) if available else None,
+        'revenue': revenue.quantize(CENT),
+        'paid': (paid or Decimal(0)).quantize(CENT),
+        'adr': (revenue / occupied).quantize(CENT) if occupied else None,
+        'revpar': (revenue / available).quantize(CENT) if available else None,
+    }
+
+
+def occupancy_report(start, end, group_by='room_type', room_type=None):
+    """
+    Загрузка, выручка, ADR и RevPAR за ночи [start, end) по номерам, типам номеров или в целом.
+    Сводка группируется по номеру одним запросом по индексу; типы номеров и итог
+    складываются в Python (номеров сотни, строк сводки - сотни тысяч). Число доступных
+    ночей считается по номерам, существующим сейчас.
+    """
+    days = (end - start).days
+    rooms = Room.objects.order_by()
+    if room_type:
+        rooms = rooms.filter(room_type=room_type)
+    rooms = list(rooms.values_list('pk', 'name', 'room_type'))
+    stats = DailyRoomStat.objects.filter(date__gte=start, date__lt=end).order_by()
+    if room_type:
+        stats = stats.filter(room_id__in=[pk for pk, _, _ in rooms])
+    aggregates = {'occupied': Count('*'), 'revenue': Sum('revenue'), 'paid': Sum('paid')}
+
+    report = {'date_range': [start, end], 'days': days, 'group_by': group_by}
+    if group_by == 'total':
+        total = stats.aggregate(**aggregates)
+        report['total'] = _metrics(len(rooms), days, total['occupied'], total['revenue'], total['paid'])
+        return report
+
+    by_room = {row.pop('room'): row for row in stats.values('room').annotate(**aggregates)}
+    groups = {}
+    for pk, name, type_name in sorted(rooms, key=lambda room: room[1]):
+        key = pk if group_by == 'room' else type_name
+        labels = {'room': pk, 'room_name': name} if group_by == 'room' else {'room_type': type_name}
+        group = groups.setdefault(key, {'labels': labels, 'rooms': 0, 'occupied': 0, 'revenue': 0, 'paid': 0})
+        row = by_room.get(pk, {})
+        group['rooms'] += 1
+        group['occupied'] += row.get('occupied', 0)
+        group['revenue'] += row.get('revenue') or 0
+        group['paid'] += row.get('paid') or 0
+
+    report['total'] = _metrics(
+        len(rooms), days,
+        *(sum(group[field] for group in groups.values()) for field in ('occupied', 'revenue', 'paid')),
+    )
+    ordered = groups.values() if group_by == 'room' else [groups[key] for key in sorted(groups, key=str)]
+    report['results'] = [
+        {**group['labels'], **_metrics(group['rooms'], days, group['occupied'], group['revenue'], group['paid'])}
+        for group in ordered
+    ]
+    return report
+
+
+@receiver(post_save, sender=Booking)
+def rollup_saved_booking(sender, instance, raw=False, **kwargs):
+    if not raw:
+        # Бронь перечитывается: amount_paid экземпляра мог устареть (его меняют только платежи)
+        rollup_booking_ids([instance.pk])
+
+
+@receiver(bookings_bulk_created)
+def rollup_bulk_created_bookings(sender, bookings, **kwargs):
+    rollup_bookings(bookings)
+
+
+@receiver(booking_payments_changed)
+def rollup_paid_bookings(sender, booking_ids, **kwargs):
+    # После коммита: при каскадном удалении брони её строки сводки не должны создаваться заново
+    transaction.on_commit(lambda: rollup_booking_ids(booking_ids))
@@ -1,14 +1,27 @@
 # bookings/api_views.py
-from django.db.models import Q
+import datetime
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
 from django.utils import timezone
-from rest_framework import viewsets
+from rest_framework import serializers, viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 
+from .analytics import GROUP_BY, occupancy_report
+from .availability import free_rooms, parse_date_range
+from .bulk_import import import_bookings, parse_csv, parse_ndjson
+from .conditional import ConditionalListMixin, conditional_get
+from .fast_reads import ValuesSerializer, fast_reads_enabled
 from .models import Amenity, Room, Guest, Booking, Payment, Review
+from .pricing import quote_rooms
+from .reservations import RoomUnavailable, ensure_room_is_free, lock_room
+from .search import FullTextSearchFilter
 from .serializers import (
     AmenitySerializer,
+    AvailableRoomSerializer,
     RoomSerializer,
     GuestSerializer,
     BookingSerializer,
@@ -17,12 +30,65 @@ from .serializers import (
 )
 
 
-class AmenityViewSet(viewsets.ModelViewSet):
+class QueryPlanMixin:
+    """
+    Применяет к queryset вьюсета объявленный план select_related/prefetch_related.
+
+    query_plan: {'<action>': {'select_related': (...), 'prefetch_related': (...)}};
+    ключ '*' - план для действий, у которых нет собственного.
+    query_budget - допустимое число SQL-запросов на страницу списка (команда check_query_budget).
+    """
+    query_plan = {}
+    query_budget = 3
+
+    def get_queryset(self):
+        return self.apply_query_plan(super().get_queryset())
+
+    def apply_query_plan(self, queryset):
+        plan = self.query_plan.get(self.action, self.query_plan.get('*', {}))
+        if plan.get('select_related'):
+            queryset = queryset.select_related(*plan['select_related'])
+        if plan.get('prefetch_related'):
+            queryset = queryset.prefetch_related(*plan['prefetch_related'])
+        return queryset
+
+
+class ValuesListMixin:
+    """
+    Списки без экземпляров моделей: list и serialize_list() строят ответ из queryset.values()
+    (ValuesSerializer) с той же схемой, что и serializer_class. Создание и изменение идут
+    через сериализатор. Отключается настройкой BOOKINGS_FAST_READS.
+    """
+
+    def get_values_serializer(self):
+        if not fast_reads_enabled():
+            return None
+        return ValuesSerializer(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer()
+        if values_serializer is None:
+            return super().list(request, *args, **kwargs)
+        queryset = values_serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.to_representation(page))
+        return Response(values_serializer.to_representation(queryset))
+
+    def serialize_list(self, queryset):
+        values_serializer = self.get_values_serializer()
+        if values_serializer is None:
+            return self.get_serializer(queryset, many=True).data
+        return values_serializer.to_representation(values_serializer.values(queryset))
+
+
+class AmenityViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = Amenity.objects.all()
     serializer_class = AmenitySerializer
     filter_backends = [SearchFilter, OrderingFilter]
     search_fields = ['name']
     ordering_fields = ['name']
+    conditional_resources = ('amenities',)
 
     def get_queryset(self):
         """
@@ -39,6 +105,7 @@ class AmenityViewSet(viewsets.ModelViewSet):
         return queryset
 
     @action(methods=['GET'], detail=False)
+    @conditional_get
     def popular_amenities(self, request):
         """
         Кастомный endpoint для получения популярных удобств (пример: используется в более чем 5 комнатах).
@@ -60,39 +127,142 @@ class AmenityViewSet(viewsets.ModelViewSet):
         return Response({'message': f'Удобство "{amenity.name}" отмечено как популярное!'})
 
 
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(ConditionalListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Room.objects.all().order_by('price_per_night')  # Упорядочим по цене за ночь
     serializer_class = RoomSerializer
+    query_plan = {
+        # Вложенные AmenitySerializer и RoomRatingSerializer
+        '*': {'select_related': ('rating',), 'prefetch_related': ('amenities',)},
+        'is_valid_to_book': {},
+        'quote': {},
+    }
+    conditional_resources = ('rooms',)  # Вложенные удобства и рейтинги тоже обновляют версию 'rooms'
+    query_budget = 4  # available: число номеров, страница, удобства и сезонные тарифы страницы
+    max_quotes = 20000  # Номеров x диапазонов в одном запросе /quote/
+    max_quote_window_days = 3 * 366
+
+    def get_queryset(self):
+        """
+        ?order_by=rating - сначала номера с лучшей средней оценкой (по сводке RoomRating, без агрегации отзывов).
+        """
+        queryset = super().get_queryset()
+        if self.request.query_params.get('order_by') == 'rating':
+            queryset = queryset.order_by(F('rating__average').desc(nulls_last=True),
+                                         F('rating__review_count').desc(nulls_last=True), 'pk')
+        return queryset
 
     @action(methods=['GET'], detail=False)
     def is_valid_to_book(self, request):
         """
-        Фильтрация комнаты на предмет возможности аренды в заданном промежутке времени
+        Проверка возможности аренды комнаты в заданном промежутке времени [заезд, выезд).
         Пример: /api/rooms/is_valid_to_book?room_name=Deluxe&date_range=2024-01-01,2024-01-10
+        или по id комнаты: /api/rooms/is_valid_to_book?room=3&date_range=2024-01-01,2024-01-10
         """
+        room_id = request.query_params.get('room', None)
         room_name = request.query_params.get('room_name', None)
         date_range = request.query_params.get('date_range', None)
 
-        query = Q()
-        room_exist_query = Q()
-        if room_name and date_range:
-            room_exist_query &= Q(room__name__icontains=room_name)
-            query &= Q(room__name__icontains=room_name)
-            start_date, end_date = date_range.split(',')
-            query &= Q(check_in__gte=start_date) & Q(check_out__lte=end_date)
-        else:
+        if not (room_id or room_name) or not date_range:
             return Response({"message": "Not enough conditions."}, status=200)
 
+        if room_id and not room_id.isdigit():
+            return Response({"message": "Invalid room id."}, status=400)
+
+        try:
+            start_date, end_date = parse_date_range(date_range)
+        except ValueError:
+            return Response({"message": "Invalid date range."}, status=400)
+
+        rooms = Room.objects.filter(pk=room_id) if room_id else Room.objects.filter(name__icontains=room_name)
+        room_ids = list(rooms.order_by().values_list('id', flat=True))
+
         # Проверка на то что комната существует
-        if not Booking.objects.filter(room_exist_query).exists():
-            return Response({"message": f"Room '{room_name}' not found."}, status=200)
+        if not room_ids:
+            return Response({"message": f"Room '{room_id or room_name}' not found."}, status=200)
 
-        if Booking.objects.filter(query).exists():
-            # Заказы на эту комнату в этот промежуток времени уже есть.
-            return Response({"message": "This room is already booked."}, status=200)
+        free = free_rooms(start_date, end_date, room_ids)
+        if not free:
+            # Все подходящие комнаты в этот промежуток времени уже заняты.
+            return Response({"message": "This room is already booked.", "free_rooms": []}, status=200)
         else:
-            # Заказы на эту комнату в этот промежуток времени нет, комнату можно заказать.
-            return Response({"message": "This room is ready to book."}, status=200)
+            # Хотя бы одна подходящая комната свободна, её можно заказать.
+            return Response({"message": "This room is ready to book.", "free_rooms": free}, status=200)
+
+    @action(methods=['GET'], detail=False)
+    def available(self, request):
+        """
+        Поиск свободных комнат на даты [заезд, выезд) с учётом вместимости и удобств одним запросом.
+        Пример: /api/rooms/available/?date_range=2024-01-01,2024-01-10&guests=2&amenities=Wi-Fi,Сейф
+        """
+        date_range = request.query_params.get('date_range', None)
+        if not date_range:
+            return Response({"message": "Not enough conditions."}, status=400)
+
+        try:
+            start_date, end_date = parse_date_range(date_range)
+            guests = int(request.query_params.get('guests', 1))
+        except ValueError:
+            return Response({"message": "Invalid date range or guests."}, status=400)
+
+        # Исключаем комнаты, у которых есть бронь, пересекающаяся с [start_date, end_date)
+        overlapping = Booking.objects.filter(room=OuterRef('pk'), check_in__lt=end_date, check_out__gt=start_date)
+        queryset = self.get_queryset().filter(max_occupancy__gte=guests).exclude(Exists(overlapping))
+
+        # Комната должна содержать ВСЕ перечисленные удобства
+        amenities = request.query_params.get('amenities', None)
+        if amenities:
+            names = {name.strip() for name in amenities.split(',') if name.strip()}
+            queryset = queryset.annotate(
+                matched_amenities=Count('amenities', filter=Q(amenities__name__in=names), distinct=True)
+            ).filter(matched_amenities=len(names))
+
+        page = self.paginate_queryset(queryset)
+        rooms = page if page is not None else list(queryset)
+        for room, quote in zip(rooms, quote_rooms(rooms, [(start_date, end_date)])):
+            room.nights = quote.nights
+            room.total_price = quote.total_price
+
+        serializer = AvailableRoomSerializer(rooms, many=True, context=self.get_serializer_context())
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    @action(methods=['GET', 'POST'], detail=False)
+    def quote(self, request):
+        """
+        Стоимость проживания для набора номеров и диапазонов дат одним запросом (сезонные тарифы,
+        выходные, скидки за длительность). Без rooms - все номера.
+        GET: /api/rooms/quote/?rooms=1,2&date_range=2024-01-01,2024-01-05&date_range=2024-02-01,2024-02-03
+        POST: {"rooms": [1, 2], "date_ranges": ["2024-01-01,2024-01-05", "2024-02-01,2024-02-03"]}
+        """
+        if request.method == 'POST':
+            room_ids = request.data.get('rooms')
+            date_ranges = request.data.get('date_ranges') or []
+            room_ids = room_ids.split(',') if isinstance(room_ids, str) else room_ids
+            date_ranges = [date_ranges] if isinstance(date_ranges, str) else date_ranges
+        else:
+            room_ids = request.query_params.get('rooms')
+            room_ids = room_ids.split(',') if room_ids else None
+            date_ranges = request.query_params.getlist('date_range')
+        if not date_ranges:
+            return Response({"message": "Not enough conditions."}, status=400)
+
+        try:
+            date_ranges = [parse_date_range(date_range) for date_range in date_ranges]
+            room_ids = None if room_ids is None else [int(room_id) for room_id in room_ids]
+        except (AttributeError, TypeError, ValueError):
+            return Response({"message": "Invalid date range or rooms."}, status=400)
+        window = max(end for _, end in date_ranges) - min(start for start, _ in date_ranges)
+        if window.days > self.max_quote_window_days:
+            return Response({"message": f"Date ranges must fit in {self.max_quote_window_days} days."}, status=400)
+
+        rooms = Room.objects.order_by('pk').only('pk', 'price_per_night', 'room_type')
+        if room_ids is not None:
+            rooms = rooms.filter(pk__in=room_ids)
+        rooms = list(rooms[:self.max_quotes // len(date_ranges) + 1])
+        if len(rooms) * len(date_ranges) > self.max_quotes:
+            return Response({"message": f"Too many quotes requested (max {self.max_quotes})."}, status=400)
+        return Response({"quotes": [quote.as_dict() for quote in quote_rooms(rooms, date_ranges)]})
 
     @action(methods=['GET'], detail=False)
     def filter_rooms(self, request):
@@ -168,24 +338,9 @@ class RoomViewSet(viewsets.ModelViewSet):
 class GuestViewSet(viewsets.ModelViewSet):
     queryset = Guest.objects.all()
     serializer_class = GuestSerializer
-    filter_backends = [SearchFilter]
+    filter_backends = [FullTextSearchFilter]  # Поиск по имени, фамилии, email и телефону через FTS5
     search_fields = ['first_name', 'last_name', 'email', 'phone_number']
-
-    def get_queryset(self):
-        """
-        Доработка queryset с использованием Q-выражений.
-        Например, поиск по имени, фамилии или email.
-        """
-        queryset = super().get_queryset()
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(phone_number__icontains=search)
-            )
-        return queryset
+    search_index = 'guest'
 
     @action(methods=['GET'], detail=False)
     def recent_guests(self, request):
@@ -208,30 +363,24 @@ class GuestViewSet(viewsets.ModelViewSet):
         return Response({'message': f'Гость "{guest.first_name} {guest.last_name}" заблокирован.'})
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(ValuesListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
-    filter_backends = [SearchFilter, OrderingFilter]
+    # Сериализатор отдаёт только id гостя и номера - связанные объекты не читаются
+    query_plan = {}
+    filter_backends = [FullTextSearchFilter, OrderingFilter]
     search_fields = ['booking_name', 'guest__first_name', 'guest__last_name', 'room__room_number']
+    search_index = 'booking'
     ordering_fields = ['check_in', 'check_out', 'total_price']
 
     def get_queryset(self):
         """
-        Доработка queryset с использованием Q-выражений для поиска.
+        Доработка queryset с использованием Q-выражений (поиск - FullTextSearchFilter).
         """
         queryset = super().get_queryset()
-        search = self.request.query_params.get('search')
         check_in_after = self.request.query_params.get('check_in_after')
         check_out_before = self.request.query_params.get('check_out_before')
 
-        if search:
-            queryset = queryset.filter(
-                Q(guest__first_name__icontains=search) |
-                Q(guest__last_name__icontains=search) |
-                Q(booking_name__icontains=search) |
-                Q(room__room_number__icontains=search)
-            )
-
         if check_in_after:
             queryset = queryset.filter(check_in__gte=check_in_after)
 
@@ -240,12 +389,59 @@ class BookingViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def perform_create(self, serializer):
+        self._save_reservation(serializer)
+
+    def perform_update(self, serializer):
+        self._save_reservation(serializer)
+
+    def _save_reservation(self, serializer):
+        """
+        Проверка пересечения и сохранение брони в одной транзакции под блокировкой номера.
+        """
+        instance = serializer.instance
+        data = serializer.validated_data
+        room = data.get('room', instance.room if instance else None)
+        check_in = data.get('check_in', instance.check_in if instance else None)
+        check_out = data.get('check_out', instance.check_out if instance else None)
+        with transaction.atomic():
+            lock_room(room.pk)
+            try:
+                ensure_room_is_free(room.pk, check_in, check_out, exclude_booking_id=instance.pk if instance else None)
+            except RoomUnavailable as e:
+                raise serializers.ValidationError({'room': [str(e)]})
+            serializer.save()
+
+    @action(methods=['POST'], detail=False, parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def bulk(self, request):
+        """
+        Массовый импорт бронирований: JSON-список в теле запроса или файл (поле file) в формате CSV/NDJSON.
+        Корректные строки создаются, для остальных возвращаются ошибки с номером строки.
+        Пример: POST /api/bookings/bulk/ [{"guest": 1, "room": 2, "check_in": "2025-01-01", ...}, ...]
+        """
+        upload = request.FILES.get('file')
+        if upload is not None:
+            file_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+            if file_format not in ('csv', 'ndjson', 'jsonl'):
+                return Response({"message": "Поддерживаются файлы CSV и NDJSON."}, status=400)
+            try:
+                rows = parse_csv(upload) if file_format == 'csv' else parse_ndjson(upload)
+            except (ValueError, UnicodeDecodeError) as e:
+                return Response({"message": f"Не удалось разобрать файл: {e}"}, status=400)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response({"message": "Ожидается список бронирований или файл."}, status=400)
+
+        created, errors = import_bookings(rows)
+        return Response({'created': created, 'errors': errors}, status=201 if created else 400)
+
     @action(methods=['GET'], detail=False)
     def filter_bookings(self, request):
         """
         Фильтрация бронирований по различным параметрам.
         Пример: /api/bookings/filter_bookings/?check_in_after=2024-01-01&check_out_before=2025-02-10
-        &min_total_price=70&max_total_price=500&is_paid=False
+        &min_total_price=70&max_total_price=500&is_paid=False&min_amount_paid=0&max_amount_paid=100
         """
         queryset = self.get_queryset()
         query = Q()
@@ -276,6 +472,15 @@ class BookingViewSet(viewsets.ModelViewSet):
             # queryset = queryset.filter(is_paid=is_paid)
             query &= ~Q(is_paid=is_paid)
 
+        # Фильтрация по сумме оплаты
+        min_amount_paid = request.query_params.get('min_amount_paid', None)
+        if min_amount_paid:
+            query &= Q(amount_paid__gte=float(min_amount_paid))
+
+        max_amount_paid = request.query_params.get('max_amount_paid', None)
+        if max_amount_paid:
+            query &= Q(amount_paid__lte=float(max_amount_paid))
+
         # Фильтрация по гостю
         guest = request.query_params.get('guest', None)
         if guest:
@@ -286,36 +491,40 @@ class BookingViewSet(viewsets.ModelViewSet):
         queryset = queryset.filter(query)
 
         # Сериализация и возврат результата
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(self.serialize_list(queryset))
 
     @action(methods=['GET'], detail=False)
     def active_bookings(self, request):
         """
         Кастомный endpoint для получения активных бронирований.
         """
-        active_bookings = Booking.objects.filter(
+        active_bookings = self.apply_query_plan(Booking.objects.all()).filter(
             Q(check_in__lte=timezone.now().date()) &
             Q(check_out__gte=timezone.now().date())
         )
-        serializer = self.get_serializer(active_bookings, many=True)
-        return Response(serializer.data)
+        return Response(self.serialize_list(active_bookings))
 
     @action(methods=['POST'], detail=True)
     def mark_as_paid(self, request, pk=None):
         """
-        Отметить бронирование как оплаченное.
+        Отметить бронирование как оплаченное: создаётся платёж на неоплаченный остаток.
         Пример: /api/bookings/1/mark_as_paid/
         """
         booking = self.get_object()
-        booking.is_paid = True
-        booking.save()
+        with transaction.atomic():
+            # Блокировка строки брони: параллельный запрос не создаст второй платёж на тот же остаток
+            booking = Booking.objects.select_for_update().get(pk=booking.pk)
+            if booking.balance_due > 0:
+                Payment.objects.create(booking=booking, amount=booking.balance_due,
+                                       payment_date=timezone.now().date())
         return Response({'message': f'Бронь "{booking.booking_name}" оплачена.'})
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(ValuesListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    # Сериализатор отдаёт только id брони - связанные объекты не читаются
+    query_plan = {}
     filter_backends = [SearchFilter, OrderingFilter]
     search_fields = ['booking__guest__first_name', 'booking__guest__last_name', 'booking__booking_name']
     ordering_fields = ['amount', 'payment_date']
@@ -353,35 +562,31 @@ class PaymentViewSet(viewsets.ModelViewSet):
         """
         Кастомный endpoint для получения последних 5 платежей.
         """
-        recent_payments = Payment.objects.all().order_by('-payment_date')[:5]
-        serializer = self.get_serializer(recent_payments, many=True)
-        return Response(serializer.data)
+        recent_payments = self.apply_query_plan(Payment.objects.all()).order_by('-payment_date')[:5]
+        return Response(self.serialize_list(recent_payments))
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
-    filter_backends = [SearchFilter, OrderingFilter]
+    query_plan = {
+        'custom_action': {'select_related': ('room',)},  # Ответ содержит название номера
+    }
+    filter_backends = [FullTextSearchFilter, OrderingFilter]
     search_fields = ['guest_name', 'room__name', 'comment']
+    search_index = 'review'
     ordering_fields = ['rating', 'review_date']
+    conditional_resources = ('reviews',)
 
     def get_queryset(self):
         """
-        Доработка queryset с использованием Q-выражений для фильтрации отзывов.
+        Доработка queryset с использованием Q-выражений для фильтрации отзывов (поиск - FullTextSearchFilter).
         """
         queryset = super().get_queryset()
-        search = self.request.query_params.get('search')
         min_rating = self.request.query_params.get('min_rating')
         max_rating = self.request.query_params.get('max_rating')
         review_date = self.request.query_params.get('review_date')
 
-        if search:
-            queryset = queryset.filter(
-                Q(guest_name__icontains=search) |
-                Q(room__name__icontains=search) |
-                Q(comment__icontains=search)
-            )
-
         if min_rating:
             queryset = queryset.filter(rating__gte=min_rating)
 
@@ -394,11 +599,12 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return queryset
 
     @action(methods=['GET'], detail=False)
+    @conditional_get
     def top_reviews(self, request):
         """
         Кастомный endpoint для получения отзывов с самым высоким рейтингом.
         """
-        top_reviews = Review.objects.filter(rating=5).order_by('-review_date')[:10]
+        top_reviews = self.apply_query_plan(Review.objects.filter(rating=5)).order_by('-review_date')[:10]
         serializer = self.get_serializer(top_reviews, many=True)
         return Response(serializer.data)
 
@@ -409,3 +615,30 @@ class ReviewViewSet(viewsets.ModelViewSet):
         """
         review = self.get_object()
         return Response({'message': f'Custom action performed on Review for {review.room.name}.'})
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """
+    Загрузка, выручка, ADR и RevPAR по дневной сводке номеров.
+    Пример: /api/analytics/?date_range=2024-01-01,2025-01-01&group_by=room_type&room_type=Suite
+    date_range - ночи [начало, конец), по умолчанию последние 30; group_by - room, room_type или total.
+    """
+    query_budget = 2  # Номера и суммы сводки по номерам
+    default_days = 30
+
+    def list(self, request):
+        date_range = request.query_params.get('date_range')
+        group_by = request.query_params.get('group_by', 'room_type')
+        if group_by not in GROUP_BY:
+            return Response({"message": f"group_by must be one of: {', '.join(GROUP_BY)}."}, status=400)
+        if date_range:
+            try:
+                start_date, end_date = parse_date_range(date_range)
+            except ValueError:
+                return Response({"message": "Invalid date range."}, status=400)
+        else:
+            end_date = timezone.now().date()
+            start_date = end_date - datetime.timedelta(days=self.default_days)
+
+        report = occupancy_report(start_date, end_date, group_by, request.query_params.get('room_type'))
+        return Response(report)
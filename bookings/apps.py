@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class BookingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bookings'
+
+    def ready(self):
+        from . import analytics  # noqa: F401 - дневная сводка загрузки и выручки
+        from . import catalogue  # noqa: F401 - сброс кэша каталога номеров
+        from . import conditional  # noqa: F401 - версии ресурсов для ETag/Last-Modified списков API
+        from . import payments  # noqa: F401 - сумма оплаты броней при изменении платежей
+        from . import ratings  # noqa: F401 - пересчёт рейтингов номеров при изменении отзывов
+        from . import search  # noqa: F401 - создание FTS-индексов после migrate
+        from . import thumbnails  # noqa: F401 - уменьшенные копии изображений номеров
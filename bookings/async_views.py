@@ -0,0 +1,123 @@
+# bookings/async_views.py
+"""
+Асинхронные версии нагруженных чтений API для запуска под ASGI (gunicorn + uvicorn worker).
+
+Запросы к базе идут через асинхронный ORM (async for, aget, afirst), поэтому воркер не
+занят, пока ждёт базу, и обслуживает другие запросы. Ответы совпадают с синхронными
+эндпоинтами (курсорная пагинация, те же сериализаторы):
+    /api/async/rooms/                  - как /api/rooms/
+    /api/async/rooms/is_valid_to_book/ - как /api/rooms/is_valid_to_book/
+    /api/async/reviews/                - как /api/reviews/ (фильтры min_rating, max_rating, review_date)
+
+Сериализаторы вызываются после загрузки строк со всеми связями (select_related/prefetch_related),
+поэтому сами к базе не обращаются. Под WSGI (runserver) эти представления тоже работают,
+но каждое выполняется в отдельном цикле событий.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.utils.urls import replace_query_param
+
+from .availability import afree_rooms, parse_date_range
+from .models import Review, Room
+from .pagination import (
+    COUNT_ESTIMATE, COUNT_EXACT, COUNT_MODES, InvalidCursor, KeysetPaginator, KeysetPagination, default_count_mode,
+    estimate_count,
+)
+from .serializers import ReviewSerializer, RoomSerializer
+
+JSON_OPTIONS = {'ensure_ascii': False}
+
+
+def page_size(request):
+    try:
+        size = int(request.GET['page_size'])
+    except (KeyError, ValueError):
+        return KeysetPagination.page_size
+    return min(size, KeysetPagination.max_page_size) if size > 0 else KeysetPagination.page_size
+
+
+def page_link(request, cursor):
+    if cursor is None:
+        return None
+    return replace_query_param(request.build_absolute_uri(), 'cursor', cursor)
+
+
+async def page_count(request, queryset):
+    """
+    (количество строк, точное ли оно) по параметру count, как KeysetPagination.get_count.
+    """
+    mode = request.GET.get('count')
+    if mode not in COUNT_MODES:
+        mode = default_count_mode()
+    if mode == COUNT_EXACT:
+        return await queryset.acount(), True
+    if mode == COUNT_ESTIMATE:
+        return await sync_to_async(estimate_count)(queryset)
+    return None, False
+
+
+async def paginated_response(request, queryset, serializer_class):
+    """
+    Страница queryset в формате KeysetPagination: {"count", "next", "previous", "results"}.
+    """
+    try:
+        page = await KeysetPaginator(queryset, page_size(request)).apage(request.GET.get('cursor'))
+    except InvalidCursor:
+        return JsonResponse({'detail': "Неверный курсор."}, status=404, json_dumps_params=JSON_OPTIONS)
+    count, count_is_exact = await page_count(request, queryset)
+    serializer = serializer_class(page, many=True, context={'request': request})
+    body = {
+        'count': count,
+        'next': page_link(request, page.next_cursor),
+        'previous': page_link(request, page.previous_cursor),
+        'results': serializer.data,
+    }
+    if count is not None and not count_is_exact:
+        body['count_is_estimate'] = True
+    return JsonResponse(body, json_dumps_params=JSON_OPTIONS)
+
+
+@require_GET
+async def room_list(request):
+    queryset = Room.objects.select_related('rating').prefetch_related('amenities').order_by('price_per_night')
+    return await paginated_response(request, queryset, RoomSerializer)
+
+
+@require_GET
+async def room_is_valid_to_book(request):
+    """
+    Проверка возможности аренды комнаты на [заезд, выезд): пересекающиеся брони ищутся в базе.
+    Пример: /api/async/rooms/is_valid_to_book/?room=3&date_range=2024-01-01,2024-01-10
+    """
+    room_id = request.GET.get('room')
+    room_name = request.GET.get('room_name')
+    date_range = request.GET.get('date_range')
+    if not (room_id or room_name) or not date_range:
+        return JsonResponse({"message": "Not enough conditions."})
+    if room_id and not room_id.isdigit():
+        return JsonResponse({"message": "Invalid room id."}, status=400)
+    try:
+        start_date, end_date = parse_date_range(date_range)
+    except ValueError:
+        return JsonResponse({"message": "Invalid date range."}, status=400)
+
+    rooms = Room.objects.filter(pk=room_id) if room_id else Room.objects.filter(name__icontains=room_name)
+    room_ids = [pk async for pk in rooms.order_by().values_list('id', flat=True)]
+    if not room_ids:
+        return JsonResponse({"message": f"Room '{room_id or room_name}' not found."})
+
+    free_rooms = await afree_rooms(start_date, end_date, room_ids)
+    if not free_rooms:
+        return JsonResponse({"message": "This room is already booked.", "free_rooms": []})
+    return JsonResponse({"message": "This room is ready to book.", "free_rooms": free_rooms})
+
+
+@require_GET
+async def review_list(request):
+    queryset = Review.objects.all()
+    for param, lookup in (('min_rating', 'rating__gte'), ('max_rating', 'rating__lte'),
+                          ('review_date', 'review_date')):
+        if request.GET.get(param):
+            queryset = queryset.filter(**{lookup: request.GET[param]})
+    return await paginated_response(request, queryset, ReviewSerializer)
@@ -0,0 +1,100 @@
+# bookings/availability.py
+"""
+Проверка занятости номеров.
+
+Занятость читается из базы при каждом запросе: одна выборка пересекающихся броней
+(check_in < b и check_out > a) по индексу booking_room_dates_idx. Кэша в памяти процесса нет -
+брони создают несколько воркеров gunicorn, админка, импорт и фоновые задачи, а также
+QuerySet.update() в обход сигналов, и ответ должен учитывать их все.
+
+RoomIntervals - структура для проверки пересечений внутри одной пачки броней в памяти
+(массовый импорт, bulk_import.py).
+"""
+import datetime
+from bisect import bisect_left, insort
+
+from .models import Booking, Room
+
+
+def parse_date_range(value):
+    """
+    Разбор строки вида "2024-01-01,2024-01-10" в пару дат [check_in, check_out).
+    Бросает ValueError при неверном формате или пустом интервале.
+    """
+    start, end = (datetime.date.fromisoformat(part.strip()) for part in value.split(','))
+    if start >= end:
+        raise ValueError("Дата выезда должна быть позже даты заезда.")
+    return start, end
+
+
+class RoomIntervals:
+    """
+    Брони одного номера: (check_in, check_out, booking_id), отсортированные по check_in.
+    """
+
+    def __init__(self, intervals=()):
+        self.intervals = sorted(intervals)
+        self._rebuild(0)
+
+    def _rebuild(self, start):
+        """
+        Пересчёт вспомогательных массивов начиная с позиции start.
+        """
+        if not start:
+            self.starts, self.max_ends = [], []
+        else:
+            del self.starts[start:]
+            del self.max_ends[start:]
+        for check_in, check_out, _ in self.intervals[start:]:
+            self.starts.append(check_in)
+            self.max_ends.append(max(check_out, self.max_ends[-1]) if self.max_ends else check_out)
+
+    def add(self, check_in, check_out, booking_id):
+        item = (check_in, check_out, booking_id)
+        insort(self.intervals, item)
+        self._rebuild(bisect_left(self.intervals, item))
+
+    def remove(self, booking_id):
+        for position, item in enumerate(self.intervals):
+            if item[2] == booking_id:
+                del self.intervals[position]
+                self._rebuild(position)
+                return True
+        return False
+
+    def is_free(self, start, end):
+        """
+        Свободен ли номер на полуинтервал [start, end).
+        """
+        position = bisect_left(self.starts, end)  # брони с check_in < end
+        return position == 0 or self.max_ends[position - 1] <= start
+
+
+def overlapping_bookings(start, end, room_ids=None):
+    """
+    Брони, пересекающиеся с полуинтервалом [start, end).
+    """
+    bookings = Booking.objects.filter(check_in__lt=end, check_out__gt=start)
+    if room_ids is not None:
+        bookings = bookings.filter(room_id__in=room_ids)
+    return bookings.order_by().values_list('room_id', flat=True).distinct()
+
+
+def free_rooms(start, end, room_ids=None):
+    """
+    Список id номеров, свободных на [start, end), в порядке room_ids.
+    Если room_ids не передан, проверяются все номера.
+    """
+    if room_ids is None:
+        room_ids = Room.objects.order_by('id').values_list('id', flat=True)
+    room_ids = list(room_ids)
+    busy = set(overlapping_bookings(start, end, room_ids))
+    return [room_id for room_id in room_ids if room_id not in busy]
+
+
+async def afree_rooms(start, end, room_ids):
+    """
+    free_rooms() для асинхронных представлений (асинхронный ORM).
+    """
+    busy = {room_id async for room_id in overlapping_bookings(start, end, room_ids)}
+    return [room_id for room_id in room_ids if room_id not in busy]
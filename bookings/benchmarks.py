@@ -0,0 +1,69 @@
+# bookings/benchmarks.py
+"""
+Общие утилиты нагрузочных проверок и бенчмарков (management-команды stress_*/benchmark_*).
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import override_settings
+
+SCRATCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'guesthouse-benchmark',
+    }
+}
+
+
+@contextmanager
+def scratch_database(keepdb=False):
+    """
+    Временная база данных со схемой проекта, чтобы замеры не трогали рабочие данные.
+
+    Для SQLite база создаётся файлом (а не в памяти): параллельные соединения из потоков
+    должны работать с обычными файловыми блокировками, как в продакшене.
+    На время работы разрешается хост testserver, чтобы запросы можно было слать тестовым клиентом,
+    а кэш заменяется на LocMemCache: записи каталога и версии ресурсов временной базы не должны
+    попасть в рабочий кэш (и рабочие - в замеры).
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+        test_settings['NAME'] = os.path.join(tempfile.gettempdir(), 'guesthouse_benchmark.sqlite3')
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], CACHES=SCRATCH_CACHES):
+            try:
+                yield
+            finally:
+                cache.clear()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+class Timer:
+    """
+    Секундомер для блока with: elapsed - прошедшее время в секундах.
+    """
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.started
+
+
+def percentile(values, fraction):
+    """
+    Перцентиль (fraction от 0 до 1) по ближайшему рангу; values должны быть отсортированы.
+    """
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
@@ -0,0 +1,178 @@
+# bookings/bulk_import.py
+"""
+Массовый импорт броней (например, синхронизация с channel manager).
+
+Строки проверяются одним проходом без запросов на каждую строку: гости и номера
+загружаются пачкой, пересечения ищутся по отсортированным интервалам каждого номера
+(существующие брони читаются одним запросом), вставка идёт через bulk_create порциями.
+"""
+import csv
+import datetime
+import io
+import json
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .availability import RoomIntervals
+from .history import bulk_create_history
+from .models import Booking, Guest, Room
+from .signals import bookings_bulk_created
+
+IMPORT_CHUNK_SIZE = 1000
+LOOKUP_CHUNK_SIZE = 5000
+REQUIRED_FIELDS = ('guest', 'room', 'check_in', 'check_out', 'total_price', 'booking_name')
+
+
+def parse_csv(file):
+    """
+    Строки CSV с заголовком (имена колонок совпадают с полями BookingSerializer).
+    """
+    return list(csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline='')))
+
+
+def parse_ndjson(file):
+    """
+    Один JSON-объект на строку; пустые строки пропускаются.
+    """
+    return [json.loads(line) for line in io.TextIOWrapper(file, encoding='utf-8') if line.strip()]
+
+
+def _clean_row(row, today):
+    """
+    Проверка значений одной строки без обращения к базе. Возвращает (данные, ошибки).
+    """
+    errors = {}
+    data = {}
+    if not isinstance(row, dict):
+        return None, {'non_field_errors': ["Ожидается объект с полями брони."]}
+    for field in REQUIRED_FIELDS:
+        if row.get(field) in (None, ''):
+            errors[field] = ["Обязательное поле."]
+    if errors:
+        return None, errors
+
+    for field in ('guest', 'room'):
+        try:
+            data[f'{field}_id'] = int(row[field])
+        except (TypeError, ValueError):
+            errors[field] = ["Ожидается целочисленный id."]
+    for field in ('check_in', 'check_out'):
+        value = row[field]
+        try:
+            data[field] = value if isinstance(value, datetime.date) else datetime.date.fromisoformat(str(value))
+        except ValueError:
+            errors[field] = ["Неверный формат даты, ожидается ГГГГ-ММ-ДД."]
+    try:
+        data['total_price'] = Decimal(str(row['total_price']))
+        if not data['total_price'].is_finite() or data['total_price'] < 0:
+            raise InvalidOperation
+        # max_digits и decimal_places столбца: иначе bulk_create падает на всей пачке
+        Booking._meta.get_field('total_price').run_validators(data['total_price'])
+    except InvalidOperation:
+        errors['total_price'] = ["Ожидается неотрицательное число."]
+    except ValidationError as e:
+        errors['total_price'] = e.messages
+    data['booking_name'] = str(row['booking_name'])[:255]
+    # Оплата ведётся платежами: новая бронь оплачена, только если она бесплатная
+    data['is_paid'] = data.get('total_price') == 0
+
+    if 'check_in' in data and 'check_out' in data:
+        if data['check_in'] >= data['check_out']:
+            errors['non_field_errors'] = ["Дата выезда должна быть позже даты заезда."]
+        elif data['check_in'] < today:
+            errors['non_field_errors'] = ["Дата заезда не может быть в прошлом."]
+    return (None, errors) if errors else (data, None)
+
+
+def _existing_ids(model, ids):
+    """
+    Какие из ids есть в таблице: несколько запросов пачками вместо запроса на строку.
+    """
+    ids = list(ids)
+    found = set()
+    for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        found.update(model.objects.filter(pk__in=ids[start:start + LOOKUP_CHUNK_SIZE]).values_list('pk', flat=True))
+    return found
+
+
+def import_bookings(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Импорт списка строк-словарей. Корректные строки вставляются, по остальным возвращаются ошибки.
+    Возвращает (количество созданных броней, [{'row': номер строки с 1, 'errors': {...}}]).
+    """
+    today = timezone.now().date()
+    errors = {}
+    cleaned = {}
+    for number, row in enumerate(rows, start=1):
+        data, row_errors = _clean_row(row, today)
+        if row_errors:
+            errors[number] = row_errors
+        else:
+            cleaned[number] = data
+
+    guest_ids = _existing_ids(Guest, {data['guest_id'] for data in cleaned.values()})
+    room_ids = _existing_ids(Room, {data['room_id'] for data in cleaned.values()})
+    for number, data in list(cleaned.items()):
+        row_errors = {}
+        if data['guest_id'] not in guest_ids:
+            row_errors['guest'] = [f"Гость {data['guest_id']} не найден."]
+        if data['room_id'] not in room_ids:
+            row_errors['room'] = [f"Номер {data['room_id']} не найден."]
+        if row_errors:
+            errors[number] = row_errors
+            del cleaned[number]
+
+    created = []
+    if cleaned:
+        with transaction.atomic():
+            accepted = _accept_non_overlapping(cleaned, errors)
+            bookings = [Booking(**cleaned[number]) for number in accepted]
+            for start in range(0, len(bookings), chunk_size):
+                created.extend(Booking.objects.bulk_create(bookings[start:start + chunk_size]))
+            bulk_create_history(Booking, created, batch_size=chunk_size)
+            bookings_bulk_created.send(sender=Booking, bookings=created)
+
+    return len(created), [{'row': number, 'errors': errors[number]} for number in sorted(errors)]
+
+
+def _accept_non_overlapping(cleaned, errors):
+    """
+    Отбор строк без пересечений с существующими бронями и друг с другом.
+    Интервалы группируются по номеру и обходятся в порядке дат заезда; из пересекающихся
+    новых броней остаётся более ранняя. Вызывается внутри транзакции импорта.
+    """
+    by_room = defaultdict(list)
+    for number, data in cleaned.items():
+        by_room[data['room_id']].append(number)
+
+    # Блокируем номера (на SQLite запись уже сериализована BEGIN IMMEDIATE, см. reservations.py)
+    list(Room.objects.select_for_update().filter(pk__in=list(by_room)).values_list('pk', flat=True))
+
+    min_check_in = min(data['check_in'] for data in cleaned.values())
+    max_check_out = max(data['check_out'] for data in cleaned.values())
+    existing = defaultdict(list)
+    rows = Booking.objects.filter(
+        room_id__in=list(by_room), check_in__lt=max_check_out, check_out__gt=min_check_in
+    ).order_by().values_list('room_id', 'check_in', 'check_out', 'id')
+    for room_id, check_in, check_out, booking_id in rows:
+        existing[room_id].append((check_in, check_out, booking_id))
+
+    accepted = []
+    for room_id, numbers in by_room.items():
+        intervals = RoomIntervals(existing[room_id])
+        numbers.sort(key=lambda number: (cleaned[number]['check_in'], number))
+        for number in numbers:
+            data = cleaned[number]
+            if intervals.is_free(data['check_in'], data['check_out']):
+                intervals.add(data['check_in'], data['check_out'], -number)
+                accepted.append(number)
+            else:
+                errors[number] = {'room': [
+                    f"Номер уже забронирован на даты {data['check_in']} - {data['check_out']}."
+                ]}
+    accepted.sort()
+    return accepted
@@ -0,0 +1,127 @@
+# bookings/catalogue.py
+"""
+Кэш каталога номеров на главной странице.
+
+Отрендеренные фрагменты (форма фильтра, карточки номеров, пагинация и список номеров
+для модальных окон) хранятся в кэше Django под ключом из нормализованных параметров
+фильтра, курсора страницы и признака суперпользователя. Повторный показ той же страницы
+не обращается к базе.
+
+Ключи включают номер версии каталога; сохранение и удаление Room/Amenity и изменение
+удобств номера после коммита транзакции записывают новую версию, и все старые записи
+перестают использоваться (и со временем вытесняются по таймауту).
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.http import QueryDict
+from django.template.loader import render_to_string
+
+from .filters import RoomFilter
+from .models import Amenity, Room
+from .pagination import keyset_page
+from .signals import room_thumbnails_ready
+from .thumbnails import srcset, thumbnail_urls
+
+VERSION_KEY = 'bookings:catalogue:version'
+PAGE_PARAMS = ('cursor',)
+
+
+def catalogue_timeout():
+    return getattr(settings, 'BOOKINGS_CATALOGUE_CACHE_TIMEOUT', 3600)
+
+
+def catalogue_version():
+    """
+    Текущая версия каталога. Если ключ вытеснен из кэша, берётся новое значение
+    (время в наносекундах), чтобы не совпасть с версией старых записей.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(VERSION_KEY, version, timeout=None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate_catalogue():
+    """
+    Новая версия каталога. Записывается время в наносекундах, а не cache.incr: на FileBasedCache
+    incr — неатомарное чтение и запись, и одно из двух параллельных увеличений терялось бы.
+    При гонке побеждает одна из записей, но любая из них отличается от прежней версии.
+    """
+    cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_catalogue_on_commit():
+    # До коммита параллельный запрос закэшировал бы старые данные под новой версией
+    transaction.on_commit(invalidate_catalogue)
+
+
+def normalized_params(query):
+    """
+    Параметры фильтра и страницы в каноническом виде: только известные ключи, без пустых
+    значений, ключи и множественные значения отсортированы. Порядок параметров в адресе
+    и лишние метки (utm_*) не создают отдельных записей кэша.
+    """
+    allowed = set(RoomFilter.base_filters) | set(PAGE_PARAMS)
+    params = QueryDict(mutable=True)
+    for key in sorted(allowed & set(query)):
+        values = sorted(value.strip() for value in query.getlist(key) if value.strip())
+        if values:
+            params.setlist(key, values)
+    return params
+
+
+def catalogue_cache_key(params, is_superuser):
+    digest = hashlib.md5(json.dumps([sorted(params.lists()), is_superuser]).encode()).hexdigest()
+    return f'bookings:catalogue:{catalogue_version()}:{digest}'
+
+
+def render_catalogue(request):
+    """
+    Фрагменты главной страницы для запроса: {'catalogue': html, 'room_options': html}.
+    """
+    params = normalized_params(request.GET)
+    is_superuser = request.user.is_superuser
+    key = catalogue_cache_key(params, is_superuser)
+    fragments = cache.get(key)
+    if fragments is None:
+        filterset = RoomFilter(params, queryset=Room.objects.prefetch_related('amenities'))
+        rooms = keyset_page(request, filterset.qs, 5, query=params)  # Страница по 5 объектов после курсора
+        for room in rooms:
+            room.thumbnails = thumbnail_urls(room)
+            room.srcset = {fmt: srcset(room.thumbnails, fmt) for fmt in ('webp', 'jpeg')}
+        context = {'rooms': rooms, 'filterset': filterset, 'is_superuser': is_superuser}
+        fragments = {
+            'catalogue': render_to_string('bookings/_room_catalogue.html', context),
+            'room_options': render_to_string('bookings/_room_options.html', context),
+        }
+        cache.set(key, fragments, catalogue_timeout())
+    return fragments
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def invalidate_catalogue_on_change(sender, **kwargs):
+    invalidate_catalogue_on_commit()
+
+
+@receiver(room_thumbnails_ready)
+def invalidate_catalogue_on_thumbnails(sender, **kwargs):
+    # Карточки переходят с адресов ленивой генерации на постоянные адреса копий
+    invalidate_catalogue_on_commit()
+
+
+@receiver(m2m_changed, sender=Room.amenities.through)
+def invalidate_catalogue_on_amenities_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_catalogue_on_commit()
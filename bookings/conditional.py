@@ -0,0 +1,132 @@
+# bookings/conditional.py
+"""
+Условные GET-запросы (ETag / Last-Modified) для редко меняющихся списков API.
+
+Для каждого ресурса ('rooms', 'amenities', 'reviews') в кэше хранится версия - время
+последнего изменения в наносекундах. Сигналы сохранения и удаления моделей обновляют её
+после коммита транзакции; массовые операции (bulk_create, update()) вызывают touch_resources().
+
+ETag ответа - хэш версий ресурсов, от которых он зависит, полного адреса и заголовка Accept,
+Last-Modified - время самого позднего изменения (последовательные версии различаются хотя бы
+на секунду, см. next_version). Совпадение If-None-Match (или If-Modified-Since) даёт
+ответ 304 без обращения к строкам таблиц и без сериализации.
+"""
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Amenity, Review, Room
+from .signals import room_thumbnails_ready
+
+VERSION_KEY = 'bookings:versions:{}'
+LATEST_VERSION_KEY = 'bookings:versions:latest'
+
+
+def next_version():
+    """
+    Текущее время (нс), но не раньше следующей секунды после последней выданной версии любого
+    ресурса. Last-Modified передаётся с точностью до секунды и берётся максимумом по нескольким
+    ресурсам: без этого изменение в ту же секунду, что и прошлый ответ, не изменило бы
+    Last-Modified, и If-Modified-Since дал бы 304 со старыми данными.
+    """
+    version = time.time_ns()
+    latest = cache.get(LATEST_VERSION_KEY)
+    if latest is not None:
+        version = max(version, (latest // 10 ** 9 + 1) * 10 ** 9)
+    cache.set(LATEST_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def resource_version(name):
+    """
+    Время последнего изменения ресурса (нс). Если ключ вытеснен из кэша, берётся новая
+    версия: клиенты один раз получат полный ответ, но не устаревшие данные.
+    """
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        version = next_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def touch_resources(*names):
+    version = next_version()
+    cache.set_many({VERSION_KEY.format(name): version for name in names}, timeout=None)
+
+
+def touch_resources_on_commit(*names):
+    # До коммита параллельный запрос получил бы новую версию вместе со старыми данными
+    transaction.on_commit(lambda: touch_resources(*names))
+
+
+def conditional_get(method):
+    """
+    Декоратор действия вьюсета с атрибутом conditional_resources: проверка If-None-Match и
+    If-Modified-Since до выполнения действия, заголовки ETag и Last-Modified в ответе 200.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        versions = [resource_version(name) for name in self.conditional_resources]
+        key = json.dumps([versions, request.build_absolute_uri(), request.META.get('HTTP_ACCEPT', '')])
+        etag = f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+        last_modified = max(versions) // 10 ** 9
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return response
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+    return wrapper
+
+
+class ConditionalListMixin:
+    """
+    Условный GET для list вьюсета; conditional_resources - ресурсы, от которых зависит ответ.
+    Дополнительные действия (@action) помечаются декоратором conditional_get.
+    """
+    conditional_resources = ()
+
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def touch_rooms(sender, **kwargs):
+    touch_resources_on_commit('rooms', 'amenities')  # Число номеров с удобством (popular_amenities)
+
+
+@receiver(m2m_changed, sender=Room.amenities.through)
+def touch_room_amenities(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        touch_resources_on_commit('rooms', 'amenities')  # Вложенные удобства номеров и популярные удобства
+
+
+@receiver(room_thumbnails_ready)
+def touch_rooms_on_thumbnails(sender, **kwargs):
+    touch_resources_on_commit('rooms')
+
+
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def touch_amenities(sender, **kwargs):
+    touch_resources_on_commit('amenities', 'rooms')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def touch_reviews(sender, **kwargs):
+    touch_resources_on_commit('reviews', 'rooms')  # Сводка рейтинга в списке номеров
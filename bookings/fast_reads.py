@@ -0,0 +1,155 @@
+# bookings/fast_reads.py
+"""
+Быстрое чтение списков API: строки из queryset.values() вместо экземпляров моделей и полей DRF.
+
+ValuesSerializer строит по ModelSerializer набор столбцов (имя в ответе, столбец values(),
+преобразование), один раз на класс сериализатора. Ответ совпадает с сериализатором:
+внешние ключи - id, Decimal - строка с нужным числом знаков, даты - ISO 8601.
+Поддерживаются простые поля модели; вложенные сериализаторы и SerializerMethodField - нет
+(ImproperlyConfigured при первом запросе). Запись по-прежнему идёт через сериализатор.
+
+Обязательные столбцы Decimal и дат приводятся к тексту в базе данных (DecimalText, Cast):
+ORM не создаёт Decimal и date, которые тут же снова превращались бы в строки.
+
+Включается настройкой BOOKINGS_FAST_READS (она же включает orjson в FastJSONRenderer).
+"""
+import decimal
+from functools import lru_cache
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .pagination import TEXT_COLUMN
+
+# Поля, значение которых из values() уже совпадает с представлением DRF
+IDENTITY_FIELDS = (serializers.BooleanField, serializers.CharField, serializers.IntegerField)
+
+
+def fast_reads_enabled():
+    return getattr(settings, 'BOOKINGS_FAST_READS', True)
+
+
+class DecimalText(Cast):
+    """
+    Десятичный столбец строкой с decimal_places знаками ('120.50'). PostgreSQL и MySQL сохраняют
+    масштаб numeric при приведении к тексту; SQLite хранит REAL, поэтому форматирует printf.
+    """
+
+    def __init__(self, expression, decimal_places):
+        super().__init__(expression, CharField())
+        self.decimal_places = decimal_places
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"printf('%%.{int(self.decimal_places)}f', {sql})", params
+
+
+def decimal_column(field, model_field):
+    """
+    (преобразование, выражение для текста в базе или None) для DecimalField.
+    """
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if (not coerce_to_string or field.decimal_places is None or field.normalize_output or field.localize
+            or field.max_digits is None):
+        return field.to_representation, None
+    if (model_field.decimal_places == field.decimal_places
+            and model_field.max_digits is not None and model_field.max_digits <= field.max_digits):
+        # Конвертер ORM уже привёл значение к decimal_places столбца
+        return '{:f}'.format, (lambda name: DecimalText(name, field.decimal_places))
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.Context(prec=field.max_digits)
+    return lambda value: f'{value.quantize(exponent, rounding=field.rounding, context=context):f}', None
+
+
+def column_plan(field, model_field):
+    """
+    (функция value -> представление DRF или None, если значение передаётся как есть;
+    функция attname -> выражение, дающее то же представление в базе, или None).
+    """
+    if isinstance(field, serializers.DecimalField):
+        convert, text = decimal_column(field, model_field)
+    elif isinstance(field, serializers.DateTimeField):
+        convert, text = field.to_representation, None  # Часовой пояс и формат - как у сериализатора
+    elif isinstance(field, serializers.DateField):
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if isinstance(output_format, str) and output_format.lower() == ISO_8601:
+            convert, text = (lambda value: value.isoformat()), (lambda name: Cast(name, CharField()))
+        else:
+            convert, text = field.to_representation, None
+    elif isinstance(field, IDENTITY_FIELDS) or isinstance(field, serializers.PrimaryKeyRelatedField):
+        convert, text = None, None
+    else:
+        convert, text = field.to_representation, None
+    # NULL в базе не форматируется (printf дал бы '0.00')
+    return convert, None if model_field.null else text
+
+
+@lru_cache(maxsize=None)
+def values_columns(serializer_class):
+    """
+    [(имя поля ответа, столбец values(), преобразование или None, выражение текста или None)].
+    """
+    model = serializer_class.Meta.model
+    columns = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)) or '.' in field.source:
+            raise ImproperlyConfigured(
+                f"{serializer_class.__name__}.{name}: поле не поддерживается ValuesSerializer."
+            )
+        model_field = model._meta.get_field(field.source)
+        columns.append((name, model_field.attname, *column_plan(field, model_field)))
+    return columns
+
+
+class ValuesSerializer:
+    """
+    Чтение сериализатора serializer_class по словарям из queryset.values().
+    """
+
+    def __init__(self, serializer_class):
+        self.columns = values_columns(serializer_class)
+        self.names = [name for name, _, _, _ in self.columns]
+        self.keys = None
+        self.converters = None
+
+    def values(self, queryset):
+        """
+        queryset.values() со столбцами ответа.
+        """
+        fields, expressions, self.keys, self.converters = [], {}, [], []
+        for name, key, convert, text in self.columns:
+            if text is not None:
+                alias = TEXT_COLUMN.format(key)
+                expressions[alias] = text(key)
+                self.keys.append(alias)
+                continue
+            fields.append(key)
+            self.keys.append(key)
+            if convert is not None:
+                self.converters.append((name, convert))
+        return queryset.values(*fields, **expressions)
+
+    def to_representation(self, rows):
+        """
+        Словари ответа для строк queryset, полученного из values() этого же экземпляра.
+        """
+        keys = self.keys
+        # Выборка и сборка словаря - в C (itemgetter, zip), в Python - только преобразования
+        getter = itemgetter(*keys) if len(keys) > 1 else (lambda row: (row[keys[0]],))
+        names, converters = self.names, self.converters
+        result = []
+        for row in rows:
+            item = dict(zip(names, getter(row)))
+            for name, convert in converters:
+                value = item[name]
+                if value is not None:
+                    item[name] = convert(value)
+            result.append(item)
+        return result
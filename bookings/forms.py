@@ -20,7 +20,7 @@ class BookingForm(forms.ModelForm):
 
     class Meta:
         model = Booking
-        fields = ['guest', 'room_id', 'room_name', 'check_in', 'check_out', 'total_price', 'is_paid']
+        fields = ['guest', 'room_id', 'room_name', 'check_in', 'check_out', 'total_price']
 
 
 class RoomForm(forms.ModelForm):
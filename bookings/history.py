@@ -0,0 +1,172 @@
+# bookings/history.py
+"""
+HistoricalRecords с настраиваемым режимом записи истории.
+
+Режим задаётся в settings.BOOKINGS_HISTORY_MODES: ключ 'default' и, при необходимости,
+метки отдельных моделей ('bookings.Payment'):
+
+* 'sync' - как в django-simple-history: отдельный INSERT сразу после каждого сохранения;
+* 'batched' - исторические записи копятся в буфере и пишутся одним bulk_create
+  при коммите транзакции или в конце блока history_batch() (например, запроса);
+* 'off' - история модели не пишется (для таблиц с частыми изменениями).
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from simple_history.models import HistoricalRecords
+from simple_history.signals import post_create_historical_record, pre_create_historical_record
+
+MODE_SYNC = 'sync'
+MODE_BATCHED = 'batched'
+MODE_OFF = 'off'
+
+_local = threading.local()
+_records = {}  # Модель -> её ConfigurableHistoricalRecords (record_history)
+
+
+def history_mode(model):
+    modes = getattr(settings, 'BOOKINGS_HISTORY_MODES', {})
+    return modes.get(model._meta.label, modes.get('default', MODE_SYNC))
+
+
+class HistoryBuffer:
+    """
+    Отложенные исторические записи; flush() пишет их по одному bulk_create на модель.
+    """
+
+    def __init__(self, using=None, all_models=False):
+        self.using = using
+        self.all_models = all_models
+        self.records = []  # (history_instance, instance, history_date, history_user, history_change_reason)
+
+    def add(self, *record):
+        self.records.append(record)
+
+    def flush(self):
+        records, self.records = self.records, []
+        by_model = defaultdict(list)
+        for record in records:
+            by_model[type(record[0])].append(record)
+        for history_model, model_records in by_model.items():
+            history_model.objects.using(self.using).bulk_create([record[0] for record in model_records],
+                                                                batch_size=500)
+            for history_instance, instance, history_date, history_user, history_change_reason in model_records:
+                post_create_historical_record.send(
+                    sender=history_model,
+                    instance=instance,
+                    history_instance=history_instance,
+                    history_date=history_date,
+                    history_user=history_user,
+                    history_change_reason=history_change_reason,
+                    using=self.using,
+                )
+
+
+@contextmanager
+def history_batch(all_models=False, using=DEFAULT_DB_ALIAS):
+    """
+    Копит исторические записи моделей в режиме 'batched' (или всех, кроме 'off', при all_models=True)
+    до конца блока. Если блок выполняется внутри транзакции, запись откладывается до её коммита,
+    а при откате транзакции отбрасывается вместе с ней.
+    """
+    buffer = HistoryBuffer(using=using, all_models=all_models)
+    stack = _local.__dict__.setdefault('buffers', [])
+    stack.append(buffer)
+    try:
+        yield buffer
+    finally:
+        stack.remove(buffer)
+        # Вне транзакции изменения уже зафиксированы (autocommit) - история пишется сразу
+        transaction.on_commit(buffer.flush, using=using)
+
+
+def _transaction_buffer(using):
+    """
+    Буфер текущей транзакции: сбрасывается при коммите. Если транзакция была откачена,
+    её on_commit-обработчик удалён вместе с буфером, и создаётся новый.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    buffers = _local.__dict__.setdefault('transaction_buffers', {})
+    buffer = buffers.get(connection.alias)
+    if buffer is None or not any(getattr(func, '__self__', None) is buffer
+                                 for _, func, _ in connection.run_on_commit):
+        buffer = buffers[connection.alias] = HistoryBuffer(using=using)
+        transaction.on_commit(buffer.flush, using=connection.alias)
+    return buffer
+
+
+def bulk_create_history(model, objs, batch_size=500):
+    """
+    Исторические записи '+' для объектов, созданных через bulk_create (post_save не вызывается).
+    """
+    if history_mode(model) != MODE_OFF:
+        model.history.bulk_history_create(objs, batch_size=batch_size)
+
+
+def record_history(instance, history_type='~'):
+    """
+    Историческая запись для изменения, сделанного в обход save() (QuerySet.update()), в режиме модели.
+    """
+    _records[type(instance)].create_historical_record(instance, history_type)
+
+
+class ConfigurableHistoricalRecords(HistoricalRecords):
+    """
+    HistoricalRecords, учитывающий режим из settings.BOOKINGS_HISTORY_MODES.
+    """
+
+    def contribute_to_class(self, cls, name):
+        super().contribute_to_class(cls, name)
+        _records[cls] = self
+
+    def create_historical_record(self, instance, history_type, using=None):
+        mode = history_mode(self.cls)
+        if mode == MODE_OFF:
+            return
+        buffer = self._get_buffer(mode, using)
+        if buffer is None:
+            return super().create_historical_record(instance, history_type, using=using)
+
+        # Повторяет HistoricalRecords.create_historical_record, но вместо save() кладёт запись в буфер
+        using = using if self.use_base_model_db else None
+        history_date = getattr(instance, "_history_date", timezone.now())
+        history_user = self.get_history_user(instance)
+        history_change_reason = self.get_change_reason_for_object(instance, history_type, using)
+        manager = getattr(instance, self.manager_name)
+        attrs = {field.attname: getattr(instance, field.attname) for field in self.fields_included(instance)}
+        if getattr(manager.model, "history_relation", None) is not None:
+            attrs["history_relation"] = instance
+        history_instance = manager.model(
+            history_date=history_date,
+            history_type=history_type,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            **attrs,
+        )
+        pre_create_historical_record.send(
+            sender=manager.model,
+            instance=instance,
+            history_date=history_date,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            history_instance=history_instance,
+            using=using,
+        )
+        buffer.add(history_instance, instance, history_date, history_user, history_change_reason)
+
+    def _get_buffer(self, mode, using):
+        """
+        Буфер для отложенной записи или None, если запись нужно выполнить сразу.
+        """
+        if getattr(self.cls, '_history_m2m_fields', None) or self.m2m_fields:
+            return None  # История m2m пишется вместе с основной записью - только синхронно
+        for buffer in reversed(_local.__dict__.get('buffers', [])):
+            if mode == MODE_BATCHED or buffer.all_models:
+                return buffer
+        if mode == MODE_BATCHED and connections[using or DEFAULT_DB_ALIAS].in_atomic_block:
+            return _transaction_buffer(using)
+        return None
@@ -0,0 +1,105 @@
+# bookings/jobs.py
+"""
+Очередь фоновых экспортов на таблице ExportJob, без внешнего брокера.
+
+Веб-запрос только ставит задачу (enqueue_export) и сразу возвращает ответ, не читая выбранные
+строки. В задаче хранятся параметры списка админки (фильтры, поиск, сортировка) и pk отмеченных
+записей, если выбраны не все найденные (не больше страницы списка), а не сам запрос, поэтому она
+переживает обновление Django и кода. Queryset строится заново в обработчике тем же ChangeList,
+что и страница списка. Задачи выполняет команда run_export_worker; готовые файлы сохраняются в
+BOOKINGS_EXPORT_ROOT (вне MEDIA_ROOT) под случайными именами и скачиваются через админку.
+"""
+import io
+import secrets
+import tempfile
+import traceback
+
+from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.auth.models import AnonymousUser
+from django.core.files import File
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .exports import write_csv, write_xlsx
+from .models import ExportJob
+
+
+def enqueue_export(resource_class, file_format, filter_params=None, object_ids=(), user=None):
+    """
+    Ставит экспорт в очередь. filter_params - параметры списка админки ({имя: [значения]}),
+    object_ids - отмеченные записи (пусто - все записи, найденные по параметрам).
+    """
+    return ExportJob.objects.create(
+        resource=f'{resource_class.__module__}.{resource_class.__qualname__}',
+        filter_params={name: values for name, values in (filter_params or {}).items() if name != PAGE_VAR},
+        object_ids=list(object_ids),
+        file_format=file_format,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim_next_job():
+    """
+    Атомарно забирает самую старую задачу из очереди (несколько воркеров не возьмут одну задачу).
+    Возвращает None, если очередь пуста.
+    """
+    while True:
+        job = ExportJob.objects.filter(status=ExportJob.STATUS_PENDING).order_by('created_at').first()
+        if job is None:
+            return None
+        claimed = ExportJob.objects.filter(pk=job.pk, status=ExportJob.STATUS_PENDING).update(
+            status=ExportJob.STATUS_RUNNING, started_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def export_queryset(job, resource):
+    """
+    Записи задачи: список админки модели с параметрами задачи (от имени её автора), при
+    отмеченных записях - только они. Строки читаются queryset ресурса (его select_related)
+    в порядке списка.
+    """
+    model = resource._meta.model
+    model_admin = admin.site._registry[model]
+    url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+    request = RequestFactory().get(url, job.filter_params)
+    request.user = job.created_by or AnonymousUser()
+    changelist = model_admin.get_changelist_instance(request)
+    selected = changelist.queryset
+    if job.object_ids:
+        selected = selected.filter(pk__in=job.object_ids)
+    return resource.get_queryset().filter(pk__in=selected.values('pk')).order_by(*selected.query.order_by)
+
+
+def run_export_job(job):
+    """
+    Выполняет экспорт, отмечая прогресс в rows_processed, и сохраняет файл в job.file.
+    """
+    jobs = ExportJob.objects.filter(pk=job.pk)
+    try:
+        resource = import_string(job.resource)()
+        objects = export_queryset(job, resource)
+        jobs.update(total_rows=objects.count())
+
+        def progress(rows):
+            jobs.update(rows_processed=rows)
+
+        with tempfile.TemporaryFile() as file:
+            if job.file_format == 'xlsx':
+                write_xlsx(resource, objects, file, progress=progress)
+            else:
+                text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+                write_csv(resource, objects, text, progress=progress)
+                text.detach()
+            file.seek(0)
+            # Случайная часть имени: файл нельзя найти перебором номеров задач
+            name = f'{resource._meta.model._meta.model_name}_{job.pk}_{secrets.token_urlsafe(16)}.{job.file_format}'
+            job.file.save(name, File(file), save=False)
+        jobs.update(file=job.file.name, status=ExportJob.STATUS_DONE, finished_at=timezone.now())
+    except Exception:
+        jobs.update(status=ExportJob.STATUS_FAILED, error=traceback.format_exc(), finished_at=timezone.now())
@@ -0,0 +1,147 @@
+import datetime
+import io
+import re
+from collections import Counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from bookings.benchmarks import scratch_database
+from bookings.management.commands.check_query_budget import list_endpoints
+from bookings.models import Guest, Payment, Review
+
+# Запросы с параметрами, фильтрующими и сортирующими по "горячим" столбцам (в дополнение к спискам роутера)
+AUDIT_URLS = [
+    '/api/bookings/?check_in_after={today}&ordering=check_in',
+    '/api/bookings/?check_out_before={today}&ordering=-check_out',
+    '/api/bookings/filter_bookings/?check_in_after={today}&check_out_before={month}&guest=1',
+    '/api/payments/?payment_date={today}',
+    '/api/payments/?min_amount=100&max_amount=200&ordering=-amount',
+    '/api/payments/?ordering=-payment_date',
+    '/api/reviews/?min_rating=4&ordering=-review_date',
+    '/api/reviews/?review_date={today}',
+    '/api/rooms/available/?date_range={today},{week}',
+    '/api/rooms/is_valid_to_book/?room=1&date_range={today},{week}',
+    '/api/async/reviews/?min_rating=4',
+]
+
+# Запросы вне API: (название, функция, возвращающая queryset)
+ORM_QUERIES = [
+    ('book_room: поиск гостя', lambda: Guest.objects.filter(
+        first_name='Иван', last_name='Иванов', phone_number='79000000000')),
+    ('отзывы номера по дате', lambda: Review.objects.filter(room_id=1).order_by('-review_date')[:10]),
+    ('отзывы номера с оценкой', lambda: Review.objects.filter(room_id=1, rating__gte=4)[:10]),
+    ('платежи за день', lambda: Payment.objects.filter(payment_date=datetime.date.today())),
+]
+
+# Справочники из десятков-сотен строк: полный просмотр дешевле обращения к индексу
+SMALL_TABLES = {
+    'bookings_room', 'bookings_amenity', 'bookings_room_amenities', 'bookings_roomrating',
+    'bookings_seasonalrate', 'bookings_exportjob',
+}
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+def explain(sql):
+    """
+    Строки EXPLAIN QUERY PLAN (поле detail) для SQL с подставленными параметрами.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(sql, plan, ignored_tables):
+    """
+    Таблицы, которые план читает целиком (SCAN без индекса), кроме ignored_tables.
+    Запрос без WHERE с LIMIT и без сортировки во временном B-дереве (ORDER BY id DESC LIMIT 5)
+    читает по первичному ключу только LIMIT строк - это не полный просмотр.
+    """
+    if ' WHERE ' not in sql and ' LIMIT ' in sql and not any('TEMP B-TREE' in detail for detail in plan):
+        return []
+    tables = []
+    for detail in plan:
+        match = FULL_SCAN.match(detail)
+        if match and match.group(1) not in ignored_tables:
+            tables.append(match.group(1))
+    return tables
+
+
+class Command(BaseCommand):
+    help = ('Аудит индексов: SQL эндпоинтов списков и типичных фильтров прогоняется через EXPLAIN QUERY PLAN '
+            '(во временной базе с тестовыми данными), полные просмотры таблиц выводятся в отчёт')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=30, help='Номеров в тестовых данных')
+        parser.add_argument('--years', type=float, default=1, help='Период тестовых броней в годах')
+        parser.add_argument('--no-analyze', action='store_true',
+                            help='Не собирать статистику ANALYZE (планировщик без статистики выбирает иначе)')
+        parser.add_argument('--include-small', action='store_true',
+                            help='Сообщать и о полных просмотрах небольших справочников (номера, удобства)')
+        parser.add_argument('--show-plans', action='store_true', help='Выводить полные планы всех запросов')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Завершиться с ошибкой, если найдены полные просмотры (для CI)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("Отчёт строится по EXPLAIN QUERY PLAN SQLite.")
+        ignored = set() if options['include_small'] else SMALL_TABLES
+        with scratch_database():
+            call_command('generate_load_data', rooms=options['rooms'], guests=options['rooms'] * 20,
+                         years=options['years'], seed=1, stdout=io.StringIO())
+            if not options['no_analyze']:
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+            findings = self.audit(ignored, options['show_plans'])
+
+        scans = Counter(table for _, _, tables in findings for table in tables)
+        if not scans:
+            self.stdout.write(self.style.SUCCESS('Полных просмотров таблиц не найдено'))
+            return
+        summary = ', '.join(f'{table} ({count})' for table, count in scans.most_common())
+        message = f'Полные просмотры в {len(findings)} запросах: {summary}'
+        if options['fail_on_scan']:
+            raise CommandError(message)
+        self.stdout.write(self.style.WARNING(message))
+
+    def sources(self):
+        """
+        (название, функция, выполняющая запросы): эндпоинты роутера, AUDIT_URLS и ORM_QUERIES.
+        """
+        client = APIClient()
+        today = datetime.date.today()
+        dates = {'today': today, 'week': today + datetime.timedelta(days=7),
+                 'month': today + datetime.timedelta(days=30)}
+        urls = [url for url, _ in list_endpoints()] + [url.format(**dates) for url in AUDIT_URLS]
+        for url in urls:
+            yield url, lambda url=url: client.get(url)
+        for name, queryset in ORM_QUERIES:
+            yield name, lambda queryset=queryset: list(queryset())
+
+    def audit(self, ignored, show_plans):
+        findings = []
+        seen = set()
+        for name, run in self.sources():
+            with CaptureQueriesContext(connection) as context:
+                run()
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT') or sql in seen:
+                    continue
+                seen.add(sql)
+                plan = explain(sql)
+                tables = full_scans(sql, plan, ignored)
+                if tables:
+                    findings.append((name, sql, tables))
+                    self.stdout.write(self.style.WARNING(f"{name}: SCAN {', '.join(tables)}"))
+                    self.stdout.write(f"    {sql[:300]}")
+                elif show_plans:
+                    self.stdout.write(f"{name}:")
+                    self.stdout.write(f"    {sql[:300]}")
+                if tables or show_plans:
+                    for detail in plan:
+                        self.stdout.write(f"    | {detail}")
+        return findings
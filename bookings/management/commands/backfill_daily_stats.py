@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from bookings.analytics import ROLLUP_CHUNK_SIZE, backfill_daily_stats
+from bookings.benchmarks import Timer
+
+
+class Command(BaseCommand):
+    help = 'Полный пересчёт дневной сводки загрузки и выручки номеров (DailyRoomStat) по всем броням'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=ROLLUP_CHUNK_SIZE, help='Броней в одной порции')
+
+    def handle(self, *args, **options):
+        with Timer() as timer:
+            count = backfill_daily_stats(
+                options['chunk_size'],
+                progress=lambda processed: self.stdout.write(f"  ... обработано броней: {processed}"),
+            )
+        self.stdout.write(self.style.SUCCESS(f'Сводка пересчитана: {count} броней за {timer.elapsed:.1f} с'))
@@ -0,0 +1,210 @@
+import datetime
+import io
+import itertools
+import json
+import platform
+import subprocess
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+from bookings.benchmarks import Timer, percentile, scratch_database
+from bookings.models import Booking, Guest, Payment, Review, Room
+from bookings.profiling import QueryRecorder
+from bookings.urls import router
+
+# Уровни объёма данных: параметры generate_load_data (около 50 броней на номер за год периода)
+TIERS = {
+    '1k': {'rooms': 13, 'guests': 500, 'years': 1},
+    '100k': {'rooms': 1000, 'guests': 20000, 'years': 1.5},
+    '1m': {'rooms': 5000, 'guests': 100000, 'years': 3.5},
+}
+# Параметры эндпоинтов, которые без них отвечают 400
+ENDPOINT_PARAMS = {
+    '/api/rooms/is_valid_to_book/': 'room={room}&date_range={week}',
+    '/api/rooms/available/': 'date_range={week}&guests=2',
+    '/api/rooms/quote/': 'date_range={week}',
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def router_endpoints():
+    """
+    GET-эндпоинты роутера: list и retrieve каждого вьюсета и GET-действия (@action).
+    Возвращает кортежи (url, вьюсет, detail).
+    """
+    for prefix, viewset, _ in router.registry:
+        if hasattr(viewset, 'list'):
+            yield f'/api/{prefix}/', viewset, False
+        if hasattr(viewset, 'retrieve'):
+            yield f'/api/{prefix}/{{pk}}/', viewset, True
+        for extra_action in viewset.get_extra_actions():
+            if 'get' in extra_action.mapping:
+                detail_prefix = f'/api/{prefix}/{{pk}}/' if extra_action.detail else f'/api/{prefix}/'
+                yield f'{detail_prefix}{extra_action.url_path}/', viewset, extra_action.detail
+
+
+class Command(BaseCommand):
+    help = ('Бенчмарк эндпоинтов роутера API и HTML-страниц (index, review_list, book_room) на уровнях объёма '
+            'данных 1k/100k/1m броней (во временной базе): время, число SQL-запросов и пик памяти '
+            'в JSON-отчёт для сравнения между коммитами. Наполнение уровня 1m занимает несколько минут')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tier', action='append', dest='tiers', choices=list(TIERS),
+                            help='Уровень объёма данных (можно указать несколько раз); по умолчанию 1k')
+        parser.add_argument('--repeat', type=int, default=20, help='Замеров времени на эндпоинт')
+        parser.add_argument('--warmup', type=int, default=2, help='Прогревочных запросов (кэши)')
+        parser.add_argument('--seed', type=int, default=1, help='Зерно генератора данных')
+        parser.add_argument('--output', default='benchmark_report.json', help='Файл JSON-отчёта')
+        parser.add_argument('--compare', help='Предыдущий отчёт: вывести изменения p50 и числа запросов')
+        parser.add_argument('--threshold', type=float, default=1.2,
+                            help='Во сколько раз должна вырасти p50, чтобы считать это регрессией (с --compare)')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Не удалось прочитать отчёт {options['compare']}: {error}")
+
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'repeat': options['repeat'],
+            },
+            'tiers': {},
+        }
+        for tier in options['tiers'] or ['1k']:
+            with scratch_database():
+                report['tiers'][tier] = self.run_tier(tier, options)
+
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Отчёт сохранён: {options['output']}"))
+        if baseline is not None:
+            self.compare(baseline, report, options['threshold'])
+
+    def run_tier(self, tier, options):
+        with Timer() as seed_timer:
+            call_command('generate_load_data', **TIERS[tier], seed=options['seed'], stdout=io.StringIO())
+        data = {model.__name__.lower(): model.objects.count() for model in (Room, Guest, Booking, Payment, Review)}
+        self.stdout.write(f"[{tier}] данные за {seed_timer.elapsed:.1f} с: "
+                          + ', '.join(f'{name} {count}' for name, count in data.items()))
+
+        client = APIClient()
+        client.force_login(User.objects.create_user('benchmark', password='benchmark'))
+        endpoints = {}
+        for name, request in self.endpoints():
+            endpoints[name] = self.measure(request, client, options['repeat'], options['warmup'])
+            result = endpoints[name]
+            self.stdout.write(f"[{tier}] {name}: p50 {result['p50_ms']:.1f} мс, p95 {result['p95_ms']:.1f} мс, "
+                              f"{result['queries']} запросов, пик памяти {result['peak_memory_kib']:.0f} КиБ, "
+                              f"HTTP {result['status']}")
+        return {'data': data, 'seed_seconds': round(seed_timer.elapsed, 1), 'endpoints': endpoints}
+
+    def endpoints(self):
+        """
+        (название, функция client -> ответ) для всех замеряемых страниц.
+        """
+        today = datetime.date.today()
+        room = Room.objects.order_by('pk').first()
+        values = {'room': room.pk, 'week': f'{today},{today + datetime.timedelta(days=7)}'}
+        for url, viewset, detail in router_endpoints():
+            if detail:
+                model = viewset.queryset.model
+                url = url.format(pk=model.objects.order_by('pk').values_list('pk', flat=True).first())
+            params = ENDPOINT_PARAMS.get(url)
+            if params:
+                url = f'{url}?{params.format(**values)}'
+            yield f'GET {url}', lambda client, url=url: client.get(url)
+
+        for url in ('/', '/reviews/', '/book_room/'):
+            yield f'GET {url}', lambda client, url=url: client.get(url)
+
+        # Каждая бронь - на свои свободные даты далеко в будущем
+        offsets = itertools.count()
+
+        def book_room(client):
+            check_in = today + datetime.timedelta(days=2000 + 10 * next(offsets))
+            return client.post('/book_room/', {
+                'fio': 'Иван Петров', 'phone_number': '79000000000', 'room': room.pk,
+                'check_in': check_in, 'check_out': check_in + datetime.timedelta(days=3),
+            })
+        yield 'POST /book_room/', book_room
+
+    def measure(self, request, client, repeat, warmup):
+        """
+        Прогрев, затем отдельные прогоны: подсчёт запросов, пик памяти (tracemalloc замедляет
+        выполнение, поэтому время меряется без него) и repeat замеров времени.
+        """
+        for _ in range(warmup):
+            request(client)
+        # Не CaptureQueriesContext: тестовый клиент очищает connection.queries в начале каждого запроса
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = request(client)
+        tracemalloc.start()
+        try:
+            request(client)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        timings = []
+        for _ in range(repeat):
+            with Timer() as timer:
+                request(client)
+            timings.append(timer.elapsed * 1000)
+        timings.sort()
+        return {
+            'status': response.status_code,
+            'queries': recorder.count,
+            'peak_memory_kib': round(peak / 1024, 1),
+            'mean_ms': round(sum(timings) / len(timings), 2),
+            'min_ms': round(timings[0], 2),
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+        }
+
+    def compare(self, baseline, report, threshold):
+        self.stdout.write(f"Сравнение с {baseline['meta'].get('revision')} -> {report['meta']['revision']}:")
+        regressions = 0
+        for tier, result in report['tiers'].items():
+            old_endpoints = baseline['tiers'].get(tier, {}).get('endpoints', {})
+            for name, new in result['endpoints'].items():
+                old = old_endpoints.get(name)
+                if old is None:
+                    continue
+                ratio = new['p50_ms'] / old['p50_ms'] if old['p50_ms'] else 1
+                queries = new['queries'] - old['queries']
+                if ratio >= threshold or queries > 0:
+                    regressions += 1
+                    style = self.style.ERROR
+                elif ratio <= 1 / threshold or queries < 0:
+                    style = self.style.SUCCESS
+                else:
+                    continue
+                self.stdout.write(style(f"[{tier}] {name}: p50 {old['p50_ms']:.1f} -> {new['p50_ms']:.1f} мс "
+                                        f"(x{ratio:.2f}), запросов {old['queries']} -> {new['queries']}"))
+        if regressions:
+            self.stdout.write(self.style.WARNING(f"Регрессий: {regressions}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Регрессий не найдено"))
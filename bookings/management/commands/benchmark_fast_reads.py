@@ -0,0 +1,88 @@
+import io
+import json
+import statistics
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from bookings.benchmarks import Timer, scratch_database
+from bookings.models import Booking, Payment
+from bookings.renderers import orjson
+
+DEFAULT_URLS = ['/api/bookings/?page_size=500', '/api/payments/?page_size=500', '/api/bookings/active_bookings/']
+MODES = {'serializers': False, 'fast': True}  # Значение BOOKINGS_FAST_READS
+
+
+class Command(BaseCommand):
+    help = ('Сравнение скорости списков API через сериализаторы и быстрый путь BOOKINGS_FAST_READS '
+            '(values() + orjson) во временной базе: запросов в секунду и проверка совпадения ответов')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', dest='urls',
+                            help='Адрес списка (можно указать несколько раз); по умолчанию брони и платежи '
+                                 'страницами по 500 и активные брони')
+        parser.add_argument('--requests', type=int, default=100, help='Запросов на адрес и режим в одном замере')
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Замеров на адрес (режимы чередуются); сравнивается медиана ускорения')
+        parser.add_argument('--rooms', type=int, default=100, help='Номеров в тестовых данных')
+        parser.add_argument('--years', type=float, default=1, help='Период тестовых броней в годах')
+        parser.add_argument('--target', type=float, default=3.0,
+                            help='Ожидаемое медианное ускорение первого адреса; меньше - ошибка')
+
+    def handle(self, *args, **options):
+        urls = options['urls'] or DEFAULT_URLS
+        with scratch_database():
+            call_command('generate_load_data', rooms=options['rooms'], guests=options['rooms'] * 20,
+                         years=options['years'], seed=1, stdout=io.StringIO())
+            self.stdout.write(f"Данные: броней {Booking.objects.count()}, платежей {Payment.objects.count()}; "
+                              f"orjson {'установлен' if orjson is not None else 'не установлен'}")
+            client = APIClient()
+            speedups = [self.compare(client, url, options['requests'], options['runs']) for url in urls]
+
+        if speedups[0] < options['target']:
+            raise CommandError(f"{urls[0]}: ускорение x{speedups[0]:.2f} меньше цели x{options['target']:.1f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{urls[0]}: ускорение x{speedups[0]:.2f} (цель x{options['target']:.1f})"
+        ))
+
+    def compare(self, client, url, requests, runs):
+        """
+        Один адрес в обоих режимах: ответы первой страницы должны совпасть, затем runs замеров
+        по requests запросов, проходящих по страницам списка (по ссылкам next). Режимы чередуются
+        внутри каждого замера, результат - медиана ускорения по замерам.
+        """
+        bodies = {}
+        for mode, enabled in MODES.items():
+            with override_settings(BOOKINGS_FAST_READS=enabled):
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f"{url}: HTTP {response.status_code}")
+                bodies[mode] = json.loads(response.content)
+        if bodies['serializers'] != bodies['fast']:
+            raise CommandError(f"{url}: ответы сериализаторов и быстрого пути различаются")
+
+        rates = {mode: [] for mode in MODES}
+        speedups = []
+        for _ in range(max(runs, 1)):
+            for mode, enabled in MODES.items():
+                with override_settings(BOOKINGS_FAST_READS=enabled):
+                    rates[mode].append(self.measure(client, url, requests))
+            speedups.append(rates['fast'][-1] / rates['serializers'][-1])
+        speedup = statistics.median(speedups)
+        self.stdout.write(f"{url}: сериализаторы {statistics.median(rates['serializers']):.1f} запросов/с, "
+                          f"быстрый путь {statistics.median(rates['fast']):.1f} запросов/с (медианы), "
+                          f"ускорение x{speedup:.2f} (x{min(speedups):.2f}-x{max(speedups):.2f}), ответы совпадают")
+        return speedup
+
+    def measure(self, client, url, requests):
+        """
+        Запросов в секунду на requests запросах подряд.
+        """
+        next_url = url
+        with Timer() as timer:
+            for _ in range(requests):
+                data = client.get(next_url).data  # Без разбора JSON: замеряется только сервер
+                next_url = (data.get('next') if isinstance(data, dict) else None) or url
+        return requests / timer.elapsed
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from bookings.benchmarks import Timer, scratch_database
+from bookings.history import MODE_BATCHED, MODE_OFF, MODE_SYNC
+from bookings.models import Guest
+
+
+class Command(BaseCommand):
+    help = 'Сравнение скорости записи с историей изменений в режимах sync, batched и off (во временной базе)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Количество сохранений на режим')
+        parser.add_argument('--transaction-size', type=int, default=100,
+                            help='Сохранений в одной транзакции (буфер batched сбрасывается при коммите)')
+
+    def handle(self, *args, **options):
+        rows, size = options['rows'], options['transaction_size']
+        with scratch_database():
+            results = {}
+            for mode in (MODE_SYNC, MODE_BATCHED, MODE_OFF):
+                with override_settings(BOOKINGS_HISTORY_MODES={'default': mode}):
+                    history_before = Guest.history.count()
+                    with Timer() as timer:
+                        for start in range(0, rows, size):
+                            with transaction.atomic():
+                                for i in range(start, min(start + size, rows)):
+                                    Guest(first_name=f"Имя_{i}", last_name=f"Фамилия_{i}",
+                                          email=f"guest{i}@example.com", phone_number="79000000000").save()
+                    history_rows = Guest.history.count() - history_before
+                results[mode] = rows / timer.elapsed
+                self.stdout.write(f"{mode:>8}: {rows / timer.elapsed:9.1f} сохранений/с, "
+                                  f"исторических записей: {history_rows}")
+        self.stdout.write(self.style.SUCCESS(
+            f"batched быстрее sync в {results[MODE_BATCHED] / results[MODE_SYNC]:.2f} раза, "
+            f"off - в {results[MODE_OFF] / results[MODE_SYNC]:.2f} раза"
+        ))
@@ -0,0 +1,169 @@
+import datetime
+import io
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+
+from bookings.benchmarks import Timer, percentile, scratch_database
+from bookings.models import Booking, Guest, Payment, Review, Room
+from bookings.reservations import RoomUnavailable, reserve_room
+
+
+class Command(BaseCommand):
+    help = ('Смешанная нагрузка чтение/запись на SQLite в профилях BOOKINGS_SQLITE_PROFILES (во временной базе): '
+            'операций в секунду, задержки p50/p99 и ошибки блокировки для каждого профиля')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', dest='profiles',
+                            help='Профиль из BOOKINGS_SQLITE_PROFILES (можно указать несколько раз); '
+                                 'по умолчанию - все')
+        parser.add_argument('--threads', type=int, default=8, help='Количество параллельных потоков')
+        parser.add_argument('--operations', type=int, default=200, help='Операций на поток')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='Доля операций записи')
+        parser.add_argument('--rooms', type=int, default=50, help='Номеров в тестовых данных')
+        parser.add_argument('--years', type=float, default=1, help='Период тестовых броней в годах')
+        parser.add_argument('--seed', type=int, default=1, help='Зерно генератора данных и нагрузки')
+
+    def handle(self, *args, **options):
+        profiles = settings.BOOKINGS_SQLITE_PROFILES
+        names = options['profiles'] or list(profiles)
+        unknown = set(names) - set(profiles)
+        if unknown:
+            raise CommandError(f"Неизвестные профили: {', '.join(sorted(unknown))}")
+        if connection.vendor != 'sqlite':
+            raise CommandError("Команда сравнивает настройки SQLite.")
+
+        with scratch_database():
+            call_command('generate_load_data', rooms=options['rooms'], guests=options['rooms'] * 20,
+                         years=options['years'], seed=options['seed'], stdout=io.StringIO())
+            self.rooms = list(Room.objects.order_by('pk'))
+            self.guest = Guest.objects.order_by('pk').first()
+            self.booking_ids = list(Booking.objects.order_by('pk').values_list('pk', flat=True)[:5000])
+            self.stdout.write(f"Данные: номеров {len(self.rooms)}, броней {Booking.objects.count()}; "
+                              f"потоков {options['threads']} x {options['operations']} операций, "
+                              f"доля записи {options['write_ratio']:.0%}")
+
+            settings_dict = connection.settings_dict
+            saved = dict(settings_dict['OPTIONS']), settings_dict['CONN_MAX_AGE']
+            results = {}
+            try:
+                for number, name in enumerate(names):
+                    journal_mode = self.apply_profile(settings_dict, profiles[name])
+                    # Свои зёрна на профиль: брони разных прогонов не претендуют на одни и те же даты
+                    results[name] = {'journal_mode': journal_mode,
+                                     **self.run(options, options['seed'] + number * options['threads'])}
+                    self.report(name, results[name])
+            finally:
+                settings_dict['OPTIONS'], settings_dict['CONN_MAX_AGE'] = saved
+                connection.close()
+
+        if 'default' in results and len(results) > 1:
+            base = results['default']['ops']
+            for name, result in results.items():
+                if name != 'default':
+                    self.stdout.write(self.style.SUCCESS(
+                        f"{name}: в {result['ops'] / base:.2f} раза больше операций в секунду, чем default"
+                    ))
+
+    def apply_profile(self, settings_dict, profile):
+        """
+        PRAGMA профиля выполняются при каждом новом соединении; journal_mode хранится в файле базы,
+        поэтому переключается сразу (пока других соединений нет).
+        """
+        connection.close()
+        settings_dict['OPTIONS'] = {
+            **settings_dict['OPTIONS'],
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in profile['pragmas'].items()),
+        }
+        settings_dict['CONN_MAX_AGE'] = profile['conn_max_age']
+        with connection.cursor() as cursor:
+            journal_mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+        connection.close()
+        return journal_mode
+
+    def run(self, options, seed):
+        threads_count = options['threads']
+        barrier = threading.Barrier(threads_count)
+        lock = threading.Lock()
+        latencies = {'read': [], 'write': []}
+        counters = {'errors': 0, 'conflicts': 0}
+
+        def worker(seed):
+            rnd = random.Random(seed)
+            local = {'read': [], 'write': []}
+            errors = conflicts = 0
+            barrier.wait()
+            try:
+                for _ in range(options['operations']):
+                    kind = 'write' if rnd.random() < options['write_ratio'] else 'read'
+                    started = time.perf_counter()
+                    try:
+                        self.write(rnd) if kind == 'write' else self.read(rnd)
+                    except RoomUnavailable:
+                        conflicts += 1
+                    except OperationalError:  # database is locked
+                        errors += 1
+                    local[kind].append(time.perf_counter() - started)
+                    close_old_connections()  # Как после ответа на запрос: закрыть, если CONN_MAX_AGE истёк
+            finally:
+                connection.close()
+                with lock:
+                    for key in local:
+                        latencies[key].extend(local[key])
+                    counters['errors'] += errors
+                    counters['conflicts'] += conflicts
+
+        threads = [threading.Thread(target=worker, args=(seed + i,)) for i in range(threads_count)]
+        with Timer() as timer:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        all_latencies = sorted(latencies['read'] + latencies['write'])
+        return {
+            'ops': len(all_latencies) / timer.elapsed,
+            'reads': len(latencies['read']) / timer.elapsed,
+            'writes': len(latencies['write']) / timer.elapsed,
+            'p50': percentile(all_latencies, 0.5) * 1000,
+            'p99': percentile(all_latencies, 0.99) * 1000,
+            'write_p99': (percentile(sorted(latencies['write']), 0.99) or 0) * 1000,
+            **counters,
+        }
+
+    def read(self, rnd):
+        """
+        Чтения главных страниц: список номеров со сводкой и удобствами, брони номера за месяц, отзывы.
+        """
+        list(Room.objects.select_related('rating').prefetch_related('amenities')[:20])
+        room = rnd.choice(self.rooms)
+        start = datetime.date.today() - datetime.timedelta(days=rnd.randrange(365))
+        list(Booking.objects.filter(room=room, check_in__gte=start,
+                                    check_in__lt=start + datetime.timedelta(days=30)))
+        list(Review.objects.filter(room=room).order_by('-review_date')[:10])
+
+    def write(self, rnd):
+        """
+        Записи: бронь на свободные даты далеко в будущем (book_room) или платёж по брони.
+        """
+        if rnd.random() < 0.5:
+            check_in = datetime.date.today() + datetime.timedelta(days=400 + rnd.randrange(3650))
+            reserve_room(rnd.choice(self.rooms), check_in, check_in + datetime.timedelta(days=rnd.randint(1, 5)),
+                         guest=self.guest, total_price=100, booking_name="Benchmark")
+        else:
+            Payment.objects.create(booking_id=rnd.choice(self.booking_ids), amount=10,
+                                   payment_date=datetime.date.today())
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:>8} ({result['journal_mode']}): {result['ops']:8.1f} операций/с "
+            f"(чтений {result['reads']:.1f}/с, записей {result['writes']:.1f}/с), "
+            f"p50 {result['p50']:.1f} мс, p99 {result['p99']:.1f} мс, "
+            f"p99 записи {result['write_p99']:.1f} мс, ошибок блокировки {result['errors']}, "
+            f"отказов (номер занят) {result['conflicts']}"
+        )
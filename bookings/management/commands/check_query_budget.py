@@ -0,0 +1,82 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.benchmarks import scratch_database
+from bookings.models import Room
+from bookings.testing import assert_max_queries, assert_status
+from bookings.urls import router
+
+DEFAULT_QUERY_BUDGET = 3
+
+
+def list_endpoints():
+    """
+    GET-эндпоинты списков всех вьюсетов роутера: list и действия с detail=False.
+    Возвращает кортежи (url, вьюсет).
+    """
+    for prefix, viewset, _ in router.registry:
+        yield f'/api/{prefix}/', viewset
+        for extra_action in viewset.get_extra_actions():
+            if not extra_action.detail and 'get' in extra_action.mapping:
+                yield f'/api/{prefix}/{extra_action.url_path}/', viewset
+
+
+def endpoint_params():
+    """
+    Параметры для эндпоинтов, которые без них отвечают 400 или не обращаются к базе:
+    номера и даты из данных create_test_data (брони на ближайшие полтора месяца).
+    """
+    today = timezone.now().date()
+    date_range = f'{today + datetime.timedelta(days=1)},{today + datetime.timedelta(days=31)}'
+    room_ids = list(Room.objects.order_by('pk').values_list('pk', flat=True)[:2])
+    return {
+        '/api/rooms/available/': {'date_range': date_range, 'guests': 1},
+        '/api/rooms/is_valid_to_book/': {'room': room_ids[0], 'date_range': date_range},
+        '/api/rooms/quote/': {'rooms': ','.join(map(str, room_ids)), 'date_range': date_range},
+    }
+
+
+class Command(BaseCommand):
+    help = ('Проверка числа SQL-запросов на эндпоинтах списков: каждый укладывается в query_budget вьюсета '
+            'и не растёт с увеличением каталога. Завершается с ошибкой при нарушении (для CI)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=2,
+                            help='Сколько раз наполнить базу тестовыми данными (число запросов должно совпасть)')
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            failures = self.run(options['rounds'])
+        if failures:
+            raise CommandError('\n\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('Все эндпоинты укладываются в бюджет запросов'))
+
+    def run(self, rounds):
+        client = APIClient()
+        failures = []
+        counts = {}
+        for round_number in range(1, rounds + 1):
+            call_command('create_test_data', stdout=StringIO())
+            params = endpoint_params()
+            for url, viewset in list_endpoints():
+                budget = getattr(viewset, 'query_budget', DEFAULT_QUERY_BUDGET)
+                try:
+                    with assert_max_queries(budget, url) as context:
+                        response = client.get(url, params.get(url))
+                        # Ответ с ошибкой (например, 400 без параметров) мог не обратиться к базе вовсе
+                        assert_status(response, 200, url)
+                except AssertionError as e:
+                    failures.append(str(e))
+                    continue
+                count = len(context)
+                self.stdout.write(f"[{round_number}] {url}: {count} запросов (лимит {budget}), "
+                                  f"HTTP {response.status_code}")
+                if counts.setdefault(url, count) != count:
+                    failures.append(f"{url}: число запросов зависит от объёма данных "
+                                    f"({counts[url]} -> {count})")
+        return failures
@@ -3,6 +3,7 @@ import random
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
+from bookings.history import history_batch
 from bookings.models import Amenity, Room, Guest, Booking, Payment, Review
 
 
@@ -11,6 +12,12 @@ class Command(BaseCommand):
 
     def handle(self, *args, **kwargs):
         self.stdout.write("Создание тестовых данных...")
+        # История всех моделей пишется пачками, а не отдельным INSERT на каждое create()
+        with history_batch(all_models=True):
+            self.create_data()
+        self.stdout.write(self.style.SUCCESS('Тестовые данные успешно созданы!'))
+
+    def create_data(self):
 
         # Создание 10 Amenity
         for i in range(1, 11):
@@ -77,5 +84,3 @@ class Command(BaseCommand):
                 review_date=timezone.now().date()
             )
         self.stdout.write(self.style.SUCCESS('Отзывы созданы'))
-
-        self.stdout.write(self.style.SUCCESS('Тестовые данные успешно созданы!'))
@@ -0,0 +1,210 @@
+import datetime
+import math
+import random
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.catalogue import invalidate_catalogue
+from bookings.conditional import touch_resources
+from bookings.history import bulk_create_history
+from bookings.models import Amenity, Booking, Guest, Payment, Review, Room
+from bookings.ratings import rebuild_room_ratings
+from bookings.signals import bookings_bulk_created
+
+FIRST_NAMES = ['Александр', 'Мария', 'Иван', 'Анна', 'Дмитрий', 'Елена', 'Сергей', 'Ольга', 'Андрей', 'Татьяна',
+               'Алексей', 'Наталья', 'Михаил', 'Ирина', 'Никита', 'Светлана', 'Павел', 'Екатерина', 'Артём', 'Юлия']
+LAST_NAMES = ['Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов', 'Новиков',
+              'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семёнов', 'Егоров', 'Павлов', 'Козлов']
+AMENITY_NAMES = ['Wi-Fi', 'Кондиционер', 'Телевизор', 'Мини-бар', 'Сейф', 'Фен', 'Балкон', 'Вид на море', 'Чайник',
+                 'Холодильник', 'Ванна', 'Душ', 'Кухня', 'Рабочий стол', 'Парковка', 'Завтрак', 'Камин', 'Джакузи',
+                 'Утюг', 'Детская кроватка']
+ROOM_TYPES = {  # тип: (диапазон цены за ночь, диапазон вместимости, доля номеров)
+    'Standard': ((50, 120), (1, 2), 0.6),
+    'Deluxe': ((120, 250), (2, 3), 0.3),
+    'Suite': ((250, 600), (2, 5), 0.1),
+}
+STAY_LENGTHS = [1, 2, 3, 4, 5, 6, 7, 10, 14]
+STAY_WEIGHTS = [18, 22, 18, 12, 8, 5, 9, 5, 3]
+REVIEW_COMMENTS = ['Отличный сервис!', 'Чисто и уютно.', 'Хорошее расположение.', 'Шумно по ночам.',
+                   'Приветливый персонал.', 'Вернёмся ещё!', 'Завтрак мог быть лучше.', 'Прекрасный вид из окна.']
+
+
+def seasonal_occupancy(day):
+    """
+    Вероятность заезда в день: пик летом и в новогодние праздники, спад в ноябре и марте.
+    """
+    summer = math.cos((day.timetuple().tm_yday - 196) / 365 * 2 * math.pi)  # максимум в середине июля
+    holidays = 0.25 if (day.month == 12 and day.day >= 25) or (day.month == 1 and day.day <= 8) else 0
+    weekend = 0.08 if day.weekday() >= 4 else 0
+    return min(0.95, 0.3 + 0.2 * summer + holidays + weekend)
+
+
+class Command(BaseCommand):
+    help = ('Генерация больших реалистичных наборов данных для нагрузочного тестирования: номера, гости, '
+            'непересекающиеся брони с сезонной загрузкой, платежи и отзывы (bulk_create пачками)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=100, help='Количество номеров')
+        parser.add_argument('--guests', type=int, default=10000, help='Количество гостей')
+        parser.add_argument('--years', type=float, default=1, help='Период бронирований в годах (до сегодня)')
+        parser.add_argument('--future-days', type=int, default=180, help='Горизонт будущих броней, дней')
+        parser.add_argument('--start-date', type=datetime.date.fromisoformat, default=None,
+                            help='Дата начала периода (ГГГГ-ММ-ДД); по умолчанию сегодня минус --years')
+        parser.add_argument('--payment-rate', type=float, default=0.85, help='Доля оплаченных прошедших броней')
+        parser.add_argument('--review-rate', type=float, default=0.25, help='Доля завершённых броней с отзывом')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Размер пачки bulk_create')
+        parser.add_argument('--seed', type=int, default=None, help='Зерно генератора для воспроизводимых данных')
+        parser.add_argument('--with-history', action='store_true',
+                            help='Писать исторические записи для созданных броней (заметно медленнее)')
+
+    def handle(self, *args, **options):
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        self.rnd = random.Random(seed)
+        self.batch_size = options['batch_size']
+        self.with_history = options['with_history']
+        self.today = timezone.now().date()
+        start = options['start_date'] or self.today - datetime.timedelta(days=round(options['years'] * 365))
+        end = self.today + datetime.timedelta(days=options['future_days'])
+        self.stdout.write(f"Генерация данных (seed={seed}) за период {start} - {end}...")
+
+        amenities = self.create_amenities()
+        rooms = self.create_rooms(options['rooms'], amenities)
+        self.stdout.write(self.style.SUCCESS(f'Номера созданы: {len(rooms)}'))
+        guests = self.create_guests(options['guests'])
+        self.stdout.write(self.style.SUCCESS(f'Гости созданы: {len(guests)}'))
+        totals = self.create_bookings(rooms, guests, start, end, options['payment_rate'], options['review_rate'])
+        rebuild_room_ratings([room.pk for room in rooms])  # Отзывы созданы через bulk_create без сигналов
+        self.stdout.write(self.style.SUCCESS(
+            'Бронирования созданы: {bookings}, платежи: {payments}, отзывы: {reviews}'.format(**totals)
+        ))
+
+    def create_amenities(self):
+        existing = {amenity.name: amenity for amenity in Amenity.objects.filter(name__in=AMENITY_NAMES)}
+        missing = [Amenity(name=name) for name in AMENITY_NAMES if name not in existing]
+        return list(existing.values()) + Amenity.objects.bulk_create(missing)
+
+    def create_rooms(self, count, amenities):
+        types = list(ROOM_TYPES)
+        weights = [ROOM_TYPES[room_type][2] for room_type in types]
+        first_number = Room.objects.count() + 1
+        rooms = []
+        for number in range(first_number, first_number + count):
+            room_type = self.rnd.choices(types, weights)[0]
+            (price_min, price_max), (occupancy_min, occupancy_max), _ = ROOM_TYPES[room_type]
+            rooms.append(Room(
+                name=f"{room_type} {number}",
+                room_number=str(number),
+                room_type=room_type,
+                price_per_night=Decimal(self.rnd.randint(price_min * 100, price_max * 100)) / 100,
+                max_occupancy=self.rnd.randint(occupancy_min, occupancy_max),
+                image=f"images/room_{number % 10 + 1}.jpg",
+            ))
+        with transaction.atomic():
+            rooms = Room.objects.bulk_create(rooms, batch_size=self.batch_size)
+            through = Room.amenities.through
+            links = [
+                through(room_id=room.pk, amenity_id=amenity.pk)
+                for room in rooms
+                for amenity in self.rnd.sample(amenities, k=self.rnd.randint(2, min(8, len(amenities))))
+            ]
+            through.objects.bulk_create(links, batch_size=self.batch_size)
+        invalidate_catalogue()  # bulk_create не отправляет post_save
+        touch_resources('rooms', 'amenities')
+        return rooms
+
+    def create_guests(self, count):
+        first_id = Guest.objects.count() + 1
+        guests = []
+        for start in range(first_id, first_id + count, self.batch_size):
+            batch = [
+                Guest(
+                    first_name=self.rnd.choice(FIRST_NAMES),
+                    last_name=self.rnd.choice(LAST_NAMES),
+                    email=f"guest{number}@example.com",
+                    phone_number=f"79{number:09d}",
+                )
+                for number in range(start, min(start + self.batch_size, first_id + count))
+            ]
+            with transaction.atomic():
+                guests.extend(Guest.objects.bulk_create(batch))
+        return guests
+
+    def create_bookings(self, rooms, guests, start, end, payment_rate, review_rate):
+        """
+        Для каждого номера идём по календарю: в день со свободным номером заезд происходит
+        с сезонной вероятностью, следующая бронь начинается не раньше выезда предыдущей.
+        """
+        totals = {'bookings': 0, 'payments': 0, 'reviews': 0}
+        occupancy_by_day = {}
+        paid_until = self.today + datetime.timedelta(days=30)
+        pending = []
+        for room in rooms:
+            day = start
+            while day < end:
+                probability = occupancy_by_day.get(day)
+                if probability is None:
+                    probability = occupancy_by_day[day] = seasonal_occupancy(day)
+                if self.rnd.random() >= probability:
+                    day += datetime.timedelta(days=1)
+                    continue
+                nights = self.rnd.choices(STAY_LENGTHS, STAY_WEIGHTS)[0]
+                check_out = min(day + datetime.timedelta(days=nights), end)
+                guest = self.rnd.choice(guests)
+                total_price = room.price_per_night * (check_out - day).days
+                # Оплачены (одним платежом) прошедшие брони и заезды в ближайшие 30 дней
+                is_paid = day <= paid_until and self.rnd.random() < payment_rate
+                pending.append(Booking(
+                    guest=guest,
+                    room=room,
+                    check_in=day,
+                    check_out=check_out,
+                    total_price=total_price,
+                    booking_name=f"Бронирование {guest.last_name} {day:%d.%m.%Y}",
+                    amount_paid=total_price if is_paid else 0,
+                    is_paid=is_paid,
+                ))
+                if len(pending) >= self.batch_size:
+                    self.flush_bookings(pending, review_rate, totals)
+                    pending = []
+                day = check_out + datetime.timedelta(days=self.rnd.choice([0, 0, 1, 2]))
+        if pending:
+            self.flush_bookings(pending, review_rate, totals)
+        return totals
+
+    def flush_bookings(self, bookings, review_rate, totals):
+        with transaction.atomic():
+            created = Booking.objects.bulk_create(bookings)
+            payments = [
+                Payment(
+                    booking=booking,
+                    amount=booking.total_price,
+                    payment_date=min(booking.check_in - datetime.timedelta(days=self.rnd.randint(0, 30)), self.today),
+                )
+                for booking in created if booking.is_paid
+            ]
+            Payment.objects.bulk_create(payments)
+            reviews = [
+                Review(
+                    guest_name=f"{booking.guest.first_name} {booking.guest.last_name}",
+                    room=booking.room,
+                    rating=self.rnd.choices([1, 2, 3, 4, 5], [3, 5, 12, 35, 45])[0],
+                    comment=self.rnd.choice(REVIEW_COMMENTS),
+                    review_date=min(booking.check_out + datetime.timedelta(days=self.rnd.randint(0, 14)), self.today),
+                )
+                for booking in created
+                if booking.check_out <= self.today and self.rnd.random() < review_rate
+            ]
+            Review.objects.bulk_create(reviews)
+            touch_resources('reviews')
+            if self.with_history:
+                bulk_create_history(Booking, created)
+                bulk_create_history(Payment, payments)
+                bulk_create_history(Review, reviews)
+            bookings_bulk_created.send(sender=Booking, bookings=created)
+        totals['bookings'] += len(created)
+        totals['payments'] += len(payments)
+        totals['reviews'] += len(reviews)
+        self.stdout.write(f"  ... бронирований: {totals['bookings']}")
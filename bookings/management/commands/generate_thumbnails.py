@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from bookings.models import Room
+from bookings.thumbnails import process_room_image_in_worker
+
+
+class Command(BaseCommand):
+    help = 'Создание уменьшенных копий (WebP и JPEG) изображений номеров в пуле потоков'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--room', type=int, action='append', dest='rooms',
+                            help='id номера (можно указать несколько раз); по умолчанию - все номера с изображением')
+        parser.add_argument('--workers', type=int, default=4, help='Число потоков')
+
+    def handle(self, *args, **options):
+        rooms = Room.objects.exclude(image='').order_by('pk')
+        if options['rooms']:
+            rooms = rooms.filter(pk__in=options['rooms'])
+        room_ids = list(rooms.values_list('pk', flat=True))
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as executor:
+            digests = list(executor.map(process_room_image_in_worker, room_ids))
+        failed = digests.count(None)
+        self.stdout.write(self.style.SUCCESS(f'Обработано изображений номеров: {len(room_ids) - failed}'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'Не удалось обработать (нет файла или не изображение): {failed}'))
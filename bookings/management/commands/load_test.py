@@ -0,0 +1,134 @@
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.benchmarks import percentile
+
+# Одинаковые чтения в синхронном (DRF) и асинхронном (bookings/async_views.py) вариантах
+SCENARIOS = {
+    'sync': [
+        '/api/rooms/',
+        '/api/rooms/is_valid_to_book/?room=1&date_range={date_range}',
+        '/api/reviews/?min_rating=4',
+    ],
+    'async': [
+        '/api/async/rooms/',
+        '/api/async/rooms/is_valid_to_book/?room=1&date_range={date_range}',
+        '/api/async/reviews/?min_rating=4',
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест запущенного сервера: запросы в несколько потоков с keep-alive, '
+            'вывод RPS и задержек p50/p95/p99. Пример сравнения WSGI и ASGI: '
+            'load_test --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', dest='targets', metavar='NAME=URL',
+                            help='Сервер для теста (можно указать несколько раз); по умолчанию http://127.0.0.1:8000')
+        parser.add_argument('--scenario', choices=['sync', 'async', 'both'], default='both',
+                            help='Синхронные эндпоинты, асинхронные (/api/async/...) или оба набора')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Свой путь вместо набора сценария (можно указать несколько раз)')
+        parser.add_argument('--concurrency', type=int, default=32, help='Количество одновременных соединений')
+        parser.add_argument('--requests', type=int, default=2000, help='Запросов на сервер и сценарий')
+        parser.add_argument('--warmup', type=int, default=50, help='Прогревочных запросов (не учитываются)')
+        parser.add_argument('--date-range', default='2030-01-01,2030-01-05', help='Даты для проверки занятости')
+        parser.add_argument('--timeout', type=float, default=30, help='Таймаут запроса, секунды')
+        parser.add_argument('--output', help='Файл для результатов в JSON')
+
+    def handle(self, *args, **options):
+        targets = []
+        for spec in options['targets'] or ['local=http://127.0.0.1:8000']:
+            name, _, url = spec.rpartition('=')
+            parts = urlsplit(url)
+            if parts.scheme not in ('http', 'https') or not parts.netloc:
+                raise CommandError(f"Неверный адрес сервера: {spec}")
+            targets.append((name or parts.netloc, parts))
+
+        if options['paths']:
+            scenarios = {'custom': options['paths']}
+        elif options['scenario'] == 'both':
+            scenarios = SCENARIOS
+        else:
+            scenarios = {options['scenario']: SCENARIOS[options['scenario']]}
+
+        results = []
+        for name, target in targets:
+            for scenario, paths in scenarios.items():
+                paths = [path.format(date_range=options['date_range']) for path in paths]
+                self.run(target, paths, options['warmup'], options)
+                result = {'target': name, 'scenario': scenario, **self.run(target, paths, options['requests'], options)}
+                results.append(result)
+                self.report(result)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Результаты записаны в {options['output']}")
+
+    def run(self, target, paths, total, options):
+        """
+        total запросов по кругу по paths в concurrency потоков; у каждого потока своё соединение.
+        """
+        latencies, errors = [], []
+        lock = threading.Lock()
+        counter = iter(range(total))
+
+        def worker():
+            connection_class = http.client.HTTPSConnection if target.scheme == 'https' else http.client.HTTPConnection
+            connection = connection_class(target.netloc, timeout=options['timeout'])
+            local_latencies, local_errors = [], 0
+            try:
+                while True:
+                    with lock:
+                        number = next(counter, None)
+                    if number is None:
+                        break
+                    path = target.path.rstrip('/') + paths[number % len(paths)]
+                    started = time.perf_counter()
+                    try:
+                        connection.request('GET', path, headers={'Accept': 'application/json'})
+                        response = connection.getresponse()
+                        response.read()
+                        if response.status >= 400:
+                            local_errors += 1
+                    except (OSError, http.client.HTTPException):
+                        local_errors += 1
+                        connection.close()  # Переподключение при следующем запросе
+                    local_latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(local_latencies)
+                    errors.append(local_errors)
+
+        threads = [threading.Thread(target=worker) for _ in range(max(1, options['concurrency']))]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': len(latencies),
+            'errors': sum(errors),
+            'concurrency': len(threads),
+            'seconds': round(elapsed, 3),
+            'rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+            **{f'p{int(q * 100)}_ms': round(percentile(latencies, q) * 1000, 2) if latencies else None
+               for q in (0.5, 0.95, 0.99)},
+        }
+
+    def report(self, result):
+        line = (f"{result['target']:>8} / {result['scenario']:<6}: {result['rps']:8.1f} RPS, "
+                f"p50 {result['p50_ms']} мс, p95 {result['p95_ms']} мс, p99 {result['p99_ms']} мс, "
+                f"запросов {result['requests']}, ошибок {result['errors']}")
+        self.stdout.write(self.style.ERROR(line) if result['errors'] else line)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from bookings.payments import rebuild_amounts_paid
+
+
+class Command(BaseCommand):
+    help = ('Пересчёт сумм оплаты броней (amount_paid, is_paid) по всем платежам; '
+            'после него оплаченные суммы в сводке обновляет backfill_daily_stats')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--booking', type=int, action='append', dest='bookings',
+                            help='id брони (можно указать несколько раз); по умолчанию - все брони')
+
+    def handle(self, *args, **options):
+        count = rebuild_amounts_paid(options['bookings'])
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано сумм оплаты броней: {count}'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from bookings.ratings import rebuild_room_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт сводок рейтингов номеров (количество отзывов, средняя оценка, гистограмма) по всем отзывам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--room', type=int, action='append', dest='rooms',
+                            help='id номера (можно указать несколько раз); по умолчанию - все номера')
+
+    def handle(self, *args, **options):
+        count = rebuild_room_ratings(options['rooms'])
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано рейтингов номеров: {count}'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookings.search import SEARCH_INDEXES, create_search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Создание и полная перестройка полнотекстовых индексов SQLite FTS5 (гости, бронирования, отзывы)'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Полнотекстовые индексы FTS5 доступны только для SQLite')
+        create_search_indexes(rebuild=True)
+        for name, index in SEARCH_INDEXES.items():
+            self.stdout.write(f"{name}: {index.fts_table} ({', '.join(index.fields)})")
+        self.stdout.write(self.style.SUCCESS('Поисковые индексы перестроены'))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.jobs import claim_next_job, run_export_job
+
+
+class Command(BaseCommand):
+    help = 'Обработчик очереди фоновых экспортов (ExportJob); файлы сохраняются в BOOKINGS_EXPORT_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Обработать текущую очередь и завершиться')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Пауза между опросами пустой очереди, секунд')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Ожидание задач экспорта...")
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                continue
+            self.stdout.write(f"{job}: начат")
+            run_export_job(job)
+            job.refresh_from_db()
+            if job.status == job.STATUS_DONE:
+                self.stdout.write(self.style.SUCCESS(f"{job}: {job.rows_processed} строк, {job.file.name}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"{job}: {job.error.strip().splitlines()[-1]}"))
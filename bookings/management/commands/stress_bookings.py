@@ -0,0 +1,82 @@
+import datetime
+import random
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models import Exists, OuterRef
+
+from bookings.benchmarks import Timer, scratch_database
+from bookings.models import Booking, Guest, Room
+from bookings.reservations import RoomUnavailable, reserve_room
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочная проверка бронирования: параллельные брони одного номера во временной базе, '
+            'проверка отсутствия двойных броней и пропускная способность')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Количество параллельных потоков')
+        parser.add_argument('--attempts', type=int, default=50, help='Попыток бронирования на поток')
+        parser.add_argument('--days', type=int, default=365, help='Горизонт дат, в котором выбираются брони')
+        parser.add_argument('--seed', type=int, default=None, help='Зерно генератора случайных дат')
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            self.run(options)
+
+    def run(self, options):
+        room = Room.objects.create(name="Stress", room_number="0", room_type="Standard",
+                                   price_per_night=100, max_occupancy=2, image="images/room_1.jpg")
+        guest = Guest.objects.create(first_name="Stress", last_name="Test", email="stress@example.com",
+                                     phone_number="0000000000")
+        start = datetime.date.today()
+        counters = {'created': 0, 'conflicts': 0, 'errors': 0}
+        counters_lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+
+        def worker(seed):
+            rnd = random.Random(seed)
+            barrier.wait()  # Стартуем одновременно, чтобы брони действительно конкурировали
+            try:
+                for _ in range(options['attempts']):
+                    check_in = start + datetime.timedelta(days=rnd.randrange(options['days']))
+                    check_out = check_in + datetime.timedelta(days=rnd.randint(1, 5))
+                    try:
+                        reserve_room(room, check_in, check_out, guest=guest, total_price=100,
+                                     booking_name="Stress booking")
+                        outcome = 'created'
+                    except RoomUnavailable:
+                        outcome = 'conflicts'
+                    except OperationalError:
+                        outcome = 'errors'
+                    with counters_lock:
+                        counters[outcome] += 1
+            finally:
+                connection.close()
+
+        base_seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        threads = [threading.Thread(target=worker, args=(base_seed + i,)) for i in range(options['threads'])]
+        with Timer() as timer:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        overlapping = Booking.objects.filter(room=room).filter(Exists(
+            Booking.objects.filter(
+                room=room, check_in__lt=OuterRef('check_out'), check_out__gt=OuterRef('check_in')
+            ).exclude(pk=OuterRef('pk'))
+        ))
+        double_booked = overlapping.count()
+        attempts = options['threads'] * options['attempts']
+
+        self.stdout.write(f"Потоков: {options['threads']}, попыток: {attempts}, seed: {base_seed}")
+        self.stdout.write(f"Создано броней: {counters['created']}, отказов по занятости: {counters['conflicts']}, "
+                          f"ошибок блокировки: {counters['errors']}")
+        self.stdout.write(f"Время: {timer.elapsed:.2f} с, {counters['created'] / timer.elapsed:.1f} броней/с, "
+                          f"{attempts / timer.elapsed:.1f} попыток/с")
+
+        if double_booked:
+            raise CommandError(f"Обнаружены двойные брони: {double_booked}")
+        self.stdout.write(self.style.SUCCESS('Двойных броней нет'))
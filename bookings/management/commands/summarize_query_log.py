@@ -0,0 +1,101 @@
+import json
+import os
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.benchmarks import percentile
+from bookings.profiling import profiling_settings
+
+SORT_KEYS = ('count', 'p95', 'queries', 'db', 'duplicates')
+
+
+def log_files(path):
+    """
+    Журнал и его архивы ротации (path.1 ... path.N) от старых к новым.
+    """
+    backups = []
+    number = 1
+    while os.path.exists(f'{path}.{number}'):
+        backups.append(f'{path}.{number}')
+        number += 1
+    return [*reversed(backups), *([path] if os.path.exists(path) else [])]
+
+
+def read_entries(paths):
+    skipped = 0
+    entries = []
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:  # Строка, оборванная при ротации или остановке процесса
+                    skipped += 1
+    return entries, skipped
+
+
+class Command(BaseCommand):
+    help = ('Сводка журнала медленных запросов QueryProfilingMiddleware по эндпоинтам: число запросов, '
+            'p50/p95 длительности, SQL-запросы, время в базе и самый частый повторяющийся SQL')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help="Путь к журналу (по умолчанию BOOKINGS_QUERY_PROFILING['log_file'])")
+        parser.add_argument('--by', choices=('view', 'path'), default='view',
+                            help='Группировать по имени представления или по пути')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='p95', help='Сортировка строк сводки')
+        parser.add_argument('--limit', type=int, default=20, help='Сколько эндпоинтов показать')
+
+    def handle(self, *args, **options):
+        path = options['log'] or profiling_settings()['log_file']
+        if not path:
+            raise CommandError("Не задан путь к журналу (--log).")
+        paths = log_files(path)
+        if not paths:
+            raise CommandError(f"Журнал {path} не найден.")
+        entries, skipped = read_entries(paths)
+        if skipped:
+            self.stderr.write(f"Пропущено повреждённых строк: {skipped}")
+        if not entries:
+            self.stdout.write("Журнал пуст")
+            return
+
+        groups = defaultdict(list)
+        for entry in entries:
+            groups[entry.get(options['by']) or entry['path']].append(entry)
+        rows = sorted((self.summarize(name, group) for name, group in groups.items()),
+                      key=lambda row: row[options['sort']], reverse=True)
+
+        self.stdout.write(f"Записей: {len(entries)} из {len(paths)} файлов, эндпоинтов: {len(groups)}")
+        self.stdout.write(f"{'запросов':>8} {'p50 мс':>8} {'p95 мс':>8} {'SQL ср.':>8} {'SQL макс':>8} "
+                          f"{'БД мс ср.':>9} {'повторы':>8}  эндпоинт")
+        for row in rows[:options['limit']]:
+            self.stdout.write(
+                f"{row['count']:>8} {row['p50']:>8.1f} {row['p95']:>8.1f} {row['queries']:>8.1f} "
+                f"{row['max_queries']:>8} {row['db']:>9.1f} {row['duplicates']:>8.1f}  {row['name']}"
+            )
+            if row['duplicate_sql']:
+                fingerprint, sql = row['duplicate_sql']
+                self.stdout.write(f"{'':>8} повторяется [{fingerprint}]: {sql[:160]}")
+
+    def summarize(self, name, entries):
+        durations = sorted(entry['duration_ms'] for entry in entries)
+        count = len(entries)
+        fingerprints = Counter(entry.get('duplicate_fingerprint') for entry in entries)
+        fingerprints.pop(None, None)
+        duplicate_sql = None
+        if fingerprints:
+            fingerprint = fingerprints.most_common(1)[0][0]
+            sql = next(entry['duplicate_sql'] for entry in entries if entry.get('duplicate_fingerprint') == fingerprint)
+            duplicate_sql = fingerprint, sql
+        return {
+            'name': name,
+            'count': count,
+            'p50': percentile(durations, 0.5),
+            'p95': percentile(durations, 0.95),
+            'queries': sum(entry['queries'] for entry in entries) / count,
+            'max_queries': max(entry['queries'] for entry in entries),
+            'db': sum(entry['db_ms'] for entry in entries) / count,
+            'duplicates': sum(entry['duplicates'] for entry in entries) / count,
+            'duplicate_sql': duplicate_sql,
+        }
@@ -0,0 +1,49 @@
+# bookings/middleware.py
+import time
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .history import history_batch
+from .profiling import QueryRecorder, log_request, profiling_settings, server_timing
+
+
+class HistoryBatchMiddleware:
+    """
+    Исторические записи моделей в режиме 'batched' пишутся одним bulk_create в конце запроса
+    (см. BOOKINGS_HISTORY_MODES в settings.py).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with history_batch():
+            return self.get_response(request)
+
+
+class QueryProfilingMiddleware:
+    """
+    Число SQL-запросов и время в базе для каждого запроса: заголовок Server-Timing и журнал
+    медленных запросов (bookings/profiling.py). Включается BOOKINGS_QUERY_PROFILING['enabled'],
+    иначе Django исключает middleware из цепочки.
+    """
+
+    def __init__(self, get_response):
+        config = profiling_settings()
+        if not config['enabled']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_seconds = config['slow_ms'] / 1000
+        self.slow_queries = config['slow_queries']
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        response['Server-Timing'] = server_timing(recorder, total)
+        if total >= self.slow_seconds or recorder.count >= self.slow_queries:
+            log_request(request, response, recorder, total)
+        return response
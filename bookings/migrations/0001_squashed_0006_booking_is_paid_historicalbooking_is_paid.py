@@ -0,0 +1,261 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:53
+# Схема исходных миграций 0001-0006 (в репозитории не сохранились), записанных в django_migrations
+
+import django.db.models.deletion
+import django.utils.timezone
+import simple_history.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    replaces = [
+        ('bookings', '0001_initial'),
+        ('bookings', '0002_guest_user'),
+        ('bookings', '0003_remove_guest_user'),
+        ('bookings', '0004_historicalamenity_historicalbooking_historicalguest_and_more'),
+        ('bookings', '0005_guest_is_blocked_historicalguest_is_blocked_and_more'),
+        ('bookings', '0006_booking_is_paid_historicalbooking_is_paid'),
+    ]
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Amenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название удобства')),
+            ],
+            options={
+                'verbose_name': 'Удобство',
+                'verbose_name_plural': 'Удобства',
+            },
+        ),
+        migrations.CreateModel(
+            name='Guest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=100, verbose_name='Имя')),
+                ('last_name', models.CharField(max_length=100, verbose_name='Фамилия')),
+                ('email', models.EmailField(max_length=254, verbose_name='Электронная почта')),
+                ('phone_number', models.CharField(max_length=20, verbose_name='Телефон')),
+                ('is_blocked', models.BooleanField(default=False, verbose_name='Заблокирован')),
+            ],
+            options={
+                'verbose_name': 'Гость',
+                'verbose_name_plural': 'Гости',
+                'ordering': ['last_name', 'first_name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('check_in', models.DateField(verbose_name='Дата заезда')),
+                ('check_out', models.DateField(verbose_name='Дата выезда')),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Суммарная стоимость')),
+                ('booking_name', models.CharField(max_length=255, verbose_name='Название бронирования')),
+                ('is_paid', models.BooleanField(default=False, verbose_name='Оплачено')),
+                ('guest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookings.guest', verbose_name='Гость')),
+            ],
+            options={
+                'verbose_name': 'Бронирование',
+                'verbose_name_plural': 'Бронирования',
+                'ordering': ['check_in'],
+            },
+        ),
+        migrations.CreateModel(
+            name='HistoricalAmenity',
+            fields=[
+                ('id', models.BigIntegerField(auto_created=True, blank=True, db_index=True, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название удобства')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(db_index=True)),
+                ('history_change_reason', models.CharField(max_length=100, null=True)),
+                ('history_type', models.CharField(choices=[('+', 'Created'), ('~', 'Changed'), ('-', 'Deleted')], max_length=1)),
+                ('history_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'historical Удобство',
+                'verbose_name_plural': 'historical Удобства',
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': ('history_date', 'history_id'),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name='HistoricalGuest',
+            fields=[
+                ('id', models.BigIntegerField(auto_created=True, blank=True, db_index=True, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=100, verbose_name='Имя')),
+                ('last_name', models.CharField(max_length=100, verbose_name='Фамилия')),
+                ('email', models.EmailField(max_length=254, verbose_name='Электронная почта')),
+                ('phone_number', models.CharField(max_length=20, verbose_name='Телефон')),
+                ('is_blocked', models.BooleanField(default=False, verbose_name='Заблокирован')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(db_index=True)),
+                ('history_change_reason', models.CharField(max_length=100, null=True)),
+                ('history_type', models.CharField(choices=[('+', 'Created'), ('~', 'Changed'), ('-', 'Deleted')], max_length=1)),
+                ('history_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'historical Гость',
+                'verbose_name_plural': 'historical Гости',
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': ('history_date', 'history_id'),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name='HistoricalPayment',
+            fields=[
+                ('id', models.BigIntegerField(auto_created=True, blank=True, db_index=True, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Сумма платежа')),
+                ('payment_date', models.DateField(verbose_name='Дата платежа')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(db_index=True)),
+                ('history_change_reason', models.CharField(max_length=100, null=True)),
+                ('history_type', models.CharField(choices=[('+', 'Created'), ('~', 'Changed'), ('-', 'Deleted')], max_length=1)),
+                ('booking', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='bookings.booking', verbose_name='Бронирование')),
+                ('history_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'historical Платеж',
+                'verbose_name_plural': 'historical Платежи',
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': ('history_date', 'history_id'),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name='HistoricalRoom',
+            fields=[
+                ('id', models.BigIntegerField(auto_created=True, blank=True, db_index=True, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название номера')),
+                ('room_number', models.CharField(max_length=10, verbose_name='Номер комнаты')),
+                ('room_type', models.CharField(max_length=50, verbose_name='Тип номера')),
+                ('price_per_night', models.DecimalField(decimal_places=2, max_digits=6, verbose_name='Цена за ночь')),
+                ('max_occupancy', models.IntegerField(verbose_name='Максимальная вместимость')),
+                ('image', models.TextField(max_length=100, verbose_name='Изображение')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(db_index=True)),
+                ('history_change_reason', models.CharField(max_length=100, null=True)),
+                ('history_type', models.CharField(choices=[('+', 'Created'), ('~', 'Changed'), ('-', 'Deleted')], max_length=1)),
+                ('history_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'historical Номер',
+                'verbose_name_plural': 'historical Номера',
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': ('history_date', 'history_id'),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Сумма платежа')),
+                ('payment_date', models.DateField(verbose_name='Дата платежа')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookings.booking', verbose_name='Бронирование')),
+            ],
+            options={
+                'verbose_name': 'Платеж',
+                'verbose_name_plural': 'Платежи',
+                'ordering': ['payment_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Room',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название номера')),
+                ('room_number', models.CharField(max_length=10, verbose_name='Номер комнаты')),
+                ('room_type', models.CharField(max_length=50, verbose_name='Тип номера')),
+                ('price_per_night', models.DecimalField(decimal_places=2, max_digits=6, verbose_name='Цена за ночь')),
+                ('max_occupancy', models.IntegerField(verbose_name='Максимальная вместимость')),
+                ('image', models.ImageField(upload_to='images/', verbose_name='Изображение')),
+                ('amenities', models.ManyToManyField(blank=True, to='bookings.amenity', verbose_name='Удобства')),
+            ],
+            options={
+                'verbose_name': 'Номер',
+                'verbose_name_plural': 'Номера',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guest_name', models.CharField(max_length=100, verbose_name='Имя гостя')),
+                ('rating', models.IntegerField(verbose_name='Оценка')),
+                ('comment', models.TextField(verbose_name='Комментарий')),
+                ('review_date', models.DateField(default=django.utils.timezone.now, verbose_name='Дата отзыва')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookings.room', verbose_name='Номер')),
+            ],
+            options={
+                'verbose_name': 'Отзыв',
+                'verbose_name_plural': 'Отзывы',
+                'ordering': ['review_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='HistoricalReview',
+            fields=[
+                ('id', models.BigIntegerField(auto_created=True, blank=True, db_index=True, verbose_name='ID')),
+                ('guest_name', models.CharField(max_length=100, verbose_name='Имя гостя')),
+                ('rating', models.IntegerField(verbose_name='Оценка')),
+                ('comment', models.TextField(verbose_name='Комментарий')),
+                ('review_date', models.DateField(default=django.utils.timezone.now, verbose_name='Дата отзыва')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(db_index=True)),
+                ('history_change_reason', models.CharField(max_length=100, null=True)),
+                ('history_type', models.CharField(choices=[('+', 'Created'), ('~', 'Changed'), ('-', 'Deleted')], max_length=1)),
+                ('history_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('room', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='bookings.room', verbose_name='Номер')),
+            ],
+            options={
+                'verbose_name': 'historical Отзыв',
+                'verbose_name_plural': 'historical Отзывы',
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': ('history_date', 'history_id'),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name='HistoricalBooking',
+            fields=[
+                ('id', models.BigIntegerField(auto_created=True, blank=True, db_index=True, verbose_name='ID')),
+                ('check_in', models.DateField(verbose_name='Дата заезда')),
+                ('check_out', models.DateField(verbose_name='Дата выезда')),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Суммарная стоимость')),
+                ('booking_name', models.CharField(max_length=255, verbose_name='Название бронирования')),
+                ('is_paid', models.BooleanField(default=False, verbose_name='Оплачено')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(db_index=True)),
+                ('history_change_reason', models.CharField(max_length=100, null=True)),
+                ('history_type', models.CharField(choices=[('+', 'Created'), ('~', 'Changed'), ('-', 'Deleted')], max_length=1)),
+                ('guest', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='bookings.guest', verbose_name='Гость')),
+                ('history_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('room', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='bookings.room', verbose_name='Номер')),
+            ],
+            options={
+                'verbose_name': 'historical Бронирование',
+                'verbose_name_plural': 'historical Бронирования',
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': ('history_date', 'history_id'),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='room',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookings.room', verbose_name='Номер'),
+        ),
+    ]
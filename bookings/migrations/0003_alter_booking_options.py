@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_booking_room_dates_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='booking',
+            options={'ordering': ['check_in'], 'permissions': [('export_booking', 'Может экспортировать бронирования')], 'verbose_name': 'Бронирование', 'verbose_name_plural': 'Бронирования'},
+        ),
+    ]
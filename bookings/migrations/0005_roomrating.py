@@ -0,0 +1,61 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_room_ratings(apps, schema_editor):
+    """
+    Сводки оценок для существующих номеров по их отзывам (как rebuild_room_ratings).
+    """
+    Room = apps.get_model('bookings', 'Room')
+    RoomRating = apps.get_model('bookings', 'RoomRating')
+    aggregates = {
+        'review_count': Count('review'),
+        'rating_sum': Coalesce(Sum('review__rating'), 0),
+        **{f'rating_{rating}': Count('review', filter=Q(review__rating=rating)) for rating in range(1, 6)},
+    }
+    now = django.utils.timezone.now()
+    RoomRating.objects.bulk_create([
+        RoomRating(
+            room_id=row.pop('pk'),
+            average=row['rating_sum'] / row['review_count'] if row['review_count'] else 0,
+            updated_at=now,
+            **row,
+        )
+        for row in Room.objects.order_by().values('pk').annotate(**aggregates)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomRating',
+            fields=[
+                ('room', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to='bookings.room', verbose_name='Номер')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('rating_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('average', models.FloatField(default=0, verbose_name='Средняя оценка')),
+                ('rating_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('rating_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('rating_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('rating_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('rating_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг номера',
+                'verbose_name_plural': 'Рейтинги номеров',
+                'indexes': [models.Index(fields=['-average', '-review_count'], name='roomrating_average_idx')],
+            },
+        ),
+        migrations.RunPython(fill_room_ratings, migrations.RunPython.noop),
+    ]
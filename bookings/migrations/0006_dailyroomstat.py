@@ -0,0 +1,74 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:05
+
+import datetime
+from collections import defaultdict
+from decimal import ROUND_DOWN, Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CENT = Decimal('0.01')
+CHUNK_SIZE = 5000
+
+
+def split_amount(amount, parts):
+    share = (amount / parts).quantize(CENT, rounding=ROUND_DOWN)
+    return [share] * (parts - 1) + [amount - share * (parts - 1)]
+
+
+def fill_daily_stats(apps, schema_editor):
+    """
+    Строки сводки для существующих броней (как backfill_daily_stats): выручка и оплаты брони
+    (сумма её платежей) поровну по ночам, остаток округления - в последнюю ночь.
+    """
+    Booking = apps.get_model('bookings', 'Booking')
+    Payment = apps.get_model('bookings', 'Payment')
+    DailyRoomStat = apps.get_model('bookings', 'DailyRoomStat')
+    paid = defaultdict(Decimal)
+    for booking_id, amount in Payment.objects.order_by().values_list('booking_id', 'amount').iterator():
+        paid[booking_id] += Decimal(amount)
+    nights = []
+    bookings = Booking.objects.order_by('pk').values_list('pk', 'room_id', 'check_in', 'check_out', 'total_price')
+    for pk, room_id, check_in, check_out, total_price in bookings.iterator(chunk_size=CHUNK_SIZE):
+        count = (check_out - check_in).days
+        if count <= 0:
+            continue
+        revenue = split_amount(Decimal(total_price), count)
+        paid_shares = split_amount(paid[pk].quantize(CENT), count)
+        nights.extend(
+            DailyRoomStat(room_id=room_id, booking_id=pk, date=check_in + datetime.timedelta(days=night),
+                          revenue=revenue[night], paid=paid_shares[night])
+            for night in range(count)
+        )
+        if len(nights) >= CHUNK_SIZE:
+            DailyRoomStat.objects.bulk_create(nights, batch_size=CHUNK_SIZE)
+            nights = []
+    DailyRoomStat.objects.bulk_create(nights, batch_size=CHUNK_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_roomrating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRoomStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Ночь')),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Выручка за ночь')),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Оплачено за ночь')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='bookings.booking', verbose_name='Бронирование')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookings.room', verbose_name='Номер')),
+            ],
+            options={
+                'verbose_name': 'Статистика номера за ночь',
+                'verbose_name_plural': 'Статистика номеров по ночам',
+                'indexes': [models.Index(fields=['date', 'room', 'revenue', 'paid'], name='dailyroomstat_date_room_idx')],
+                'constraints': [models.UniqueConstraint(fields=('booking', 'date'), name='dailyroomstat_booking_date_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:05
+
+import django.db.models.deletion
+import simple_history.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_dailyroomstat'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonalRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('room_type', models.CharField(blank=True, max_length=50, verbose_name='Тип номера')),
+                ('start_date', models.DateField(verbose_name='Первая ночь')),
+                ('end_date', models.DateField(verbose_name='Дата окончания (не включительно)')),
+                ('price_per_night', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='Цена за ночь')),
+                ('multiplier', models.DecimalField(decimal_places=2, default=1, max_digits=4, verbose_name='Множитель базовой цены')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='bookings.room', verbose_name='Номер')),
+            ],
+            options={
+                'verbose_name': 'Сезонный тариф',
+                'verbose_name_plural': 'Сезонные тарифы',
+                'ordering': ['start_date'],
+                'indexes': [models.Index(fields=['start_date', 'end_date'], name='seasonalrate_dates_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HistoricalSeasonalRate',
+            fields=[
+                ('id', models.BigIntegerField(auto_created=True, blank=True, db_index=True, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('room_type', models.CharField(blank=True, max_length=50, verbose_name='Тип номера')),
+                ('start_date', models.DateField(verbose_name='Первая ночь')),
+                ('end_date', models.DateField(verbose_name='Дата окончания (не включительно)')),
+                ('price_per_night', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='Цена за ночь')),
+                ('multiplier', models.DecimalField(decimal_places=2, default=1, max_digits=4, verbose_name='Множитель базовой цены')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(db_index=True)),
+                ('history_change_reason', models.CharField(max_length=100, null=True)),
+                ('history_type', models.CharField(choices=[('+', 'Created'), ('~', 'Changed'), ('-', 'Deleted')], max_length=1)),
+                ('history_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('room', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='bookings.room', verbose_name='Номер')),
+            ],
+            options={
+                'verbose_name': 'historical Сезонный тариф',
+                'verbose_name_plural': 'historical Сезонные тарифы',
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': ('history_date', 'history_id'),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+    ]
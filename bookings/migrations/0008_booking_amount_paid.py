@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:05
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+
+def fill_amounts_paid(apps, schema_editor):
+    """
+    Суммы оплаты существующих броней по их платежам и производный признак оплаты
+    (как rebuild_amounts_paid): is_paid - платежи покрывают стоимость брони.
+    """
+    Booking = apps.get_model('bookings', 'Booking')
+    Payment = apps.get_model('bookings', 'Payment')
+    paid = Payment.objects.filter(booking=OuterRef('pk')).order_by().values('booking').annotate(total=Sum('amount'))
+    zero = Value(Decimal(0), output_field=models.DecimalField(max_digits=10, decimal_places=2))
+    bookings = Booking.objects.order_by()
+    bookings.update(amount_paid=Round(Coalesce(Subquery(paid.values('total')), zero), 2))
+    bookings.update(is_paid=Q(total_price__lte=F('amount_paid')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_seasonalrate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Оплачено, сумма'),
+        ),
+        migrations.AddField(
+            model_name='historicalbooking',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Оплачено, сумма'),
+        ),
+        migrations.RunPython(fill_amounts_paid, migrations.RunPython.noop),
+    ]
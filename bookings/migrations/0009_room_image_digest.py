@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_booking_amount_paid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='image_digest',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Хэш изображения'),
+        ),
+        migrations.AddField(
+            model_name='historicalroom',
+            name='image_digest',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Хэш изображения'),
+        ),
+    ]
@@ -1,8 +1,11 @@
 # bookings/models.py
 
-from django.db import models
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models, transaction
 from django.utils import timezone
-from simple_history.models import HistoricalRecords
+
+from .history import ConfigurableHistoricalRecords as HistoricalRecords
 
 
 class Amenity(models.Model):
@@ -26,6 +29,8 @@ class Room(models.Model):
     max_occupancy = models.IntegerField(verbose_name="Максимальная вместимость")
     amenities = models.ManyToManyField('Amenity', blank=True, verbose_name="Удобства")
     image = models.ImageField(upload_to='images/', verbose_name="Изображение")
+    # Хэш содержимого изображения - имя каталога уменьшенных копий (bookings/thumbnails.py)
+    image_digest = models.CharField(max_length=64, blank=True, editable=False, verbose_name="Хэш изображения")
 
     history = HistoricalRecords()  # Отслеживание истории
 
@@ -54,6 +59,10 @@ class Guest(models.Model):
         verbose_name = "Гость"
         verbose_name_plural = "Гости"
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Сортировка списков гостей и поиск гостя по имени при бронировании (book_room)
+            models.Index(fields=['last_name', 'first_name'], name='guest_name_idx'),
+        ]
 
 
 class Booking(models.Model):
@@ -63,6 +72,8 @@ class Booking(models.Model):
     check_out = models.DateField(verbose_name="Дата выезда")
     total_price = models.DecimalField(max_digits=8, decimal_places=2, verbose_name="Суммарная стоимость")
     booking_name = models.CharField(max_length=255, verbose_name="Название бронирования")
+    # Сумма платежей и признак оплаты ведут сигналы Payment (bookings/payments.py)
+    amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Оплачено, сумма")
     is_paid = models.BooleanField(default=False, verbose_name="Оплачено")
 
     history = HistoricalRecords()  # Отслеживание истории
@@ -70,10 +81,43 @@ class Booking(models.Model):
     def __str__(self):
         return f"{self.booking_name} ({self.guest.first_name} {self.guest.last_name})"
 
+    @property
+    def balance_due(self):
+        return max(self.total_price - self.amount_paid, 0)
+
+    def save(self, *args, **kwargs):
+        """
+        amount_paid меняется только платежами, поэтому при сохранении существующей брони он
+        не перезаписывается значением из (возможно, устаревшего) экземпляра: актуальная сумма
+        читается под блокировкой строки, и is_paid пишется тем же UPDATE, что и остальные поля -
+        например, после изменения total_price. История получает уже пересчитанный is_paid.
+        """
+        if self._state.adding or kwargs.get('update_fields') is not None:
+            self.is_paid = self.amount_paid >= self.total_price
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get('using')):
+            amount_paid = Booking.objects.select_for_update().filter(pk=self.pk).values_list(
+                'amount_paid', flat=True).first()
+            if amount_paid is not None:
+                self.amount_paid = amount_paid
+            self.is_paid = self.amount_paid >= self.total_price
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name != 'amount_paid']
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Бронирование"
         verbose_name_plural = "Бронирования"
         ordering = ['check_in']
+        # Выгрузка броней с персональными данными гостей (IMPORT_EXPORT_EXPORT_PERMISSION_CODE)
+        permissions = [('export_booking', "Может экспортировать бронирования")]
+        indexes = [
+            # Поиск пересекающихся броней номера (availability.py, проверки при бронировании)
+            models.Index(fields=['room', 'check_in', 'check_out'], name='booking_room_dates_idx'),
+            # Списки API и админки: сортировка по умолчанию (check_in, id) и фильтры по датам
+            models.Index(fields=['check_in'], name='booking_check_in_idx'),
+            models.Index(fields=['check_out'], name='booking_check_out_idx'),
+        ]
 
 
 class Payment(models.Model):
@@ -87,6 +131,11 @@ class Payment(models.Model):
         verbose_name = "Платеж"
         verbose_name_plural = "Платежи"
         ordering = ['payment_date']
+        indexes = [
+            # Сортировка по умолчанию и фильтр payment_date; фильтры и сортировка по сумме
+            models.Index(fields=['payment_date'], name='payment_date_idx'),
+            models.Index(fields=['amount'], name='payment_amount_idx'),
+        ]
 
 
 class Review(models.Model):
@@ -105,3 +154,146 @@ class Review(models.Model):
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
         ordering = ['review_date']
+        indexes = [
+            models.Index(fields=['review_date'], name='review_date_idx'),
+            # Лучшие отзывы (rating = 5) и фильтр по оценке с сортировкой по дате
+            models.Index(fields=['rating', 'review_date'], name='review_rating_date_idx'),
+            # Последние отзывы номера
+            models.Index(fields=['room', 'review_date'], name='review_room_date_idx'),
+        ]
+
+
+class SeasonalRate(models.Model):
+    """
+    Сезонный тариф на ночи [start_date, end_date): для номера, для типа номеров или для всех номеров.
+    Задаёт цену за ночь либо множитель к базовой цене номера (bookings/pricing.py).
+    """
+    name = models.CharField(max_length=100, verbose_name="Название")
+    room = models.ForeignKey(Room, null=True, blank=True, on_delete=models.CASCADE, verbose_name="Номер")
+    room_type = models.CharField(max_length=50, blank=True, verbose_name="Тип номера")
+    start_date = models.DateField(verbose_name="Первая ночь")
+    end_date = models.DateField(verbose_name="Дата окончания (не включительно)")
+    price_per_night = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True,
+                                          verbose_name="Цена за ночь")
+    multiplier = models.DecimalField(max_digits=4, decimal_places=2, default=1,
+                                     verbose_name="Множитель базовой цены")
+
+    history = HistoricalRecords()  # Отслеживание истории
+
+    def __str__(self):
+        return f"{self.name} ({self.start_date} - {self.end_date})"
+
+    class Meta:
+        verbose_name = "Сезонный тариф"
+        verbose_name_plural = "Сезонные тарифы"
+        ordering = ['start_date']
+        indexes = [
+            models.Index(fields=['start_date', 'end_date'], name='seasonalrate_dates_idx'),
+        ]
+
+
+class RoomRating(models.Model):
+    """
+    Сводка оценок номера: количество отзывов, средняя оценка и гистограмма 1-5.
+    Поддерживается инкрементально при изменении отзывов (bookings/ratings.py).
+    """
+    room = models.OneToOneField(Room, on_delete=models.CASCADE, primary_key=True, related_name='rating',
+                                verbose_name="Номер")
+    review_count = models.PositiveIntegerField(default=0, verbose_name="Количество отзывов")
+    rating_sum = models.PositiveIntegerField(default=0, verbose_name="Сумма оценок")
+    average = models.FloatField(default=0, verbose_name="Средняя оценка")
+    rating_1 = models.PositiveIntegerField(default=0, verbose_name="Оценок 1")
+    rating_2 = models.PositiveIntegerField(default=0, verbose_name="Оценок 2")
+    rating_3 = models.PositiveIntegerField(default=0, verbose_name="Оценок 3")
+    rating_4 = models.PositiveIntegerField(default=0, verbose_name="Оценок 4")
+    rating_5 = models.PositiveIntegerField(default=0, verbose_name="Оценок 5")
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name="Обновлено")
+
+    def __str__(self):
+        return f"Рейтинг «{self.room_id}»: {self.average:.2f} ({self.review_count})"
+
+    @property
+    def histogram(self):
+        return {str(rating): getattr(self, f'rating_{rating}') for rating in range(1, 6)}
+
+    class Meta:
+        verbose_name = "Рейтинг номера"
+        verbose_name_plural = "Рейтинги номеров"
+        indexes = [
+            # Сортировка каталога по рейтингу (?order_by=rating)
+            models.Index(fields=['-average', '-review_count'], name='roomrating_average_idx'),
+        ]
+
+
+class DailyRoomStat(models.Model):
+    """
+    Дневная сводка: одна строка на занятую ночь номера с долей выручки и оплат брони.
+    Поддерживается при изменении броней и платежей (bookings/analytics.py), основа /api/analytics/.
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, verbose_name="Номер")
+    date = models.DateField(verbose_name="Ночь")
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='nights', verbose_name="Бронирование")
+    revenue = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Выручка за ночь")
+    paid = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Оплачено за ночь")
+
+    def __str__(self):
+        return f"{self.room_id} / {self.date}"
+
+    class Meta:
+        verbose_name = "Статистика номера за ночь"
+        verbose_name_plural = "Статистика номеров по ночам"
+        constraints = [
+            models.UniqueConstraint(fields=['booking', 'date'], name='dailyroomstat_booking_date_uniq'),
+        ]
+        indexes = [
+            # Покрывающий индекс для сумм по диапазону дат (запрос не читает саму таблицу)
+            models.Index(fields=['date', 'room', 'revenue', 'paid'], name='dailyroomstat_date_room_idx'),
+        ]
+
+
+def export_storage():
+    # Не MEDIA_ROOT: медиафайлы раздаются без авторизации
+    return FileSystemStorage(location=settings.BOOKINGS_EXPORT_ROOT)
+
+
+class ExportJob(models.Model):
+    """
+    Задача фонового экспорта (очередь в базе данных, обрабатывается командой run_export_worker).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'В очереди'),
+        (STATUS_RUNNING, 'Выполняется'),
+        (STATUS_DONE, 'Готово'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+    FORMAT_CHOICES = [('csv', 'CSV'), ('xlsx', 'XLSX')]
+
+    resource = models.CharField(max_length=255, verbose_name="Ресурс экспорта")
+    # Параметры списка админки (фильтры, поиск, сортировка) и отмеченные записи, если выбраны не все
+    # найденные: queryset строится заново в обработчике (bookings/jobs.py)
+    filter_params = models.JSONField(default=dict, blank=True, verbose_name="Параметры списка")
+    object_ids = models.JSONField(default=list, blank=True, verbose_name="Отмеченные записи")
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, verbose_name="Формат")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True,
+                              verbose_name="Статус")
+    total_rows = models.PositiveIntegerField(null=True, blank=True, verbose_name="Всего строк")
+    rows_processed = models.PositiveIntegerField(default=0, verbose_name="Обработано строк")
+    file = models.FileField(storage=export_storage, blank=True, verbose_name="Файл")
+    error = models.TextField(blank=True, verbose_name="Ошибка")
+    created_by = models.ForeignKey('auth.User', null=True, blank=True, on_delete=models.SET_NULL,
+                                   verbose_name="Автор")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создана")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Начата")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершена")
+
+    def __str__(self):
+        return f"Экспорт #{self.pk} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = "Фоновый экспорт"
+        verbose_name_plural = "Фоновые экспорты"
+        ordering = ['-created_at']
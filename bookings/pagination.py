@@ -0,0 +1,323 @@
+# bookings/pagination.py
+"""
+Keyset (курсорная) пагинация для API и HTML-страниц.
+
+Вместо OFFSET следующая страница выбирается условием "после последней показанной строки"
+по полям сортировки модели (Meta.ordering) и id: (check_in, id) > (последний check_in, последний id).
+Такой запрос идёт по индексу, поэтому страница N стоит столько же, сколько первая.
+Общее количество строк по умолчанию считается точно (COUNT(*)), как в PageNumberPagination;
+клиент может отказаться от подсчёта или запросить оценку параметром count=none|estimate,
+режим по умолчанию задаёт настройка BOOKINGS_PAGINATION_COUNT.
+
+Если сортировка не поддерживается (выражения, nullable-поля, например сортировка по релевантности
+поиска) или в запросе передан page, используется обычная PageNumberPagination.
+
+EstimatedCountPaginator - Paginator для списков админки с оценкой количества строк на больших таблицах.
+"""
+import base64
+import binascii
+import json
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+COUNT_NONE = 'none'
+COUNT_ESTIMATE = 'estimate'
+COUNT_EXACT = 'exact'
+COUNT_MODES = (COUNT_NONE, COUNT_ESTIMATE, COUNT_EXACT)
+ESTIMATE_COUNT_LIMIT = 1000
+# Столбец, приведённый к тексту в базе (ValuesSerializer); в курсоре - та же строка, что дал бы
+# DjangoJSONEncoder, а decode_cursor приводит её к типу поля
+TEXT_COLUMN = '{}_text'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def default_count_mode():
+    return getattr(settings, 'BOOKINGS_PAGINATION_COUNT', COUNT_EXACT)
+
+
+def keyset_ordering(queryset):
+    """
+    Поля сортировки queryset в виде [(поле модели, по убыванию)], дополненные id.
+    None, если по такой сортировке нельзя построить условие keyset (выражения, nullable-поля, связи).
+    """
+    opts = queryset.model._meta
+    if queryset.query.order_by:
+        ordering = queryset.query.order_by
+    elif queryset.query.default_ordering:
+        ordering = opts.ordering
+    else:
+        ordering = ()
+
+    result = []
+    for item in ordering:
+        if not isinstance(item, str) or item == '?':
+            return None
+        descending = item.startswith('-')
+        name = item.lstrip('-')
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.null or getattr(field, 'many_to_many', False):
+            return None
+        result.append((field, descending))
+        if field.primary_key:
+            return result
+    result.append((opts.pk, result[-1][1] if result else False))
+    return result
+
+
+def encode_cursor(values, reverse=False):
+    payload = json.dumps({'v': values, 'r': int(reverse)}, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    """
+    Курсор -> (значения полей сортировки, направление). Значения приводятся к типам полей.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values, reverse = payload['v'], bool(payload['r'])
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise InvalidCursor
+        return [field.to_python(value) for (field, _), value in zip(ordering, values)], reverse
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError, ValidationError):
+        raise InvalidCursor
+
+
+def keyset_filter(ordering, values, reverse=False):
+    """
+    Условие "строго после (или до, при reverse) строки со значениями values" в порядке ordering:
+    (a > x) OR (a = x AND b > y) OR ... с учётом направления каждого поля.
+    """
+    condition = Q()
+    equal = {}
+    for (field, descending), value in zip(ordering, values):
+        lookup = 'lt' if descending != reverse else 'gt'
+        condition |= Q(**equal, **{f'{field.attname}__{lookup}': value})
+        equal[field.attname] = value
+    return condition
+
+
+def estimate_count(queryset):
+    """
+    Дешёвая оценка количества строк: без фильтров - по максимальному id (индекс первичного ключа),
+    с фильтрами - COUNT не более чем по ESTIMATE_COUNT_LIMIT строкам. Возвращает (количество, точное ли).
+    """
+    if not queryset.query.where:
+        return queryset.model._default_manager.aggregate(max_id=Max('pk'))['max_id'] or 0, False
+    count = queryset.order_by()[:ESTIMATE_COUNT_LIMIT + 1].count()
+    return min(count, ESTIMATE_COUNT_LIMIT), count <= ESTIMATE_COUNT_LIMIT
+
+
+def exact_count_limit():
+    return getattr(settings, 'BOOKINGS_ADMIN_EXACT_COUNT_LIMIT', 10000)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator с оценкой количества строк для списков без фильтров: если максимальный id
+    таблицы больше BOOKINGS_ADMIN_EXACT_COUNT_LIMIT, COUNT(*) по всей таблице не выполняется
+    и количество берётся по индексу первичного ключа. Списки с фильтрами и небольшие
+    таблицы считаются точно. BOOKINGS_ADMIN_EXACT_COUNT_LIMIT = None - всегда точно.
+    После удалений оценка больше точного количества, и последние страницы могут быть пустыми.
+    """
+
+    @cached_property
+    def count(self):
+        limit = exact_count_limit()
+        if limit is not None and not self.object_list.query.where:
+            estimate, _ = estimate_count(self.object_list)
+            if estimate > limit:
+                return estimate
+        return super().count
+
+
+class KeysetPage(list):
+    """
+    Строки страницы и курсоры соседних страниц.
+    """
+    next_cursor = None
+    previous_cursor = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Ядро keyset-пагинации, общее для API (KeysetPagination) и HTML-страниц (keyset_page).
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        self.ordering = ordering or keyset_ordering(queryset)
+        if self.ordering is None:
+            raise ValueError("Сортировка queryset не поддерживает keyset-пагинацию.")
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        queryset, reverse = self._page_queryset(cursor)
+        rows = list(queryset[:self.per_page + 1])
+        if reverse and not rows:
+            return self.page()  # Перед курсором строк не осталось - показываем начало списка
+        return self._build_page(rows, cursor, reverse)
+
+    async def apage(self, cursor=None):
+        """
+        page() для асинхронных представлений: строки читаются асинхронным ORM.
+        """
+        queryset, reverse = self._page_queryset(cursor)
+        rows = [row async for row in queryset[:self.per_page + 1]]
+        if reverse and not rows:
+            return await self.apage()
+        return self._build_page(rows, cursor, reverse)
+
+    def _page_queryset(self, cursor):
+        reverse = False
+        queryset = self.queryset.order_by(*(
+            f"{'-' if descending else ''}{field.attname}" for field, descending in self.ordering
+        ))
+        if cursor:
+            values, reverse = decode_cursor(cursor, self.ordering)
+            queryset = queryset.filter(keyset_filter(self.ordering, values, reverse))
+            if reverse:
+                queryset = queryset.reverse()
+        return queryset, reverse
+
+    def _build_page(self, rows, cursor, reverse):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        page = KeysetPage(rows)
+        if rows:
+            has_next, has_previous = (True, has_more) if reverse else (has_more, bool(cursor))
+            if has_next:
+                page.next_cursor = encode_cursor(self._values(rows[-1]))
+            if has_previous:
+                page.previous_cursor = encode_cursor(self._values(rows[0]), reverse=True)
+        return page
+
+    def _values(self, obj):
+        if isinstance(obj, dict):  # Строки queryset.values() (bookings/fast_reads.py)
+            return [obj[field.attname] if field.attname in obj else obj[TEXT_COLUMN.format(field.attname)]
+                    for field, _ in self.ordering]
+        return [getattr(obj, field.attname) for field, _ in self.ordering]
+
+
+class FallbackPageNumberPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация DRF: ?cursor=... вместо ?page=N, count=none|estimate|exact.
+    Ответ: {"count", "next", "previous", "results"} (count равен null, если не считается).
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    fallback_class = FallbackPageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fallback = None
+        ordering = keyset_ordering(queryset)
+        if ordering is None or 'page' in request.query_params:
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.count, self.count_is_exact = self.get_count(queryset, request)
+        try:
+            self.page = KeysetPaginator(queryset, self.get_page_size(request), ordering).page(
+                request.query_params.get(self.cursor_query_param)
+            )
+        except InvalidCursor:
+            raise NotFound("Неверный курсор.")
+        return list(self.page)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode not in COUNT_MODES:
+            mode = default_count_mode()
+        if mode == COUNT_EXACT:
+            return queryset.count(), True
+        if mode == COUNT_ESTIMATE:
+            return estimate_count(queryset)
+        return None, False
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), 'page')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        body = {
+            'count': self.count,
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': data,
+        }
+        if self.count is not None and not self.count_is_exact:
+            body['count_is_estimate'] = True
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return FallbackPageNumberPagination().get_paginated_response_schema(schema)
+
+
+def keyset_page(request, queryset, per_page=5, query=None):
+    """
+    Страница для HTML-вьюх: ?cursor=... в адресе, остальные GET-параметры (фильтры) сохраняются
+    в ссылках page.next_query / page.previous_query / page.first_query.
+    query заменяет request.GET (например, нормализованные параметры).
+    """
+    query = request.GET if query is None else query
+    try:
+        page = KeysetPaginator(queryset, per_page).page(query.get('cursor'))
+    except InvalidCursor:
+        page = KeysetPaginator(queryset, per_page).page()
+    params = [(key, value) for key, values in query.lists() if key not in ('cursor', 'page') for value in values]
+    page.first_query = urlencode(params)
+    page.next_query = page.next_cursor and urlencode(params + [('cursor', page.next_cursor)])
+    page.previous_query = page.previous_cursor and urlencode(params + [('cursor', page.previous_cursor)])
+    return page
@@ -0,0 +1,96 @@
+# bookings/payments.py
+"""
+Сумма оплаты брони (Booking.amount_paid) и производный признак is_paid.
+
+Создание, изменение и удаление платежа меняют сумму брони одним UPDATE с F-выражением
+(amount_paid = amount_paid + delta), в том же UPDATE пересчитывается is_paid, поэтому
+параллельные платежи не теряют обновлений, а признак оплаты не расходится с суммой.
+Платежи, созданные через bulk_create, учитываются вызовом rebuild_amounts_paid().
+UPDATE идёт в обход Booking.save(), поэтому запись истории брони с новыми amount_paid и is_paid
+добавляет payments_changed().
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .history import MODE_OFF, history_mode, record_history
+from .models import Booking, Payment
+from .signals import booking_payments_changed
+
+ZERO = Value(Decimal(0), output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def apply_payment(booking_id, delta):
+    """
+    Прибавить к сумме оплаты брони delta (отрицательную - при удалении или уменьшении платежа).
+    """
+    delta = Decimal(str(delta))
+    if not delta:
+        return
+    # Правая часть UPDATE видит старые значения строки, поэтому is_paid считается по новому выражению.
+    # Округление до копеек: в SQLite десятичные поля хранятся как REAL, и сумма без него
+    # может оказаться на долю копейки меньше цены брони
+    amount_paid = Round(F('amount_paid') + delta, 2)
+    Booking.objects.filter(pk=booking_id).update(
+        amount_paid=amount_paid, is_paid=Q(total_price__lte=amount_paid),
+    )
+
+
+def rebuild_amounts_paid(booking_ids=None):
+    """
+    Пересчёт сумм оплаты по таблице платежей одним UPDATE с подзапросом. Возвращает число броней.
+    """
+    bookings = Booking.objects.order_by()
+    if booking_ids is not None:
+        bookings = bookings.filter(pk__in=list(booking_ids))
+    paid = Payment.objects.filter(booking=OuterRef('pk')).order_by().values('booking').annotate(total=Sum('amount'))
+    amount_paid = Round(Coalesce(Subquery(paid.values('total')), ZERO), 2)
+    with transaction.atomic():
+        count = bookings.update(amount_paid=amount_paid)
+        bookings.update(is_paid=Q(total_price__lte=F('amount_paid')))
+    return count
+
+
+def payments_changed(booking_ids):
+    booking_ids = {pk for pk in booking_ids if pk is not None}
+    if history_mode(Booking) != MODE_OFF:
+        # При каскадном удалении брони строк уже нет - и записывать нечего
+        for booking in Booking.objects.filter(pk__in=booking_ids).order_by():
+            record_history(booking)
+    booking_payments_changed.send(sender=Payment, booking_ids=booking_ids)
+
+
+@receiver(pre_save, sender=Payment)
+def remember_payment_amount(sender, instance, raw=False, **kwargs):
+    """
+    Запоминаем прежние бронь и сумму платежа, чтобы при изменении перенести их.
+    """
+    instance._payment_before = None
+    if instance.pk and not raw:
+        instance._payment_before = Payment.objects.filter(pk=instance.pk).values_list('booking_id', 'amount').first()
+
+
+@receiver(post_save, sender=Payment)
+def update_amount_paid_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_payment_before', None)
+    after = (instance.booking_id, Decimal(str(instance.amount)))
+    if before == after:
+        return
+    with transaction.atomic():
+        if before is not None:
+            apply_payment(before[0], -before[1])
+        apply_payment(*after)
+    payments_changed({after[0], before and before[0]})
+
+
+@receiver(post_delete, sender=Payment)
+def update_amount_paid_on_delete(sender, instance, **kwargs):
+    # При каскадном удалении брони UPDATE не найдёт строку и ничего не изменит
+    apply_payment(instance.booking_id, -Decimal(str(instance.amount)))
+    payments_changed({instance.booking_id})
@@ -0,0 +1,189 @@
+# bookings/pricing.py
+"""
+Расчёт стоимости проживания: сезонные тарифы, надбавка за выходные ночи и скидка за длительность.
+
+Для каждого номера один раз строится календарь цен ночей (в копейках) на общем окне
+запрошенных дат и его префиксные суммы. Стоимость любого интервала [заезд, выезд) -
+разность двух элементов префикса, без цикла по ночам, поэтому сотни номеров x диапазонов
+дат считаются двумя SQL-запросами (номера и тарифы) и одним проходом построения календарей.
+
+Тарифы (модель SeasonalRate) применяются от общих к частным: для всех номеров,
+для типа номеров, для конкретного номера; более частный перекрывает общий на своих ночах.
+
+Настройки settings.BOOKINGS_PRICING:
+    'weekend_nights' - дни недели ночей с надбавкой (0 - понедельник), по умолчанию пятница и суббота;
+    'weekend_surcharge' - доля надбавки за такие ночи ('0.15' - плюс 15%);
+    'length_of_stay_discounts' - {минимум ночей: доля скидки}, берётся наибольший подходящий порог.
+"""
+import datetime
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Booking, SeasonalRate
+
+DEFAULT_PRICING = {
+    'weekend_nights': (4, 5),
+    'weekend_surcharge': '0',
+    'length_of_stay_discounts': {},
+}
+BASIS_POINTS = 10000
+
+
+class Quote(namedtuple('Quote', 'room check_in check_out nights subtotal discount total_price')):
+    """
+    Стоимость проживания в номере; суммы - Decimal с точностью до копейки.
+    """
+
+    def as_dict(self):
+        return {
+            'room': self.room,
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+            'nights': self.nights,
+            'subtotal': str(self.subtotal),
+            'discount': str(self.discount),
+            'total_price': str(self.total_price),
+        }
+
+
+def to_cents(amount):
+    return int((Decimal(amount) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def to_basis_points(share):
+    return int((Decimal(str(share)) * BASIS_POINTS).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def apply_share(cents, basis_points):
+    """
+    Доля суммы в копейках с округлением половины вверх, в целых числах.
+    """
+    return (cents * basis_points + BASIS_POINTS // 2) // BASIS_POINTS
+
+
+def pricing_settings():
+    config = {**DEFAULT_PRICING, **getattr(settings, 'BOOKINGS_PRICING', {})}
+    return {
+        'weekend_nights': frozenset(config['weekend_nights']),
+        'weekend_surcharge': to_basis_points(config['weekend_surcharge']),
+        'length_of_stay_discounts': sorted(
+            (int(nights), to_basis_points(share)) for nights, share in config['length_of_stay_discounts'].items()
+        ),
+    }
+
+
+def rate_priority(rate):
+    return 2 if rate.room_id else 1 if rate.room_type else 0
+
+
+class RateCalendar:
+    """
+    Цены ночей номера на окне [start, start + len(nightly)) и их префиксные суммы.
+    """
+
+    def __init__(self, start, nightly):
+        self.start = start
+        self.prefix = list(accumulate(nightly, initial=0))
+
+    def total(self, check_in, check_out):
+        return self.prefix[(check_out - self.start).days] - self.prefix[(check_in - self.start).days]
+
+
+class PricingEngine:
+    """
+    Календари цен для набора номеров на окне дат [start, end).
+    rooms - объекты с атрибутами pk, price_per_night и room_type (например, Room).
+    """
+
+    def __init__(self, rooms, start, end, rates=None, config=None):
+        self.start = start
+        self.end = end
+        self.days = (end - start).days
+        self.config = config or pricing_settings()
+        rooms = list(rooms)
+        if rates is None:
+            rates = SeasonalRate.objects.filter(start_date__lt=end, end_date__gt=start).filter(
+                Q(room__isnull=True) | Q(room_id__in=[room.pk for room in rooms])
+            )
+        self.rates = sorted(rates, key=lambda rate: (rate_priority(rate), rate.start_date, rate.pk or 0))
+        weekend_nights = self.config['weekend_nights']
+        self.weekend = [
+            (start + datetime.timedelta(days=night)).weekday() in weekend_nights for night in range(self.days)
+        ]
+        self.calendars = {room.pk: self._calendar(room) for room in rooms}
+
+    def _calendar(self, room):
+        base = to_cents(room.price_per_night)
+        nightly = [base] * self.days
+        for rate in self.rates:
+            if rate.room_id not in (None, room.pk) or (rate.room_type and rate.room_type != room.room_type):
+                continue
+            first = max(0, (rate.start_date - self.start).days)
+            last = min(self.days, (rate.end_date - self.start).days)
+            if first >= last:
+                continue
+            if rate.price_per_night is not None:
+                price = to_cents(rate.price_per_night)
+            else:
+                price = to_cents(room.price_per_night * rate.multiplier)
+            nightly[first:last] = [price] * (last - first)
+        surcharge = self.config['weekend_surcharge']
+        if surcharge:
+            nightly = [
+                price + apply_share(price, surcharge) if weekend else price
+                for price, weekend in zip(nightly, self.weekend)
+            ]
+        return RateCalendar(self.start, nightly)
+
+    def discount_for(self, nights):
+        basis_points = 0
+        for min_nights, share in self.config['length_of_stay_discounts']:
+            if nights >= min_nights:
+                basis_points = share
+        return basis_points
+
+    def quote(self, room_id, check_in, check_out):
+        if not self.start <= check_in < check_out <= self.end:
+            raise ValueError("Даты вне окна расчёта или выезд не позже заезда.")
+        nights = (check_out - check_in).days
+        subtotal = self.calendars[room_id].total(check_in, check_out)
+        discount = apply_share(subtotal, self.discount_for(nights))
+        return Quote(room_id, check_in, check_out, nights, from_cents(subtotal), from_cents(discount),
+                     from_cents(subtotal - discount))
+
+
+def quote_rooms(rooms, date_ranges):
+    """
+    Стоимость каждого номера на каждый диапазон дат [(заезд, выезд)]: список Quote
+    в порядке номеров, внутри номера - в порядке диапазонов.
+    """
+    rooms = list(rooms)
+    if not rooms or not date_ranges:
+        return []
+    start = min(check_in for check_in, _ in date_ranges)
+    end = max(check_out for _, check_out in date_ranges)
+    engine = PricingEngine(rooms, start, end)
+    return [engine.quote(room.pk, check_in, check_out) for room in rooms for check_in, check_out in date_ranges]
+
+
+def quote_price(room, check_in, check_out):
+    """
+    Итоговая стоимость проживания в номере (Decimal).
+    """
+    return PricingEngine([room], check_in, check_out).quote(room.pk, check_in, check_out).total_price
+
+
+def max_total_price():
+    """
+    Наибольшая стоимость, которая помещается в Booking.total_price (max_digits, decimal_places).
+    """
+    field = Booking._meta.get_field('total_price')
+    return Decimal(10) ** (field.max_digits - field.decimal_places) - Decimal(1).scaleb(-field.decimal_places)
@@ -0,0 +1,117 @@
+# bookings/profiling.py
+"""
+Профилирование SQL-запросов каждого HTTP-запроса (QueryProfilingMiddleware).
+
+Для каждого запроса считаются число SQL-запросов, время в базе и повторы одинаковых
+запросов (признак N+1). Итог отдаётся заголовком Server-Timing (виден во вкладке Network
+браузера), медленные запросы дописываются JSON-строками в журнал с ротацией - логгер
+bookings.profiling (см. LOGGING в settings.py). Сводка по эндпоинтам - команда summarize_query_log.
+
+Настройки BOOKINGS_QUERY_PROFILING: enabled, slow_ms (порог длительности запроса),
+slow_queries (порог числа SQL-запросов), log_file (путь к журналу).
+
+Обёртка соединения только засекает время и увеличивает счётчик шаблона SQL (параметры не
+сохраняются, стек не снимается), поэтому профилирование можно держать включённым в продакшене.
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'enabled': False,
+    'slow_ms': 500,
+    'slow_queries': 50,
+    'log_file': None,
+}
+SQL_PREVIEW_LENGTH = 500
+PLACEHOLDER_LIST = re.compile(r'%s(?:, %s)+')
+
+
+def profiling_settings():
+    return {**DEFAULTS, **getattr(settings, 'BOOKINGS_QUERY_PROFILING', {})}
+
+
+def sql_fingerprint(sql):
+    """
+    Короткий хэш шаблона SQL; списки параметров IN (%s, %s, ...) любой длины дают один отпечаток.
+    """
+    return hashlib.sha1(PLACEHOLDER_LIST.sub('%s', sql).encode()).hexdigest()[:12]
+
+
+class QueryRecorder:
+    """
+    Обёртка для connection.execute_wrapper: число запросов, суммарное время и счётчик шаблонов SQL.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        """
+        Число лишних выполнений: каждый шаблон SQL сверх первого раза.
+        """
+        return self.count - len(self.statements)
+
+    def most_repeated(self):
+        """
+        (sql, сколько раз) для самого частого шаблона, если он выполнялся больше одного раза.
+        """
+        if not self.duplicates:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+def server_timing(recorder, total):
+    """
+    Значение заголовка Server-Timing; длительности в миллисекундах.
+    """
+    description = f"{recorder.count} queries, {recorder.duplicates} duplicates"
+    return f'db;dur={recorder.duration * 1000:.1f};desc="{description}", total;dur={total * 1000:.1f}'
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return ''
+    return match.view_name or match._func_path
+
+
+def log_request(request, response, recorder, total):
+    """
+    JSON-строка о медленном запросе в журнал bookings.profiling.
+    """
+    sql, repeats = recorder.most_repeated()
+    entry = {
+        'time': round(time.time(), 3),
+        'method': request.method,
+        'path': request.path,
+        'view': view_name(request),
+        'status': response.status_code,
+        'duration_ms': round(total * 1000, 1),
+        'db_ms': round(recorder.duration * 1000, 1),
+        'queries': recorder.count,
+        'duplicates': recorder.duplicates,
+    }
+    if sql:
+        entry.update(duplicate_fingerprint=sql_fingerprint(sql), duplicate_count=repeats,
+                     duplicate_sql=sql[:SQL_PREVIEW_LENGTH])
+    logger.info(json.dumps(entry, ensure_ascii=False))
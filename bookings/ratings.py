@@ -0,0 +1,106 @@
+# bookings/ratings.py
+"""
+Денормализованные рейтинги номеров (модель RoomRating).
+
+Каждое создание, изменение или удаление отзыва меняет сводку номера одним UPDATE
+с F-выражениями (количество, сумма, средняя и нужный столбец гистограммы), поэтому
+параллельные отзывы не теряют обновлений, а чтение рейтинга не агрегирует таблицу отзывов.
+Отзывы, созданные через bulk_create, учитываются вызовом rebuild_room_ratings().
+"""
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .conditional import touch_resources_on_commit
+from .models import Review, Room, RoomRating
+
+RATINGS = range(1, 6)
+
+
+def apply_review(room_id, rating, delta):
+    """
+    Учесть (delta=1) или убрать (delta=-1) оценку в сводке номера.
+    """
+    count = F('review_count') + delta
+    total = F('rating_sum') + delta * rating
+    updates = {
+        'review_count': count,
+        'rating_sum': total,
+        # Правая часть UPDATE видит старые значения строки, поэтому среднее считается по новым выражениям
+        'average': Coalesce(Cast(total, FloatField()) / NullIf(count, 0), Value(0.0)),
+        'updated_at': timezone.now(),
+    }
+    if rating in RATINGS:
+        updates[f'rating_{rating}'] = F(f'rating_{rating}') + delta
+    with transaction.atomic():
+        # Сводки нет (номер создан через bulk_create) - создаём её; вычитать из несуществующей
+        # сводки нечего (в том числе при каскадном удалении номера вместе с отзывами)
+        if not RoomRating.objects.filter(room_id=room_id).update(**updates) and delta > 0:
+            RoomRating.objects.get_or_create(room_id=room_id)
+            RoomRating.objects.filter(room_id=room_id).update(**updates)
+
+
+def rebuild_room_ratings(room_ids=None):
+    """
+    Пересчёт сводок одним агрегирующим запросом по отзывам. Возвращает число пересчитанных номеров.
+    """
+    rooms = Room.objects.order_by()
+    if room_ids is not None:
+        rooms = rooms.filter(pk__in=list(room_ids))
+    aggregates = {
+        'review_count': Count('review'),
+        'rating_sum': Coalesce(Sum('review__rating'), 0),
+        **{f'rating_{rating}': Count('review', filter=Q(review__rating=rating)) for rating in RATINGS},
+    }
+    now = timezone.now()
+    ratings = [
+        RoomRating(
+            room_id=row.pop('pk'),
+            average=row['rating_sum'] / row['review_count'] if row['review_count'] else 0,
+            updated_at=now,
+            **row,
+        )
+        for row in rooms.values('pk').annotate(**aggregates)
+    ]
+    with transaction.atomic():
+        RoomRating.objects.filter(room_id__in=[rating.room_id for rating in ratings]).delete()
+        RoomRating.objects.bulk_create(ratings, batch_size=500)
+    touch_resources_on_commit('rooms')
+    return len(ratings)
+
+
+@receiver(post_save, sender=Room)
+def create_room_rating(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        RoomRating.objects.get_or_create(room=instance)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, raw=False, **kwargs):
+    """
+    Запоминаем прежние номер и оценку отзыва, чтобы при изменении перенести их в сводке.
+    """
+    instance._rating_before = None
+    if instance.pk and not raw:
+        instance._rating_before = Review.objects.filter(pk=instance.pk).values_list('room_id', 'rating').first()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_rating_before', None)
+    after = (instance.room_id, int(instance.rating))
+    if before == after:
+        return
+    if before is not None:
+        apply_review(*before, delta=-1)
+    apply_review(*after, delta=1)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    apply_review(instance.room_id, int(instance.rating), delta=-1)
@@ -0,0 +1,34 @@
+# bookings/renderers.py
+"""
+JSON-рендерер API на orjson (если пакет установлен и включены BOOKINGS_FAST_READS).
+
+Вывод совпадает с JSONRenderer DRF: компактный JSON в UTF-8, Decimal, даты со временем и
+прочие нестандартные типы преобразуются кодировщиком DRF. Запросы с отступами (Accept: ...; indent=2),
+отключённые быстрые чтения и значения, которые orjson не сериализует (целые больше 64 бит),
+обрабатываются стандартным JSONRenderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+from .fast_reads import fast_reads_enabled
+
+try:
+    import orjson
+except ImportError:  # Необязательная зависимость
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or not fast_reads_enabled()
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                # Даты со временем - через кодировщик DRF (формат с 'Z' и миллисекундами)
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,53 @@
+# bookings/reservations.py
+"""
+Атомарное создание броней без двойного бронирования.
+
+Проверка пересечения и запись выполняются в одной транзакции под блокировкой
+номера: на PostgreSQL/MySQL это SELECT ... FOR UPDATE по строке Room, на SQLite
+select_for_update игнорируется, а запись сериализуется режимом BEGIN IMMEDIATE
+(см. DATABASES['default']['OPTIONS']['transaction_mode'] в settings.py).
+"""
+from django.db import transaction
+
+from .models import Booking, Room
+
+
+class RoomUnavailable(Exception):
+    """
+    Номер уже забронирован на пересекающиеся даты.
+    """
+
+    def __init__(self, room_id, check_in, check_out):
+        self.room_id = room_id
+        self.check_in = check_in
+        self.check_out = check_out
+        super().__init__(f"Номер уже забронирован на даты {check_in} - {check_out}.")
+
+
+def lock_room(room_id):
+    """
+    Блокирует строку номера до конца текущей транзакции.
+    """
+    list(Room.objects.select_for_update().filter(pk=room_id).values_list('pk', flat=True))
+
+
+def ensure_room_is_free(room_id, check_in, check_out, exclude_booking_id=None):
+    """
+    Бросает RoomUnavailable, если у номера есть бронь, пересекающаяся с [check_in, check_out).
+    Должна вызываться внутри транзакции после lock_room.
+    """
+    overlapping = Booking.objects.filter(room_id=room_id, check_in__lt=check_out, check_out__gt=check_in)
+    if exclude_booking_id is not None:
+        overlapping = overlapping.exclude(pk=exclude_booking_id)
+    if overlapping.exists():
+        raise RoomUnavailable(room_id, check_in, check_out)
+
+
+def reserve_room(room, check_in, check_out, **fields):
+    """
+    Создаёт бронь номера, если он свободен на [check_in, check_out); иначе бросает RoomUnavailable.
+    """
+    with transaction.atomic():
+        lock_room(room.pk)
+        ensure_room_is_free(room.pk, check_in, check_out)
+        return Booking.objects.create(room=room, check_in=check_in, check_out=check_out, **fields)
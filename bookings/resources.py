@@ -13,19 +13,29 @@ class BookingResource(ModelResource):
 
     class Meta:
         model = Booking
-        fields = ('id', 'guest_name', 'room__name', 'check_in', 'check_out', 'total_price', 'is_paid')
-        export_order = ('id', 'guest_name', 'room__name', 'check_in', 'check_out', 'total_price', 'is_paid')
+        fields = ('id', 'guest_name', 'room__name', 'check_in', 'check_out', 'total_price', 'amount_paid', 'is_paid')
+        export_order = ('id', 'guest_name', 'room__name', 'check_in', 'check_out', 'total_price', 'amount_paid',
+                        'is_paid')
 
-    def get_export_headers(self, selected_fields):
+    def get_queryset(self):
+        # guest и room читаются в каждой строке экспорта
+        return super().get_queryset().select_related('guest', 'room')
+
+    def get_export_headers(self, selected_fields=None):
         """
         Переопределяем метод для задания заголовков по verbose_name
         """
-        headers = []
-        for field in selected_fields:
-            model_fields = self.Meta.model._meta.get_fields()
-            header = next((x.verbose_name for x in model_fields if x.name == field), field)
-            headers.append(header)
-        return headers
+        if selected_fields is None:
+            selected_fields = [self.get_field_name(field) for field in self.get_export_fields()]
+        verbose_names = {
+            field.name: field.verbose_name
+            for field in self.Meta.model._meta.get_fields()
+            if hasattr(field, 'verbose_name')
+        }
+        return [
+            verbose_names.get(field) or (self.fields[field].column_name if field in self.fields else field)
+            for field in selected_fields
+        ]
 
     def dehydrate_guest_name(self, booking):
         """
@@ -0,0 +1,199 @@
+# bookings/search.py
+"""
+Полнотекстовый поиск на виртуальных таблицах SQLite FTS5.
+
+Для каждой индексируемой модели создаётся FTS5-таблица в режиме external content
+(тексты не дублируются, хранится только индекс) и три триггера, которые синхронизируют
+индекс при любых INSERT/UPDATE/DELETE - в том числе через bulk_create и update().
+Таблицы создаются после migrate (сигнал post_migrate) или командой rebuild_search_index.
+
+Параметр search вьюсетов обрабатывает FullTextSearchFilter: каждое слово запроса ищется
+по префиксу, результаты сортируются по релевантности (bm25). Если база не SQLite или
+индекс ещё не создан, поиск откатывается на стандартный SearchFilter (icontains).
+
+Релевантность считается одним MATCH на запрос (материализованный CTE, SQLite 3.35+), а не
+подзапросом с MATCH для каждой найденной строки; на более старых SQLite сортировка по id.
+FTS ищет слова по началу, поэтому email и телефон (substring_fields) дополнительно сравниваются
+через icontains, если в запросе есть цифры или @: часть номера из середины по-прежнему находит
+гостя, а поиск по именам не сканирует таблицу.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+from rest_framework.filters import SearchFilter
+
+from .models import Booking, Guest, Review, Room
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MATERIALIZED_CTE_VERSION = (3, 35)
+SUBSTRING_HINT_RE = re.compile(r'[\d@]')  # Запрос похож на часть email или телефона
+
+
+def to_match_expression(terms):
+    """
+    Пользовательский запрос -> выражение MATCH: все слова (AND), каждое - по префиксу.
+    Спецсимволы FTS5 отбрасываются, поэтому запрос не может сломать синтаксис.
+    """
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(terms))
+
+
+class SearchIndex:
+    """
+    FTS5-индекс по текстовым полям модели.
+    """
+
+    def __init__(self, model, fields, substring_fields=()):
+        self.model = model
+        self.fields = fields
+        self.substring_fields = substring_fields
+
+    @property
+    def table(self):
+        return self.model._meta.db_table
+
+    @property
+    def fts_table(self):
+        return f'{self.table}_fts'
+
+    def create_statements(self):
+        columns = ', '.join(self.fields)
+        new_values = ', '.join(f'new.{field}' for field in self.fields)
+        old_values = ', '.join(f'old.{field}' for field in self.fields)
+        fts, table = self.fts_table, self.table
+        delete_old = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+        insert_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', "
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END",
+        ]
+
+    def exists(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.fts_table])
+            return cursor.fetchone() is not None
+
+    def create(self):
+        """
+        Создаёт таблицу и триггеры; если таблицы не было, заполняет индекс существующими строками.
+        """
+        created = not self.exists()
+        with connection.cursor() as cursor:
+            for statement in self.create_statements():
+                cursor.execute(statement)
+        if created:
+            self.rebuild()
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+
+    def matching_ids(self, match):
+        return RawSQL(f"SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s", [match])
+
+    def rank(self, match):
+        """
+        Релевантность строки (bm25, меньше - лучше; NULL - строка найдена не по своему индексу).
+        CTE не зависит от внешней строки, поэтому SQLite выполняет MATCH один раз на запрос.
+        """
+        return RawSQL(
+            f"WITH search_match AS MATERIALIZED (SELECT rowid, rank FROM {self.fts_table} "
+            f"WHERE {self.fts_table} MATCH %s) "
+            f"SELECT rank FROM search_match WHERE search_match.rowid = {self.table}.id",
+            [match],
+        )
+
+    def search_q(self, terms, match):
+        """
+        Условие поиска; наследники добавляют совпадения по связанным моделям.
+        """
+        q = Q(pk__in=self.matching_ids(match)) if match else Q(pk__in=[])
+        if self.substring_fields and SUBSTRING_HINT_RE.search(terms):
+            for field in self.substring_fields:
+                q |= Q(**{f'{field}__icontains': terms})
+        return q
+
+    def filter(self, queryset, terms):
+        match = to_match_expression(terms)
+        if not match and not (self.substring_fields and SUBSTRING_HINT_RE.search(terms)):
+            return queryset
+        queryset = queryset.filter(self.search_q(terms, match))
+        if not match or connection.Database.sqlite_version_info < MATERIALIZED_CTE_VERSION:
+            return queryset.order_by('pk')
+        return queryset.annotate(search_rank=self.rank(match)).order_by(F('search_rank').asc(nulls_last=True), 'pk')
+
+
+class BookingSearchIndex(SearchIndex):
+    """
+    Бронь находится по своему названию, по имени гостя (индекс гостей) и по номеру комнаты.
+    """
+
+    def search_q(self, terms, match):
+        return (
+            super().search_q(terms, match)
+            | Q(guest_id__in=SEARCH_INDEXES['guest'].matching_ids(match))
+            | Q(room_id__in=Room.objects.filter(room_number__icontains=terms).values('pk'))
+        )
+
+
+class ReviewSearchIndex(SearchIndex):
+    """
+    Отзыв находится по имени гостя, тексту и названию номера.
+    """
+
+    def search_q(self, terms, match):
+        return super().search_q(terms, match) | Q(room_id__in=Room.objects.filter(name__icontains=terms).values('pk'))
+
+
+SEARCH_INDEXES = {
+    'guest': SearchIndex(Guest, ('first_name', 'last_name', 'email', 'phone_number'),
+                         substring_fields=('email', 'phone_number')),
+    'booking': BookingSearchIndex(Booking, ('booking_name',)),
+    'review': ReviewSearchIndex(Review, ('guest_name', 'comment')),
+}
+
+_available = {}
+
+
+def search_available(index):
+    """
+    Можно ли использовать FTS-индекс на текущей базе (результат кэшируется на процесс).
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    key = (str(connection.settings_dict['NAME']), index.fts_table)
+    if not _available.get(key):
+        _available[key] = index.exists()
+    return _available[key]
+
+
+def create_search_indexes(rebuild=False):
+    for index in SEARCH_INDEXES.values():
+        index.create()
+        if rebuild:
+            index.rebuild()
+
+
+@receiver(post_migrate)
+def create_search_indexes_after_migrate(sender, app_config, using, **kwargs):
+    if app_config.name == 'bookings' and using == DEFAULT_DB_ALIAS and connection.vendor == 'sqlite':
+        create_search_indexes()
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    SearchFilter, использующий FTS-индекс вьюсета (атрибут search_index) с сортировкой по релевантности.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        index = SEARCH_INDEXES.get(getattr(view, 'search_index', None))
+        terms = request.query_params.get(self.search_param, '').strip()
+        if index is not None and terms and search_available(index):
+            return index.filter(queryset, terms)
+        return super().filter_queryset(request, queryset, view)
@@ -1,7 +1,9 @@
 from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Amenity, Room, Guest, Booking, Payment, Review
+from .models import Amenity, Room, RoomRating, Guest, Booking, Payment, Review
+from .pricing import max_total_price, quote_price
+from .thumbnails import thumbnail_urls
 
 
 class AmenitySerializer(serializers.ModelSerializer):
@@ -10,13 +12,29 @@ class AmenitySerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
 
 
+class RoomRatingSerializer(serializers.ModelSerializer):
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True,
+                                      help_text="Количество оценок 1-5")
+
+    class Meta:
+        model = RoomRating
+        fields = ['review_count', 'average', 'histogram']
+
+
 class RoomSerializer(serializers.ModelSerializer):
     amenities = AmenitySerializer(many=True, read_only=True)
     name = serializers.CharField(required=True, help_text="Название комнаты")
+    rating = RoomRatingSerializer(read_only=True, help_text="Сводка отзывов о номере")
+    thumbnails = serializers.SerializerMethodField(help_text="Адреса уменьшенных копий изображения по размерам")
 
     class Meta:
         model = Room
-        fields = ['id', 'name', 'room_number', 'room_type', 'price_per_night', 'max_occupancy', 'amenities', 'image']
+        fields = ['id', 'name', 'room_number', 'room_type', 'price_per_night', 'max_occupancy', 'amenities', 'image',
+                  'thumbnails', 'rating']
+
+    def get_thumbnails(self, obj):
+        request = self.context.get('request')
+        return thumbnail_urls(obj, request.build_absolute_uri if request else None)
 
     def validate_price_per_night(self, value):
         if value <= 0:
@@ -29,6 +47,19 @@ class RoomSerializer(serializers.ModelSerializer):
         return value
 
 
+class AvailableRoomSerializer(RoomSerializer):
+    """
+    Свободная комната с рассчитанной стоимостью проживания на запрошенные даты.
+    Значения nights и total_price проставляет представление.
+    """
+    nights = serializers.IntegerField(read_only=True, help_text="Количество ночей")
+    total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True,
+                                           help_text="Стоимость проживания")
+
+    class Meta(RoomSerializer.Meta):
+        fields = RoomSerializer.Meta.fields + ['nights', 'total_price']
+
+
 class GuestSerializer(serializers.ModelSerializer):
     class Meta:
         model = Guest
@@ -48,9 +79,15 @@ class GuestSerializer(serializers.ModelSerializer):
 
 
 class BookingSerializer(serializers.ModelSerializer):
+    total_price = serializers.DecimalField(max_digits=8, decimal_places=2, required=False,
+                                           help_text="Если не указана, рассчитывается по тарифам номера")
+
     class Meta:
         model = Booking
-        fields = ['id', 'guest', 'room', 'check_in', 'check_out', 'total_price', 'booking_name', 'is_paid']
+        fields = ['id', 'guest', 'room', 'check_in', 'check_out', 'total_price', 'booking_name',
+                  'amount_paid', 'is_paid']
+        # Оплата ведётся платежами (PaymentViewSet, mark_as_paid)
+        read_only_fields = ['amount_paid', 'is_paid']
 
     def validate(self, data):
         check_in = data.get('check_in')
@@ -59,6 +96,14 @@ class BookingSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Дата выезда должна быть позже даты заезда.")
         if check_in and check_in < timezone.now().date():
             raise serializers.ValidationError("Дата заезда не может быть в прошлом.")
+        if self.instance is None and 'total_price' not in data and check_in and check_out and data.get('room'):
+            data['total_price'] = quote_price(data['room'], check_in, check_out)
+            if data['total_price'] > max_total_price():
+                # Иначе сохранение брони упадёт на ограничении поля (500 вместо 400)
+                raise serializers.ValidationError({'total_price': (
+                    f"Стоимость проживания {data['total_price']} превышает максимум {max_total_price()}; "
+                    f"сократите срок проживания."
+                )})
         return data
 
 
@@ -0,0 +1,14 @@
+# bookings/signals.py
+from django.dispatch import Signal
+
+# Отправляется после массовой вставки броней через bulk_create, которая не вызывает post_save.
+# Аргументы: bookings - список созданных объектов Booking (с заполненными pk).
+bookings_bulk_created = Signal()
+
+# Отправляется после изменения суммы оплаты броней (создание, изменение, удаление платежей).
+# Аргументы: booking_ids - множество id затронутых броней.
+booking_payments_changed = Signal()
+
+# Отправляется после создания уменьшенных копий изображения номера (bookings/thumbnails.py).
+# Аргументы: room_id - id номера, digest - хэш содержимого изображения.
+room_thumbnails_ready = Signal()
@@ -0,0 +1,41 @@
+# bookings/testing.py
+"""
+Помощники для проверок производительности запросов.
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Блок кода выполнил больше SQL-запросов, чем разрешено.
+    """
+
+
+@contextmanager
+def assert_max_queries(limit, label='', using=DEFAULT_DB_ALIAS):
+    """
+    Проверяет, что внутри блока выполнено не более limit SQL-запросов.
+
+        with assert_max_queries(3, '/api/rooms/'):
+            client.get('/api/rooms/')
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if len(context) > limit:
+        queries = '\n'.join(f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, start=1))
+        raise QueryBudgetExceeded(
+            f"{label or 'Блок'}: выполнено {len(context)} запросов при лимите {limit}:\n{queries}"
+        )
+
+
+def assert_status(response, expected, label=''):
+    """
+    Проверяет код ответа тестового клиента; в сообщении - начало тела ответа.
+    """
+    if response.status_code != expected:
+        raise AssertionError(
+            f"{label or 'Ответ'}: HTTP {response.status_code} вместо {expected}: {response.content[:200]!r}"
+        )
@@ -0,0 +1,34 @@
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+
+from bookings.models import Booking, Guest, Room
+from bookings.pricing import max_total_price
+from bookings.serializers import BookingSerializer
+
+
+class BookingTotalPriceTests(TestCase):
+    def setUp(self):
+        self.room = Room.objects.create(name="Люкс", room_number="1", room_type="Suite",
+                                        price_per_night="9999.99", max_occupancy=2, image="images/room_1.jpg")
+        self.guest = Guest.objects.create(first_name="Иван", last_name="Иванов", email="ivan@example.com",
+                                          phone_number="0000000000")
+
+    def booking_data(self, nights):
+        check_in = datetime.date.today() + datetime.timedelta(days=1)
+        return {'guest': self.guest.pk, 'room': self.room.pk, 'booking_name': "Бронь",
+                'check_in': check_in, 'check_out': check_in + datetime.timedelta(days=nights)}
+
+    def test_quoted_total_is_saved(self):
+        serializer = BookingSerializer(data=self.booking_data(nights=3))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.save().total_price, Decimal('29999.97'))
+
+    def test_quoted_total_over_field_limit_is_rejected(self):
+        # 200 ночей x 9999.99 = 1 999 998.00 не помещается в max_digits=8 поля total_price
+        serializer = BookingSerializer(data=self.booking_data(nights=200))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('total_price', serializer.errors)
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(max_total_price(), Decimal('999999.99'))
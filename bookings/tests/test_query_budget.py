@@ -0,0 +1,18 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from bookings.benchmarks import SCRATCH_CACHES
+from bookings.management.commands.check_query_budget import Command
+
+
+@override_settings(CACHES=SCRATCH_CACHES)
+class QueryBudgetTests(TestCase):
+    def tearDown(self):
+        cache.clear()
+
+    def test_list_endpoints_fit_query_budget(self):
+        # Два наполнения базы: число запросов не должно зависеть от объёма данных
+        failures = Command(stdout=StringIO()).run(rounds=2)
+        self.assertEqual(failures, [])
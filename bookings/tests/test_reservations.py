@@ -0,0 +1,70 @@
+import datetime
+import threading
+
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.test import TransactionTestCase
+
+from bookings.models import Booking, Guest, Room
+from bookings.reservations import RoomUnavailable, reserve_room
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    threads = 8
+    attempts = 10
+
+    def setUp(self):
+        self.room = Room.objects.create(name="Stress", room_number="0", room_type="Standard",
+                                        price_per_night=100, max_occupancy=2, image="images/room_1.jpg")
+        self.guest = Guest.objects.create(first_name="Stress", last_name="Test", email="stress@example.com",
+                                          phone_number="0000000000")
+
+    def reserve_concurrently(self, date_ranges):
+        """
+        Каждый поток пытается забронировать все диапазоны; возвращает число созданных броней и отказов.
+        """
+        outcomes = []
+        outcomes_lock = threading.Lock()
+        barrier = threading.Barrier(self.threads)
+
+        def worker():
+            barrier.wait()  # Стартуем одновременно, чтобы брони действительно конкурировали
+            try:
+                for check_in, check_out in date_ranges:
+                    try:
+                        reserve_room(self.room, check_in, check_out, guest=self.guest, total_price=100,
+                                     booking_name="Stress booking")
+                        outcome = 'created'
+                    except RoomUnavailable:
+                        outcome = 'conflict'
+                    with outcomes_lock:
+                        outcomes.append(outcome)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes.count('created'), outcomes.count('conflict')
+
+    def test_concurrent_reservations_do_not_overlap(self):
+        start = datetime.date.today()
+        # Диапазоны по 3 ночи со сдвигом на 1 день: соседние пересекаются
+        date_ranges = [
+            (start + datetime.timedelta(days=i), start + datetime.timedelta(days=i + 3))
+            for i in range(self.attempts)
+        ]
+        created, conflicts = self.reserve_concurrently(date_ranges)
+
+        self.assertEqual(created + conflicts, self.threads * self.attempts)
+        self.assertEqual(created, Booking.objects.filter(room=self.room).count())
+        # Из каждой тройки соседних диапазонов помещается ровно один: дни 0, 3, 6, 9
+        self.assertEqual(created, 4)
+        overlapping = Booking.objects.filter(room=self.room).filter(Exists(
+            Booking.objects.filter(
+                room=self.room, check_in__lt=OuterRef('check_out'), check_out__gt=OuterRef('check_in')
+            ).exclude(pk=OuterRef('pk'))
+        ))
+        self.assertFalse(overlapping.exists())
@@ -0,0 +1,269 @@
+# bookings/thumbnails.py
+"""
+Уменьшенные копии изображений номеров (WebP и JPEG нескольких ширин).
+
+Файлы лежат в MEDIA_ROOT/thumbnails/ под именем из хэша содержимого исходного изображения
+и ширины: thumbnails/ab/ab12...-640.webp. Новое изображение - новый хэш и новые адреса,
+поэтому копии отдаются с заголовком Cache-Control: immutable и годовым сроком кэширования.
+
+Копии создаются в пуле потоков после сохранения номера (загрузка изображения не ждёт
+обработки) или лениво при первом запросе (номера, созданные через bulk_create, и
+отсутствующие файлы). Полная генерация - команда generate_thumbnails.
+
+Копии одного изображения создаются под блокировкой его хэша, а параллельные ленивые запросы
+одного номера ждут одну обработку (room_thumbnails). Файл пишется во временный и
+переименовывается (os.replace), поэтому другие процессы не видят недописанных копий,
+а повторная запись не оставляет дубликатов с суффиксами.
+
+Настройки: BOOKINGS_THUMBNAIL_SIZES - {название: ширина}, BOOKINGS_THUMBNAIL_WORKERS -
+число потоков пула (0 - обрабатывать сразу в текущем потоке).
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+from .models import Room
+from .signals import room_thumbnails_ready
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = 'thumbnails'
+DEFAULT_SIZES = {'small': 320, 'medium': 640, 'large': 1280}
+# Формат в адресе -> (формат Pillow, MIME-тип, параметры сохранения)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DIGEST_LENGTH = 16
+DIGEST_RE = re.compile(rf'[0-9a-f]{{{DIGEST_LENGTH}}}')
+RENDER_LOCK_STRIPES = 64
+READ_CHUNK_SIZE = 1 << 16
+
+_executor = None
+_executor_lock = threading.Lock()
+# Блокировки создания копий: хэш изображения выбирает одну из фиксированного набора, число блокировок не растёт
+_render_locks = [threading.Lock() for _ in range(RENDER_LOCK_STRIPES)]
+_pending = {}  # id номера -> Future ленивой обработки (room_thumbnails)
+_pending_lock = threading.Lock()
+
+
+def thumbnail_sizes():
+    return getattr(settings, 'BOOKINGS_THUMBNAIL_SIZES', DEFAULT_SIZES)
+
+
+def thumbnail_widths():
+    return sorted(set(thumbnail_sizes().values()))
+
+
+def image_digest(name):
+    """
+    Хэш содержимого файла из хранилища (читается порциями).
+    """
+    digest = hashlib.sha256()
+    with default_storage.open(name, 'rb') as file:
+        for chunk in iter(lambda: file.read(READ_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:DIGEST_LENGTH]
+
+
+def thumbnail_name(digest, width, fmt):
+    return f'{THUMBNAIL_DIR}/{digest[:2]}/{digest}-{width}.{fmt}'
+
+
+def save_thumbnail(name, content):
+    """
+    Запись копии: временный файл в том же каталоге и os.replace. Для хранилищ без локальных
+    путей - обычный save(), если файла ещё нет.
+    """
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(content))
+        return
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(content)
+        os.chmod(temp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def render_thumbnails(source_name, digest, widths=None):
+    """
+    Создаёт недостающие копии изображения. Исходник декодируется один раз, каждая ширина
+    получается из предыдущей (большей), а не из полного изображения. Возвращает число созданных файлов.
+    Параллельные вызовы для одного хэша выполняются по очереди: второй найдёт готовые файлы.
+    """
+    with _render_locks[int(digest[:8], 16) % RENDER_LOCK_STRIPES]:
+        return _render_missing(source_name, digest, widths)
+
+
+def _render_missing(source_name, digest, widths):
+    missing = [
+        (width, fmt) for width in sorted(widths or thumbnail_widths(), reverse=True) for fmt in FORMATS
+        if not default_storage.exists(thumbnail_name(digest, width, fmt))
+    ]
+    if not missing:
+        return 0
+    created = 0
+    with default_storage.open(source_name, 'rb') as file, Image.open(file) as source:
+        largest = missing[0][0]
+        # JPEG декодируется сразу в уменьшенном масштабе (1/2, 1/4, 1/8), если он не меньше нужной ширины
+        source.draft('RGB', (largest, largest * source.height // max(source.width, 1)))
+        image = ImageOps.exif_transpose(source).convert('RGB')
+        for width in sorted({width for width, _ in missing}, reverse=True):
+            image.thumbnail((width, image.height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            for fmt in (fmt for missing_width, fmt in missing if missing_width == width):
+                pil_format, _, options = FORMATS[fmt]
+                buffer = io.BytesIO()
+                image.save(buffer, pil_format, **options)
+                save_thumbnail(thumbnail_name(digest, width, fmt), buffer.getvalue())
+                created += 1
+    return created
+
+
+def process_room_image(room_id):
+    """
+    Хэш изображения номера и все его копии. Возвращает хэш или None, если изображения
+    нет или его не удалось прочитать.
+    """
+    room = Room.objects.filter(pk=room_id).only('image', 'image_digest').first()
+    if room is None or not room.image:
+        return None
+    try:
+        digest = room.image_digest or image_digest(room.image.name)
+        render_thumbnails(room.image.name, digest)
+    except OSError as error:  # Нет файла или это не изображение (UnidentifiedImageError)
+        logger.warning("Не удалось создать уменьшенные копии изображения номера %s: %s", room_id, error)
+        return None
+    if digest != room.image_digest:
+        # Только если изображение не заменили, пока шла обработка
+        if Room.objects.filter(pk=room_id, image=room.image.name).update(image_digest=digest):
+            room_thumbnails_ready.send(sender=Room, room_id=room_id, digest=digest)
+    return digest
+
+
+def room_thumbnails(room_id):
+    """
+    process_room_image для ленивой генерации в потоке запроса: параллельные запросы одного
+    номера (страница каталога запрашивает все копии сразу) ждут результата первого.
+    """
+    with _pending_lock:
+        future = _pending.get(room_id)
+        owner = future is None
+        if owner:
+            future = _pending[room_id] = Future()
+    if not owner:
+        return future.result()
+    try:
+        digest = process_room_image(room_id)
+        future.set_result(digest)
+        return digest
+    except BaseException as error:
+        future.set_exception(error)
+        raise
+    finally:
+        with _pending_lock:
+            del _pending[room_id]
+
+
+def process_room_image_in_worker(room_id):
+    """
+    process_room_image для потока пула: соединение с базой потока закрывается по завершении.
+    """
+    try:
+        return process_room_image(room_id)
+    finally:
+        connection.close()
+
+
+def thumbnail_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BOOKINGS_THUMBNAIL_WORKERS', 2), thread_name_prefix='thumbnails',
+            )
+        return _executor
+
+
+def schedule_thumbnails(room_id):
+    """
+    Обработка изображения номера в пуле потоков; при BOOKINGS_THUMBNAIL_WORKERS = 0 - сразу.
+    """
+    if not getattr(settings, 'BOOKINGS_THUMBNAIL_WORKERS', 2):
+        return process_room_image(room_id)
+    return thumbnail_executor().submit(process_room_image_in_worker, room_id)
+
+
+def thumbnail_urls(room, build_url=None):
+    """
+    Адреса копий изображения: {'small': {'width': 320, 'webp': url, 'jpeg': url}, ...}.
+    Пока хэш не посчитан, адреса ведут на ленивую генерацию (room_thumbnail_redirect).
+    build_url - например, request.build_absolute_uri для абсолютных адресов.
+    """
+    if not room.image:
+        return {}
+    urls = {}
+    for size, width in thumbnail_sizes().items():
+        urls[size] = {'width': width}
+        for fmt in FORMATS:
+            if room.image_digest:
+                url = reverse('room_thumbnail', args=[room.image_digest, width, fmt])
+            else:
+                url = reverse('room_thumbnail_redirect', args=[room.pk, width, fmt])
+            urls[size][fmt] = build_url(url) if build_url else url
+    return urls
+
+
+def srcset(urls, fmt):
+    """
+    Значение атрибута srcset: "url 320w, url 640w, ...".
+    """
+    variants = sorted(urls.values(), key=lambda variant: variant['width'])
+    return ', '.join(f"{variant[fmt]} {variant['width']}w" for variant in variants)
+
+
+@receiver(pre_save, sender=Room)
+def reset_image_digest(sender, instance, raw=False, **kwargs):
+    """
+    Изображение заменено - старый хэш больше не соответствует содержимому.
+    """
+    if raw:
+        return
+    instance._image_changed = True
+    if instance.pk:
+        before = Room.objects.filter(pk=instance.pk).values_list('image', flat=True).first()
+        instance._image_changed = before != instance.image.name
+    if instance._image_changed:
+        instance.image_digest = ''
+
+
+@receiver(post_save, sender=Room)
+def generate_room_thumbnails(sender, instance, raw=False, **kwargs):
+    if raw or not instance.image:
+        return
+    if getattr(instance, '_image_changed', False) or not instance.image_digest:
+        room_id = instance.pk
+        transaction.on_commit(lambda: schedule_thumbnails(room_id))
@@ -1,11 +1,13 @@
 from django.conf import settings
 from django.conf.urls.static import static
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import async_views, views
 from .api_views import (
+    AnalyticsViewSet,
     AmenityViewSet,
     RoomViewSet,
     GuestViewSet,
@@ -29,6 +31,9 @@ urlpatterns = [
       path('add_room/', views.add_room, name='add_room'),
       path('edit-room/<int:pk>/', views.edit_room, name='edit_room'),
       path('delete-room/<int:pk>/', views.delete_room, name='delete_room'),
+      path('thumbnails/<str:digest>/<int:width>.<str:fmt>', views.room_thumbnail, name='room_thumbnail'),
+      path('rooms/<int:pk>/thumbnail/<int:width>.<str:fmt>', views.room_thumbnail_redirect,
+           name='room_thumbnail_redirect'),
   ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 # REST Роутер
@@ -39,12 +44,18 @@ router.register(r'guests', GuestViewSet, basename='guest')
 router.register(r'bookings', BookingViewSet, basename='booking')
 router.register(r'payments', PaymentViewSet, basename='payment')
 router.register(r'reviews', ReviewViewSet, basename='review')
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
 
 # Добавляем маршруты API в /api/
 urlpatterns += [
+    # Асинхронные версии нагруженных чтений (для запуска под ASGI)
+    path('api/async/rooms/', async_views.room_list, name='async_room_list'),
+    path('api/async/rooms/is_valid_to_book/', async_views.room_is_valid_to_book, name='async_room_is_valid_to_book'),
+    path('api/async/reviews/', async_views.review_list, name='async_review_list'),
     path('api/', include(router.urls)),  # <-- Оборачиваем роутер в /api/
 ]
 
 # Для обслуживангия MEDIA файлов
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += staticfiles_urlpatterns()  # Статика админки и без runserver (gunicorn)
@@ -4,28 +4,30 @@ from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.decorators.csrf import csrf_exempt
 
-from .filters import RoomFilter, ReviewFilter
+from .catalogue import render_catalogue
+from .filters import ReviewFilter
 from .forms import ReviewForm
 from .forms import RoomForm
-from .models import Review, Room, Booking, Guest
+from .models import Review, Room, Guest
+from .pagination import keyset_page
+from .pricing import max_total_price, quote_price
+from .reservations import RoomUnavailable, reserve_room
+from .thumbnails import (
+    CACHE_CONTROL, DIGEST_RE, FORMATS, render_thumbnails, room_thumbnails, thumbnail_name, thumbnail_widths,
+)
 
 
 def index(request):
-    rooms = Room.objects.all()
-    filterset = RoomFilter(request.GET, queryset=rooms)  # Применяем фильтр
-    filtered_queryset = filterset.qs  # Получаем отфильтрованный queryset
-    paginator = Paginator(filtered_queryset, 5)  # Разбиваем на страницы по 5 объектов
-    page_number = request.GET.get('page')  # Получаем номер страницы из GET-запроса
-    rooms = paginator.get_page(page_number)  # Получаем объект страницы
+    fragments = render_catalogue(request)  # Фильтр и карточки номеров из кэша (при промахе - из базы)
 
     context = {
-        'rooms': rooms,
-        'filterset': filterset,
+        'catalogue': fragments['catalogue'],
+        'room_options': fragments['room_options'],
     }
     return render(request, 'bookings/index.html', context)
 
@@ -83,16 +85,23 @@ def book_room(request):
         room = get_object_or_404(Room, id=room_id)
         check_in_date = datetime.datetime.strptime(check_in, '%Y-%m-%d').date()
         check_out_date = datetime.datetime.strptime(check_out, '%Y-%m-%d').date()
-        total_price = room.price_per_night * (check_out_date - check_in_date).days
-
-        Booking.objects.create(
-            guest=guest,
-            room=room,
-            check_in=check_in_date,
-            check_out=check_out_date,
-            total_price=total_price,
-            booking_name=f"Booking for {fio}"
-        )
+        if check_in_date >= check_out_date:
+            return JsonResponse({"message": "Дата выезда должна быть позже даты заезда."}, status=400)
+        total_price = quote_price(room, check_in_date, check_out_date)  # Сезонные тарифы, выходные, скидки
+        if total_price > max_total_price():
+            return JsonResponse({"message": "Стоимость проживания превышает допустимую, сократите срок."}, status=400)
+
+        try:
+            reserve_room(
+                room,
+                check_in_date,
+                check_out_date,
+                guest=guest,
+                total_price=total_price,
+                booking_name=f"Booking for {fio}"
+            )
+        except RoomUnavailable as e:
+            return JsonResponse({"message": str(e)}, status=409)
 
         return JsonResponse({"message": "Заявка отправлена"})
 
@@ -105,9 +114,7 @@ def review_list(request):
     reviews = Review.objects.all()
     filterset = ReviewFilter(request.GET, queryset=reviews)  # Применяем фильтр
     filtered_queryset = filterset.qs  # Получаем отфильтрованный queryset
-    paginator = Paginator(filtered_queryset, 5)  # Разбиваем на страницы по 5 объектов
-    page_number = request.GET.get('page')  # Получаем номер страницы из GET-запроса
-    reviews = paginator.get_page(page_number)  # Получаем объект страницы
+    reviews = keyset_page(request, filtered_queryset, 5)  # Страница по 5 объектов после курсора из GET-запроса
     rooms = Room.objects.all()
 
     context = {
@@ -190,3 +197,38 @@ def delete_room(request, pk):
         return redirect('index')  # После удаления перенаправляем на главную страницу или куда нужно
 
     return render(request, 'edit_room.html', {'room': room})
+
+
+def room_thumbnail(request, digest, width, fmt):
+    """
+    Уменьшенная копия изображения по хэшу содержимого. Отсутствующий файл создаётся при
+    первом запросе; адрес неизменен для содержимого, поэтому ответ кэшируется на год.
+    """
+    # Хэш входит в путь файла: допускаются только шестнадцатеричные хэши нашей длины
+    if not DIGEST_RE.fullmatch(digest) or fmt not in FORMATS or width not in thumbnail_widths():
+        raise Http404
+    name = thumbnail_name(digest, width, fmt)
+    if not default_storage.exists(name):
+        room = Room.objects.filter(image_digest=digest).only('image').first()
+        if room is None:
+            raise Http404
+        try:
+            render_thumbnails(room.image.name, digest)
+        except OSError:
+            raise Http404
+    response = FileResponse(default_storage.open(name, 'rb'), content_type=FORMATS[fmt][1])
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def room_thumbnail_redirect(request, pk, width, fmt):
+    """
+    Ленивая генерация для номеров, у которых хэш изображения ещё не посчитан:
+    обрабатывает изображение и перенаправляет на постоянный адрес копии.
+    """
+    if fmt not in FORMATS or width not in thumbnail_widths():
+        raise Http404
+    digest = room_thumbnails(pk)
+    if digest is None:
+        raise Http404
+    return redirect('room_thumbnail', digest=digest, width=width, fmt=fmt)
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'guesthouse_booking.settings')
+# Под ASGI каждый запрос выполняет синхронный код в собственном потоке (ThreadSensitiveContext),
+# поэтому постоянное соединение следующим запросом не используется, а только остаётся открытым
+# до завершения потока. WSGI-воркеры сохраняют CONN_MAX_AGE профиля.
+os.environ.setdefault('DJANGO_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
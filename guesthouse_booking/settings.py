@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,12 +54,33 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    # Пагинация (Напр. /api/rooms/?page=2&page_size=20)
+    # Курсорная пагинация (Напр. /api/rooms/?cursor=...&page_size=20), ?page=2 - постраничная по-старому
+    'DEFAULT_PAGINATION_CLASS': 'bookings.pagination.KeysetPagination',
     'PAGE_SIZE': 5,  # Количество элементов на странице по-умолчанию
+    'DEFAULT_RENDERER_CLASSES': (
+        'bookings.renderers.FastJSONRenderer',  # orjson, если установлен
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+# Экспорт из админки (действия BookingAdmin, файлы фоновых экспортов) - только с правом
+# bookings.export_booking: в выгрузке персональные данные гостей
+IMPORT_EXPORT_EXPORT_PERMISSION_CODE = 'export'
+
+# Быстрое чтение списков броней и платежей (bookings/fast_reads.py): строки из values() вместо
+# сериализаторов и JSON через orjson. Схема ответа не меняется; False - прежний путь через сериализаторы.
+BOOKINGS_FAST_READS = os.environ.get('BOOKINGS_FAST_READS', '1') == '1'
+
+# Общее количество строк в ответах списков API: 'none' (не считать), 'estimate' (оценка) или 'exact' (COUNT(*)).
+# Переопределяется параметром запроса ?count=... (большие списки: ?count=none или ?count=estimate)
+BOOKINGS_PAGINATION_COUNT = 'exact'
+
+# Списки админки (Guest, Booking, Payment, Review): при максимальном id больше этого значения
+# количество строк без фильтров оценивается по id вместо COUNT(*). None - всегда точный подсчёт.
+BOOKINGS_ADMIN_EXACT_COUNT_LIMIT = 10000
+
 MIDDLEWARE = [
+    'bookings.middleware.QueryProfilingMiddleware',  # Первым: учитывает запросы всех остальных middleware
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,9 +88,47 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'simple_history.middleware.HistoryRequestMiddleware'  # для django-simple-history
+    'simple_history.middleware.HistoryRequestMiddleware',  # для django-simple-history
+    'bookings.middleware.HistoryBatchMiddleware',  # Пакетная запись истории в режиме 'batched'
 ]
 
+# Режим записи истории изменений (bookings/history.py): 'sync', 'batched' или 'off'.
+# Ключ 'default' - для всех моделей, метки моделей ('bookings.Payment') - переопределение для отдельных таблиц.
+BOOKINGS_HISTORY_MODES = {
+    'default': 'sync',
+}
+
+# Профилирование SQL-запросов (bookings/profiling.py): заголовок Server-Timing на каждом ответе и
+# журнал медленных запросов (JSON-строки с ротацией), сводка по эндпоинтам - команда summarize_query_log
+BOOKINGS_QUERY_PROFILING = {
+    'enabled': os.environ.get('DJANGO_QUERY_PROFILING', '0') == '1',
+    'slow_ms': int(os.environ.get('DJANGO_SLOW_REQUEST_MS', 500)),  # В журнал - запросы дольше порога
+    'slow_queries': int(os.environ.get('DJANGO_SLOW_REQUEST_QUERIES', 50)),  # ... или с большим числом SQL
+    'log_file': os.environ.get('DJANGO_QUERY_LOG', os.path.join(BASE_DIR, 'query_profile.log')),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'query_profile': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BOOKINGS_QUERY_PROFILING['log_file'],
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'formatter': 'message',
+            'encoding': 'utf-8',
+            'delay': True,  # Файл создаётся при первой записи
+        },
+    },
+    'loggers': {
+        'bookings.profiling': {'handlers': ['query_profile'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 ROOT_URLCONF = 'guesthouse_booking.urls'
 
 TEMPLATES = [
@@ -92,13 +152,75 @@ WSGI_APPLICATION = 'guesthouse_booking.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Профили SQLite: PRAGMA, выполняемые при каждом подключении, и время жизни соединения (CONN_MAX_AGE).
+# Профиль выбирается переменной окружения DJANGO_SQLITE_PROFILE, сравнение профилей - команда benchmark_sqlite.
+# По умолчанию 'default': manage.py и сервер разработки не переводят db.sqlite3 в WAL (файлы -wal/-shm);
+# 'tuned' включает gunicorn.conf.py.
+BOOKINGS_SQLITE_PROFILES = {
+    # Поведение SQLite по умолчанию: журнал отката (писатель блокирует читателей), fsync на каждый коммит,
+    # новое соединение на каждый запрос
+    'default': {
+        'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+        'conn_max_age': 0,
+    },
+    # WAL: читатели не ждут писателя; synchronous=NORMAL в режиме WAL не теряет целостность при сбое
+    # процесса (последние коммиты могут потеряться только при отключении питания)
+    'tuned': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),  # Байты
+            'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),  # Отрицательное значение - КиБ
+            'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20000)),  # Миллисекунды
+            'temp_store': 'MEMORY',
+        },
+        'conn_max_age': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+    },
+}
+SQLITE_PROFILE = BOOKINGS_SQLITE_PROFILES[os.environ.get('DJANGO_SQLITE_PROFILE', 'default')]
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': SQLITE_PROFILE['conn_max_age'],
+        'CONN_HEALTH_CHECKS': True,  # Постоянное соединение проверяется перед повторным использованием
+        'OPTIONS': {
+            # BEGIN IMMEDIATE: транзакция сразу берёт блокировку на запись, поэтому проверка
+            # пересечения броней и вставка не могут чередоваться между параллельными запросами
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,  # Секунды ожидания блокировки вместо мгновенного "database is locked"
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PROFILE['pragmas'].items()),
+        },
+        # Тестовая база - файл, а не память: в общей памяти SQLite параллельные соединения получают
+        # "table is locked" без ожидания, а тест параллельных броней должен работать с файловыми блокировками
+        'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'guesthouse_test.sqlite3')},
+    }
+}
+
+# Расчёт стоимости проживания (bookings/pricing.py), сезонные тарифы задаются в админке (SeasonalRate).
+BOOKINGS_PRICING = {
+    'weekend_nights': (4, 5),  # Ночи с пятницы и субботы
+    'weekend_surcharge': '0',  # Надбавка за такие ночи, доля (напр. '0.15')
+    'length_of_stay_discounts': {},  # {минимум ночей: доля скидки}, напр. {7: '0.10', 28: '0.20'}
+}
+
+# Кэш (каталог номеров на главной, bookings/catalogue.py). Файловый бэкенд общий для всех
+# процессов сервера, поэтому сброс версии каталога сразу виден каждому воркеру.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DJANGO_CACHE_DIR', os.path.join(BASE_DIR, '.cache')),
     }
 }
 
+BOOKINGS_CATALOGUE_CACHE_TIMEOUT = 60 * 60  # Секунды; записи старых версий каталога вытесняются по таймауту
+
+# Уменьшенные копии изображений номеров (bookings/thumbnails.py): {название: ширина в пикселях}
+# и число потоков пула генерации (0 - генерировать сразу, в потоке запроса)
+BOOKINGS_THUMBNAIL_SIZES = {'small': 320, 'medium': 640, 'large': 1280}
+BOOKINGS_THUMBNAIL_WORKERS = int(os.environ.get('BOOKINGS_THUMBNAIL_WORKERS', 2))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -148,5 +270,8 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'  # URL-префикс для медиафайлов
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')  # Путь к директории для хранения медиафайлов
 
+# Файлы фоновых экспортов (персональные данные гостей): вне MEDIA_ROOT, скачиваются только через админку
+BOOKINGS_EXPORT_ROOT = os.path.join(BASE_DIR, 'exports')
+
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
@@ -0,0 +1,25 @@
+# gunicorn.conf.py
+"""
+Продакшен-запуск на ASGI-приложении: gunicorn управляет процессами, uvicorn worker
+обслуживает запросы (асинхронные представления bookings/async_views.py не блокируют воркер).
+
+    gunicorn guesthouse_booking.asgi:application -c gunicorn.conf.py
+
+Параметры задаются переменными окружения GUNICORN_BIND, GUNICORN_WORKERS, GUNICORN_TIMEOUT,
+GUNICORN_KEEPALIVE, GUNICORN_MAX_REQUESTS.
+"""
+import multiprocessing
+import os
+
+# Сервер работает с профилем SQLite 'tuned' (WAL, постоянные соединения); CONN_MAX_AGE для ASGI - в asgi.py
+os.environ.setdefault('DJANGO_SQLITE_PROFILE', 'tuned')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# Перезапуск воркера после N запросов (со случайным разбросом) - защита от роста памяти
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+accesslog = '-'